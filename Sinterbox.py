@@ -34,5 +34,8 @@ def stop(context):
         # This will run the start function in each of your commands as defined in commands/__init__.py
         commands.stop()
 
+        # Write any buffered log records and release the log file
+        futil.close_logs()
+
     except:
         futil.handle_error('stop')
@@ -0,0 +1,301 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# API to create sinterboxes from scripts and other add-ins.
+# No command inputs or preview graphics are created, everything is passed in explicitly.
+# Some state is kept at module level between calls, it only changes how fast a call is:
+# - built walls, reused when an equal wall is built again (SinterBoxUtils, clear_wall_cache)
+# - the evaluated printer profiles of each unit system (SinterBoxProfiles, clear_profile_cache)
+# - measured build times of the boolean strategies (SinterBoxBoolean.timings), saved to
+#   config.BOOLEAN_TIMINGS_FILE after each build
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import adsk.core
+import adsk.fusion
+
+from ... import config
+from .SinterBoxBoolean import benchmark_layouts, benchmark_strategies, build_cage_body, build_step_count, \
+    format_benchmark, save_timings
+from .SinterBoxGeometry import AABB, CellGrid
+from .SinterBoxMetrics import CageMetrics
+from .SinterBoxPacking import Packing, pack_boxes
+from .SinterBoxProfiles import clear_profile_cache, get_profile
+from .SinterBoxProgress import NO_PROGRESS, Progress
+from .SinterBoxPersistence import StoredDefinition, save_definition, tag_cage_body, wall_digests, cage_box, \
+    update_sinterbox
+from .SinterBoxUtils import FeatureValues, auto_gaps, bounding_boxes_from_selections, clear_wall_cache, \
+    combine_boxes, feature_metrics, get_default_offset, get_design, optimized_layout, packing_matrix, \
+    part_clearance, plan_grid
+from .SinterBoxValidation import ClearanceValidator, Interference, interference_message
+
+__all__ = [
+    'SinterboxError', 'SinterboxResult', 'create_sinterbox', 'update_sinterbox', 'commit_step_count',
+    'benchmark_boolean_strategies', 'clear_wall_cache', 'clear_profile_cache'
+]
+
+OFFSET_KEYS = ('x_pos', 'x_neg', 'y_pos', 'y_neg', 'z_pos', 'z_neg')
+
+Offsets = Union[None, float, Sequence[float], Dict[str, float]]
+
+
+class SinterboxError(Exception):
+    pass
+
+
+@dataclass
+class SinterboxResult:
+    occurrence: adsk.fusion.Occurrence
+    body: adsk.fusion.BRepBody
+    feature_values: FeatureValues
+    b_box: AABB
+    grid: Optional[CellGrid] = None
+    cells: List[Tuple[int, int, int]] = field(default_factory=list)
+    bodies: List[adsk.fusion.BRepBody] = field(default_factory=list)
+    metrics: Optional[CageMetrics] = None
+
+
+def offset_values(offsets: Offsets, design: adsk.fusion.Design = None, profile: str = None) -> Dict[str, float]:
+    """Normalizes offsets given as None (default), a single value, six values or a dict"""
+    if offsets is None:
+        offsets = get_default_offset(design, profile)
+    if isinstance(offsets, (int, float)):
+        return {key: float(offsets) for key in OFFSET_KEYS}
+    if isinstance(offsets, dict):
+        default = get_default_offset(design, profile)
+        return {key: float(offsets.get(key, default)) for key in OFFSET_KEYS}
+    if len(offsets) != len(OFFSET_KEYS):
+        raise SinterboxError(f'Expected {len(OFFSET_KEYS)} offsets ({", ".join(OFFSET_KEYS)}), got {len(offsets)}')
+    return dict(zip(OFFSET_KEYS, (float(offset) for offset in offsets)))
+
+
+def commit_step_count(b_box: AABB, feature_values: FeatureValues, grid: CellGrid = None, body_count: int = 0,
+                      pack: bool = False, move_bodies_to_component: bool = False) -> int:
+    """Progress steps of building a cage and packing or moving body_count bodies"""
+    return build_step_count(b_box, feature_values, grid) + body_count * (int(pack) + int(move_bodies_to_component))
+
+
+def build_cage(design: adsk.fusion.Design, b_box: AABB, feature_values: FeatureValues, grid: CellGrid = None,
+               name: str = config.DEFAULT_COMPONENT_NAME, progress: Progress = NO_PROGRESS) \
+        -> Tuple[adsk.fusion.Occurrence, adsk.fusion.BRepBody, str]:
+    """Creates a new component holding the cage built around b_box
+
+    The cage is built as a temporary body before the component is created, so cancelling
+    the progress (CommitCancelled) leaves the design untouched.
+    Returns the new occurrence, the cage body and the entity token of its base feature
+    (empty for direct modeling designs).
+    """
+    shell_box = build_cage_body(b_box, feature_values, grid, progress=progress)
+    progress.check()
+
+    root_comp = design.rootComponent
+    new_occ: adsk.fusion.Occurrence = root_comp.occurrences.addNewComponent(adsk.core.Matrix3D.create())
+    new_comp = new_occ.component
+    new_comp.name = name
+
+    base_feature_token = ''
+
+    if design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
+
+        base_feature = new_comp.features.baseFeatures.add()
+        base_feature.startEdit()
+        new_body = new_comp.bRepBodies.add(shell_box, base_feature)
+        new_body.name = config.DEFAULT_COMPONENT_NAME
+        base_feature.finishEdit()
+        base_feature_token = base_feature.entityToken
+
+    else:
+        new_body = new_comp.bRepBodies.add(shell_box)
+        new_body.name = config.DEFAULT_COMPONENT_NAME
+
+    tag_cage_body(new_body)
+    save_timings()
+    return new_occ, new_body, base_feature_token
+
+
+def move_bodies(design: adsk.fusion.Design, bodies: List[adsk.fusion.BRepBody], occurrence: adsk.fusion.Occurrence,
+                progress: Progress = NO_PROGRESS) -> Tuple[List[adsk.fusion.BRepBody], int]:
+    """Copies bodies into the occurrence and removes the originals
+
+    Raises CommitCancelled if the progress is cancelled, the caller undoes the changes made
+    so far (a command by setting executeFailed).
+    Returns the copied bodies and the timeline index of the last remove feature (-1 if none).
+    """
+    root_comp = design.rootComponent
+    is_parametric = design.designType == adsk.fusion.DesignTypes.ParametricDesignType
+
+    new_bodies = []
+    body: adsk.fusion.BRepBody
+    for body in bodies:
+        new_bodies.append(body.copyToComponent(occurrence))
+        progress.step()
+        # TODO think about Occurrences
+        # new_body.name = f'{body.parentComponent.name} - {body.name}'
+
+    last_index = -1
+    for body in bodies:
+        if body.isValid:
+            if is_parametric:
+                remove_feature = root_comp.features.removeFeatures.add(body)
+                last_index = remove_feature.timelineObject.index
+            else:
+                body.deleteMe()
+    return new_bodies, last_index
+
+
+def pack_bodies(design: adsk.fusion.Design, bodies: List[adsk.fusion.BRepBody], packing: Packing,
+                progress: Progress = NO_PROGRESS) -> int:
+    """Moves every body to its place in packing with one move feature per body
+
+    Like move_bodies it raises CommitCancelled if the progress is cancelled.
+    Returns the timeline index of the last move feature (-1 if none or not parametric).
+    """
+    is_parametric = design.designType == adsk.fusion.DesignTypes.ParametricDesignType
+    last_index = -1
+    for i, body in enumerate(bodies):
+        matrix = packing_matrix(packing, i)
+        if body.assemblyContext is not None:
+            # Move features work in the space of the component that owns the body
+            occurrence_matrix = body.assemblyContext.transform2
+            inverse = occurrence_matrix.copy()
+            inverse.invert()
+            local = occurrence_matrix.copy()
+            local.transformBy(matrix)
+            local.transformBy(inverse)
+            matrix = local
+            body = body.nativeObject
+
+        entities = adsk.core.ObjectCollection.create()
+        entities.add(body)
+        move_features = body.parentComponent.features.moveFeatures
+        move_input = move_features.createInput2(entities)
+        move_input.defineAsFreeMove(matrix)
+        move_feature = move_features.add(move_input)
+        if is_parametric:
+            last_index = move_feature.timelineObject.index
+        progress.step()
+    return last_index
+
+
+def store_definition(occurrence: adsk.fusion.Occurrence, feature_values: FeatureValues, b_box: AABB,
+                     bodies: List[adsk.fusion.BRepBody], grid: CellGrid = None, base_feature_token: str = ''):
+    definition = StoredDefinition(
+        FeatureValues(**vars(feature_values)),
+        b_box.copy(),
+        [body.entityToken for body in bodies],
+        wall_digests(cage_box(b_box, feature_values), feature_values, grid),
+        base_feature_token
+    )
+    save_definition(occurrence.component, definition)
+
+
+def create_sinterbox(bodies: List[adsk.fusion.BRepBody], thickness: float = None, bar: float = None,
+                     gap: float = None, offsets: Offsets = None, cells: int = 1,
+                     move_bodies_to_component: bool = False, check_clearance: bool = True,
+                     name: str = config.DEFAULT_COMPONENT_NAME, design: adsk.fusion.Design = None,
+                     profile: str = None, optimize_layout: bool = False, pack: bool = False,
+                     progress: Progress = NO_PROGRESS) -> SinterboxResult:
+    """Creates a sinterbox around bodies in the active (or given) design
+
+    Arguments:
+    bodies -- Solid bodies to enclose.
+    thickness, bar, gap -- Cage thickness, bar width and bar spacing in internal units (cm).
+                           Thickness and bar default to the printer profile values.
+                           If gap is None the bar spacing is computed like Automatic Bar Spacing.
+    offsets -- Distance between the bodies and the cage.  A single value, six values in the order
+               x_pos, x_neg, y_pos, y_neg, z_pos, z_neg, a dict with those keys or None for the default.
+    cells -- Maximum number of cells per axis.
+    move_bodies_to_component -- Moves the bodies into the new Sinterbox component.
+    check_clearance -- Raises SinterboxError if the cage walls would cut through other bodies.
+    profile -- Name of a printer profile in config.PRINTER_PROFILES, None for the default profile.
+    optimize_layout -- Picks the bar spacing and per axis bar widths (at least bar) that leave the least
+                       cage material while holding the bodies, within the profile minimums.
+    pack -- Rearranges the bodies into a compact block first, rotating them in 90 degree steps
+            and keeping the smallest offset between them.
+    progress -- Reports the commit, for example Progress.show(title, commit_step_count(...)).
+                If it is cancelled CommitCancelled is raised.  Nothing is added to the design
+                if that happens while the cage is built, later the caller has to undo the new
+                component and the packed or moved bodies.
+    """
+    bodies = list(bodies)
+    if len(bodies) == 0:
+        raise SinterboxError('No bodies to enclose')
+
+    design = design or get_design()
+    printer_profile = get_profile(design, profile)
+    thickness = printer_profile.thickness if thickness is None else thickness
+    bar = printer_profile.bar if bar is None else bar
+    offset_map = offset_values(offsets, design, profile)
+
+    part_boxes = bounding_boxes_from_selections(bodies)
+    feature_values = FeatureValues(thickness, bar, gap or 0.0, cells=cells, **offset_map)
+    packing = None
+    if pack:
+        packing = pack_boxes(part_boxes, part_clearance(feature_values))
+        part_boxes = packing.boxes
+    b_box = combine_boxes(part_boxes)
+    new_cage_box = cage_box(b_box, feature_values)
+    if gap is None and not optimize_layout:
+        feature_values.gap = auto_gaps(bodies, new_cage_box, thickness, bar)
+
+    grid = plan_grid(part_boxes, new_cage_box, feature_values)
+
+    if optimize_layout:
+        try:
+            feature_values.gap, feature_values.bars = optimized_layout(
+                bodies, new_cage_box, feature_values, printer_profile.min_gap, printer_profile.min_bar, grid)
+        except ValueError as error:
+            raise SinterboxError(str(error))
+
+    if check_clearance:
+        interferences: List[Interference] = ClearanceValidator(design).validate(
+            new_cage_box, feature_values, grid, exclude=bodies)
+        if len(interferences) > 0:
+            raise SinterboxError(interference_message(interferences).replace('<br>', '\n'))
+
+    is_parametric = design.designType == adsk.fusion.DesignTypes.ParametricDesignType
+    group_start_index = design.timeline.markerPosition if is_parametric else 0
+    group_end_index = group_start_index + 2
+
+    occurrence, body, base_feature_token = build_cage(design, new_cage_box, feature_values, grid, name, progress)
+    enclosed_bodies = bodies
+
+    if packing is not None:
+        last_index = pack_bodies(design, bodies, packing, progress)
+        group_end_index = max(group_end_index, last_index)
+
+    if move_bodies_to_component:
+        enclosed_bodies, last_index = move_bodies(design, bodies, occurrence, progress)
+        group_end_index = max(group_end_index, last_index)
+
+    store_definition(occurrence, feature_values, b_box, enclosed_bodies, grid, base_feature_token)
+
+    if is_parametric:
+        t_group = design.timeline.timelineGroups.add(group_start_index, group_end_index)
+        t_group.name = name
+
+    cells_of_bodies = grid.assign(part_boxes) if grid is not None else [(0, 0, 0)] * len(bodies)
+    metrics = feature_metrics(new_cage_box, feature_values, grid, printer_profile.density)
+    return SinterboxResult(
+        occurrence, body, feature_values, new_cage_box, grid, cells_of_bodies, enclosed_bodies, metrics
+    )
+
+
+def benchmark_boolean_strategies(thickness: float, bar: float, gap: float, sizes: Sequence[float] = (2, 4, 8, 16),
+                                 repeats: int = 1) -> str:
+    """Compares all boolean strategies on cubes of increasing size and returns a text table
+
+    Sizes are in multiples of gap + bar.  Run from the Text Command window or a script to
+    find the slot counts where one strategy overtakes another.
+    """
+    feature_values = FeatureValues(thickness, bar, gap, *([0.0] * 6))
+    results = benchmark_strategies(benchmark_layouts(feature_values, sizes), feature_values, repeats=repeats)
+    return format_benchmark(results)
@@ -0,0 +1,281 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Strategies for cutting the slots out of the cage with temporary BRep booleans.
+# Which one is fastest depends on the slot count, so build times are recorded and the
+# fastest strategy measured for a similar slot count is picked for the next build.
+import abc
+import json
+import math
+import os
+import time
+from typing import Dict, List, Sequence, Tuple
+
+import adsk.fusion
+
+from ... import config
+from ...lib import fusion360utils as futil
+from .SinterBoxGeometry import AABB, CellGrid, shell_walls, slot_boxes
+from .SinterBoxProgress import NO_PROGRESS, Progress
+from .SinterBoxUtils import FeatureValues, as_aabb, clear_wall_cache, create_brep_shell_box, create_cage_body, \
+    reused_walls, to_o_box
+
+logger = futil.get_logger('SinterBoxBoolean')
+
+DIFFERENCE = adsk.fusion.BooleanTypes.DifferenceBooleanType
+UNION = adsk.fusion.BooleanTypes.UnionBooleanType
+
+# Weight of the newest timing in the running average kept for each strategy and slot count bucket
+TIMING_WEIGHT = 0.3
+
+
+class BooleanStrategy(abc.ABC):
+    """Builds the slotted cage body for a box, feature values and optional cell grid
+
+    Strategies report one progress step per slot and per wall (see build_step_count).
+    """
+    name = ''
+
+    @abc.abstractmethod
+    def build(self, b_box: AABB, feature_values: FeatureValues, grid: CellGrid = None,
+              progress: Progress = NO_PROGRESS) -> adsk.fusion.BRepBody:
+        pass
+
+    @staticmethod
+    def slot_bodies(b_box: AABB, feature_values: FeatureValues, grid: CellGrid = None) -> List[adsk.fusion.BRepBody]:
+        brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+        slots = slot_boxes(b_box, feature_values.gap, feature_values.slot_bar, feature_values.shell_thickness, grid)
+        return [brep_mgr.createBox(to_o_box(slot)) for slot in slots]
+
+
+class SequentialDifference(BooleanStrategy):
+    """Subtracts every slot from the shell, one boolean per slot"""
+    name = 'sequential_difference'
+
+    def build(self, b_box, feature_values, grid=None, progress=NO_PROGRESS):
+        brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+        shell_box = create_brep_shell_box(b_box, feature_values.shell_thickness, grid)
+        progress.step(len(shell_walls(b_box, feature_values.shell_thickness, grid)))
+        for slot in self.slot_bodies(b_box, feature_values, grid):
+            brep_mgr.booleanOperation(shell_box, slot, DIFFERENCE)
+            progress.step()
+        return shell_box
+
+
+class UnionThenDifference(BooleanStrategy):
+    """Unions all slots into one tool body, then subtracts it from the shell once"""
+    name = 'union_then_difference'
+
+    def build(self, b_box, feature_values, grid=None, progress=NO_PROGRESS):
+        brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+        shell_box = create_brep_shell_box(b_box, feature_values.shell_thickness, grid)
+        progress.step(len(shell_walls(b_box, feature_values.shell_thickness, grid)))
+        slots = self.slot_bodies(b_box, feature_values, grid)
+        if len(slots) > 0:
+            tool = slots[0]
+            for slot in slots[1:]:
+                brep_mgr.booleanOperation(tool, slot, UNION)
+                progress.step()
+            brep_mgr.booleanOperation(shell_box, tool, DIFFERENCE)
+            progress.step()
+        return shell_box
+
+
+class BalancedTreeMerge(BooleanStrategy):
+    """Unions the slots pairwise in a balanced tree so each union works on similar sized bodies"""
+    name = 'balanced_tree_merge'
+
+    def build(self, b_box, feature_values, grid=None, progress=NO_PROGRESS):
+        brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+        shell_box = create_brep_shell_box(b_box, feature_values.shell_thickness, grid)
+        progress.step(len(shell_walls(b_box, feature_values.shell_thickness, grid)))
+        level = self.slot_bodies(b_box, feature_values, grid)
+        while len(level) > 1:
+            next_level = []
+            for i in range(0, len(level) - 1, 2):
+                brep_mgr.booleanOperation(level[i], level[i + 1], UNION)
+                next_level.append(level[i])
+                progress.step()
+            if len(level) % 2 == 1:
+                next_level.append(level[-1])
+            level = next_level
+        if len(level) == 1:
+            brep_mgr.booleanOperation(shell_box, level[0], DIFFERENCE)
+            progress.step()
+        return shell_box
+
+
+class PerWallUnion(BooleanStrategy):
+    """Slots each wall separately, then unions the walls; walls are cached between builds"""
+    name = 'per_wall_union'
+
+    def build(self, b_box, feature_values, grid=None, progress=NO_PROGRESS):
+        return create_cage_body(b_box, feature_values, grid, progress)
+
+
+STRATEGIES: Dict[str, BooleanStrategy] = {
+    strategy.name: strategy for strategy in (
+        SequentialDifference(), UnionThenDifference(), BalancedTreeMerge(), PerWallUnion()
+    )
+}
+
+# Used until timings have been recorded for a slot count
+DEFAULT_STRATEGY = PerWallUnion.name
+SMALL_LAYOUT_STRATEGY = SequentialDifference.name
+SMALL_LAYOUT_SLOTS = 32
+
+
+def slot_count(b_box: AABB, feature_values: FeatureValues, grid: CellGrid = None) -> int:
+    return len(slot_boxes(b_box, feature_values.gap, feature_values.slot_bar, feature_values.shell_thickness, grid))
+
+
+def build_step_count(b_box, feature_values: FeatureValues, grid: CellGrid = None) -> int:
+    """Progress steps reported while building a cage, one per slot and one per wall"""
+    b_box = as_aabb(b_box)
+    return slot_count(b_box, feature_values, grid) + len(shell_walls(b_box, feature_values.shell_thickness, grid))
+
+
+def slot_bucket(count: int) -> str:
+    """Timings are grouped by powers of two of the slot count"""
+    return str(int(math.log2(count + 1)))
+
+
+class StrategyTimings:
+    """Running average build time per strategy and slot count bucket, persisted as JSON
+
+    Recorded timings are only written by save, once a commit or benchmark is done.
+    """
+
+    def __init__(self, path: str = config.BOOLEAN_TIMINGS_FILE):
+        self.path = path
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.loaded = False
+        self.changed = False
+
+    def load(self):
+        self.loaded = True
+        try:
+            with open(self.path, 'r') as timings_file:
+                self.timings = json.load(timings_file)
+        except (OSError, ValueError):
+            self.timings = {}
+
+    def save(self):
+        if not self.changed:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w') as timings_file:
+                json.dump(self.timings, timings_file)
+            self.changed = False
+        except OSError:
+            logger.warning('Could not save boolean timings to %s', self.path)
+
+    def record(self, strategy_name: str, count: int, seconds: float):
+        if not self.loaded:
+            self.load()
+        bucket = self.timings.setdefault(slot_bucket(count), {})
+        previous = bucket.get(strategy_name)
+        bucket[strategy_name] = seconds if previous is None else previous + (seconds - previous) * TIMING_WEIGHT
+        self.changed = True
+
+    def fastest(self, count: int) -> str:
+        """The fastest strategy measured for count slots
+
+        Each strategy is tried once for a bucket before the fastest one is picked, starting
+        with the default so a bucket without timings gets the usually fastest strategy.
+        """
+        if not self.loaded:
+            self.load()
+        bucket = self.timings.get(slot_bucket(count), {})
+        default = SMALL_LAYOUT_STRATEGY if count <= SMALL_LAYOUT_SLOTS else DEFAULT_STRATEGY
+        for name in [default] + list(STRATEGIES):
+            if name not in bucket:
+                return name
+        return min(STRATEGIES, key=bucket.get)
+
+
+timings = StrategyTimings()
+
+
+def select_strategy(count: int) -> BooleanStrategy:
+    return STRATEGIES[timings.fastest(count)]
+
+
+def save_timings():
+    timings.save()
+
+
+def timed_build(strategy: BooleanStrategy, b_box: AABB, feature_values: FeatureValues, grid: CellGrid = None,
+                count: int = None, progress: Progress = NO_PROGRESS) -> Tuple[adsk.fusion.BRepBody, float]:
+    count = slot_count(b_box, feature_values, grid) if count is None else count
+    reused = reused_walls()
+    start = time.perf_counter()
+    body = strategy.build(b_box, feature_values, grid, progress)
+    seconds = time.perf_counter() - start
+    reused = reused_walls() - reused
+    # Builds that reused walls of earlier builds are not comparable with cold builds
+    if reused == 0:
+        timings.record(strategy.name, count, seconds)
+    logger.debug('Cage built', strategy=strategy.name, slots=count, seconds=round(seconds, 4), reused_walls=reused)
+    return body, seconds
+
+
+def build_cage_body(b_box, feature_values: FeatureValues, grid: CellGrid = None, strategy_name: str = None,
+                    progress: Progress = NO_PROGRESS) -> adsk.fusion.BRepBody:
+    """Builds the cage with the given strategy or the fastest one measured for its slot count
+
+    Raises CommitCancelled if the progress dialog is cancelled, nothing is added to the design.
+    """
+    b_box = as_aabb(b_box)
+    count = slot_count(b_box, feature_values, grid)
+    strategy = STRATEGIES[strategy_name] if strategy_name else select_strategy(count)
+    return timed_build(strategy, b_box, feature_values, grid, count, progress)[0]
+
+
+def benchmark_layouts(feature_values: FeatureValues, sizes: Sequence[float] = (2, 4, 8, 16)) -> List[AABB]:
+    """Cubes of the given sizes (in multiples of gap + bar) to compare strategies on"""
+    pitch = feature_values.gap + feature_values.bar
+    return [AABB(0, 0, 0, size * pitch, size * pitch, size * pitch) for size in sizes]
+
+
+def benchmark_strategies(layouts: Sequence[AABB], feature_values: FeatureValues, grid_for=None,
+                         repeats: int = 1) -> Dict[str, List[Tuple[int, float]]]:
+    """Builds every layout with every strategy and returns (slot count, best seconds) per strategy
+
+    The per wall cache is cleared before each build so all strategies start cold.  The
+    measured timings also feed the strategy selection.
+    """
+    results = {name: [] for name in STRATEGIES}
+    for b_box in layouts:
+        grid = grid_for(b_box) if grid_for is not None else None
+        count = slot_count(b_box, feature_values, grid)
+        for name, strategy in STRATEGIES.items():
+            best = None
+            for _ in range(repeats):
+                clear_wall_cache()
+                body, seconds = timed_build(strategy, b_box, feature_values, grid, count)
+                best = seconds if best is None else min(best, seconds)
+            results[name].append((count, best))
+    save_timings()
+    return results
+
+
+def format_benchmark(results: Dict[str, List[Tuple[int, float]]]) -> str:
+    """Plain text table with one row per layout and one column per strategy"""
+    names = list(results)
+    rows = ['slots'.rjust(8) + ''.join(name.rjust(24) for name in names)]
+    for i, (count, _) in enumerate(results[names[0]]):
+        row = str(count).rjust(8)
+        for name in names:
+            row += f'{results[name][i][1]:.3f}s'.rjust(24)
+        rows.append(row)
+    return '\n'.join(rows)
@@ -9,22 +9,34 @@
 #  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
 #  UNINTERRUPTED OR ERROR FREE.
 
+from typing import Dict, List, Optional, Tuple
+
 import adsk.core
 import adsk.fusion
 
-from ... import config
-from .SinterBoxUtils import get_default_offset, middle, mid_point, create_brep_shell_box, create_gaps, FeatureValues, \
-    bounding_box_from_selections, get_design
+from .SinterBoxMetrics import CageMetrics
+from .SinterBoxGeometry import AABB, OBB, CellGrid, Vec3, box_mesh, middle, slot_mesh, x_axis, y_axis, z_axis
+from .SinterBoxPacking import Packing
+from .SinterBoxAPI import build_cage, store_definition
+from .SinterBoxProfiles import PrinterProfile, get_profile
+from .SinterBoxProgress import NO_PROGRESS, Progress
+from .SinterBoxUtils import create_brep_shell_box, FeatureValues, \
+    bounding_boxes_from_selections, combine_boxes, feature_metrics, get_design, to_point3d, to_vector3d, plan_grid
+from .SinterBoxValidation import ClearanceValidator, Interference
+from .SinterBoxWorker import GeometryWorker
 
 app = adsk.core.Application.get()
 ui = app.userInterface
 
+SLOTS_JOB = 'slots'
+
 
 class Direction:
     def __init__(self, name: str, direction: adsk.core.Vector3D, inputs: adsk.core.CommandInputs, default_value: float):
         self.name = name
         self.direction = direction
-        self.origin = adsk.core.Point3D.create(0, 0, 0)
+        self.axis = Vec3.from_point(direction)
+        self.origin = Vec3()
 
         default_value_input = adsk.core.ValueInput.createByReal(default_value)
         self.dist_input: adsk.core.DistanceValueCommandInput = inputs.addDistanceValueCommandInput(
@@ -35,39 +47,37 @@ class Direction:
         self.dist_input.minimumValue = 0.0
         self.dist_input.isMinimumValueInclusive = True
 
-    def update_manipulator(self, new_origin):
+    def update_manipulator(self, new_origin: Vec3):
         self.origin = new_origin
-        self.dist_input.setManipulator(self.origin, self.direction)
+        self.dist_input.setManipulator(to_point3d(self.origin), self.direction)
         self.dist_input.isEnabled = True
         self.dist_input.isVisible = True
 
 
 class SinterBoxDefinition:
-    def __init__(self, b_box: adsk.core.BoundingBox3D, inputs: adsk.core.CommandInputs):
+    def __init__(self, b_box: AABB, inputs: adsk.core.CommandInputs, worker: GeometryWorker = None,
+                 profile: PrinterProfile = None):
         design = get_design()
+        self.profile = profile or get_profile(design)
         root_comp = design.rootComponent
 
         self.b_box = b_box
         self.modified_b_box = self.b_box.copy()
 
-        self.x_pos_vector = root_comp.yZConstructionPlane.geometry.normal.copy()
-        self.x_neg_vector = root_comp.yZConstructionPlane.geometry.normal.copy()
-        self.x_neg_vector.scaleBy(-1)
-        self.y_pos_vector = root_comp.xZConstructionPlane.geometry.normal.copy()
-        self.y_neg_vector = root_comp.xZConstructionPlane.geometry.normal.copy()
-        self.y_neg_vector.scaleBy(-1)
-        self.z_pos_vector = root_comp.xYConstructionPlane.geometry.normal.copy()
-        self.z_neg_vector = root_comp.xYConstructionPlane.geometry.normal.copy()
-        self.z_neg_vector.scaleBy(-1)
+        self.x_pos_vector = to_vector3d(x_axis())
+        self.x_neg_vector = to_vector3d(x_axis().scaled(-1))
+        self.y_pos_vector = to_vector3d(y_axis())
+        self.y_neg_vector = to_vector3d(y_axis().scaled(-1))
+        self.z_pos_vector = to_vector3d(z_axis())
+        self.z_neg_vector = to_vector3d(z_axis().scaled(-1))
 
         self.inputs = inputs
         self.thickness_input: adsk.core.ValueCommandInput = inputs.itemById('thick_input')
         self.gap_input: adsk.core.ValueCommandInput = inputs.itemById('gap')
         self.bar_input: adsk.core.ValueCommandInput = inputs.itemById('bar')
 
-        default_offset = get_default_offset()
         self.feature_values = FeatureValues(
-            self.thickness_input.value, self.bar_input.value, self.gap_input.value, *([default_offset] * 6))
+            self.thickness_input.value, self.bar_input.value, self.gap_input.value, *([self.profile.offset] * 6))
 
         direction_group = inputs.addGroupCommandInput('direction_group', 'Offset Values')
         self.directions = {
@@ -84,85 +94,159 @@ class SinterBoxDefinition:
         self.brep_mgr = adsk.fusion.TemporaryBRepManager.get()
         self.graphics_box = None
         self.selections = []
+        self.part_boxes = []
+        self.grid: CellGrid = None
+        self.validator: ClearanceValidator = None
+        self.worker = worker
+        self.base_feature_token = ''
+        self.source_boxes: List[AABB] = []
+        self.pack_parts = False
+        self.packing: Optional[Packing] = None
+        # Escape gap of every body measured during the command, by entityToken
+        self.escape_gaps: Dict[str, float] = {}
+
+    def apply_profile(self, profile: PrinterProfile):
+        """Sets the thickness, bar, spacing and offset inputs to the values of profile"""
+        self.profile = profile
+        self.thickness_input.value = profile.thickness
+        self.bar_input.value = profile.bar
+        self.gap_input.value = profile.gap
+
+        feature_values = self.feature_values
+        feature_values.shell_thickness = profile.thickness
+        feature_values.bar = profile.bar
+        feature_values.gap = profile.gap
+        for key, direction in self.directions.items():
+            direction.dist_input.value = profile.offset
+            setattr(feature_values, key, profile.offset)
+
+        if len(self.selections) > 0:
+            self.refresh_box()
+
+    def refresh_box(self):
+        """Re-applies the offsets and cells to the current selection bounding box"""
+        self.initialize_box(self.b_box)
+        self.expand_box_in_directions()
+        self.update_grid()
 
-    def initialize_box(self, b_box):
+    def initialize_box(self, b_box: AABB):
         self.modified_b_box = b_box.copy()
 
     def update_selections(self, selections):
         self.selections = selections
-        _new_bounding_box = bounding_box_from_selections(selections)
+        self.source_boxes = bounding_boxes_from_selections(selections)
+        # A packing computed for a different spacing is still shown until the new one arrives
+        self.part_boxes = self.packing.boxes if self.packing_active else self.source_boxes
+        _new_bounding_box = combine_boxes(self.part_boxes)
+        self.b_box = _new_bounding_box
         self.initialize_box(_new_bounding_box)
         self.update_manipulators()
         self.expand_box_in_directions()
+        self.update_grid()
 
-    def update_box(self, point: adsk.core.Point3D):
-        self.modified_b_box.expand(point)
+    def update_grid(self):
+        self.grid = plan_grid(self.part_boxes, self.modified_b_box, self.feature_values)
 
-    def update_manipulators(self):
-        min_p = self.modified_b_box.minPoint
-        max_p = self.modified_b_box.maxPoint
+    def update_box(self, point: Vec3):
+        self.modified_b_box.expand(point.x, point.y, point.z)
 
-        self.directions["x_pos"].update_manipulator(adsk.core.Point3D.create(
-            max_p.x, middle(min_p.y, max_p.y), middle(min_p.z, max_p.z))
-        )
-        self.directions["x_neg"].update_manipulator(adsk.core.Point3D.create(
-            min_p.x, middle(min_p.y, max_p.y), middle(min_p.z, max_p.z))
-        )
-        self.directions["y_pos"].update_manipulator(adsk.core.Point3D.create(
-            middle(min_p.x, max_p.x), max_p.y, middle(min_p.z, max_p.z))
-        )
-        self.directions["y_neg"].update_manipulator(adsk.core.Point3D.create(
-            middle(min_p.x, max_p.x), min_p.y, middle(min_p.z, max_p.z))
-        )
-        self.directions["z_pos"].update_manipulator(adsk.core.Point3D.create(
-            middle(min_p.x, max_p.x), middle(min_p.y, max_p.y), max_p.z)
-        )
-        self.directions["z_neg"].update_manipulator(adsk.core.Point3D.create(
-            middle(min_p.x, max_p.x), middle(min_p.y, max_p.y), min_p.z)
-        )
+    def update_manipulators(self):
+        b_box = self.modified_b_box
+        mid_x = middle(b_box.min_x, b_box.max_x)
+        mid_y = middle(b_box.min_y, b_box.max_y)
+        mid_z = middle(b_box.min_z, b_box.max_z)
+
+        self.directions["x_pos"].update_manipulator(Vec3(b_box.max_x, mid_y, mid_z))
+        self.directions["x_neg"].update_manipulator(Vec3(b_box.min_x, mid_y, mid_z))
+        self.directions["y_pos"].update_manipulator(Vec3(mid_x, b_box.max_y, mid_z))
+        self.directions["y_neg"].update_manipulator(Vec3(mid_x, b_box.min_y, mid_z))
+        self.directions["z_pos"].update_manipulator(Vec3(mid_x, mid_y, b_box.max_z))
+        self.directions["z_neg"].update_manipulator(Vec3(mid_x, mid_y, b_box.min_z))
 
     def expand_box_in_directions(self):
         direction: Direction
         for key, direction in self.directions.items():
-            point = direction.dist_input.manipulatorOrigin.copy()
-            vector = direction.direction.copy()
-            vector.normalize()
-            vector.scaleBy(direction.dist_input.value)
-            point.translateBy(vector)
+            setattr(self.feature_values, key, direction.dist_input.value)
+            point = direction.origin + direction.axis.scaled(direction.dist_input.value)
             self.update_box(point)
 
-    def box_center(self):
-        return mid_point(self.modified_b_box.minPoint, self.modified_b_box.maxPoint)
+    @property
+    def packing_active(self) -> bool:
+        return self.pack_parts and self.packing is not None and self.packing.source_boxes == self.source_boxes
+
+    def validate(self) -> List[Interference]:
+        """Bodies and other sinterboxes that the walls of the current cage would cut through"""
+        if self.validator is None:
+            self.validator = ClearanceValidator(get_design())
+        return self.validator.validate(self.modified_b_box, self.feature_values, self.grid, exclude=self.selections)
+
+    def metrics(self) -> CageMetrics:
+        """Volume, mass and areas of the current cage, computed without building it"""
+        return feature_metrics(self.modified_b_box, self.feature_values, self.grid, self.profile.density)
+
+    def box_center(self) -> Vec3:
+        return self.modified_b_box.center()
 
     def update_graphics(self):
         self.clear_graphics()
 
-        shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value)
+        shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value, self.grid)
 
         color = adsk.core.Color.create(10, 200, 50, 125)
         color_effect = adsk.fusion.CustomGraphicsSolidColorEffect.create(color)
         self.graphics_box = self.graphics_group.addBRepBody(shell_box)
         self.graphics_box.color = color_effect
+        self.draw_packed_parts()
 
     def update_graphics_full(self):
         self.clear_graphics()
 
-        shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value)
-        gaps = create_gaps(self.modified_b_box, self.feature_values)
-
-        g_color = adsk.core.Color.create(0, 0, 0, 0)
-        g_color_effect = adsk.fusion.CustomGraphicsSolidColorEffect.create(g_color)
-        for gap in gaps:
-            g_graphic = self.graphics_group.addBRepBody(gap)
-            g_graphic.depthPriority = 1
-            g_graphic.color = g_color_effect
+        shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value, self.grid)
 
         color = adsk.core.Color.create(10, 200, 50, 125)
         color_effect = adsk.fusion.CustomGraphicsSolidColorEffect.create(color)
         self.graphics_box = self.graphics_group.addBRepBody(shell_box)
         self.graphics_box.color = color_effect
+        self.draw_packed_parts()
+
+        # The slot mesh is pure math, computed off the UI thread when a worker is available
+        slot_mesh_args = (
+            self.modified_b_box.copy(), self.feature_values.gap, self.feature_values.slot_bar,
+            self.feature_values.shell_thickness, self.grid.copy() if self.grid else None
+        )
+        if self.worker is not None:
+            self.worker.submit(SLOTS_JOB, slot_mesh, slot_mesh_args, self.draw_slot_mesh)
+        else:
+            self.draw_slot_mesh(slot_mesh(*slot_mesh_args), refresh=False)
+
+    def draw_packed_parts(self):
+        """Outlines of the parts at their packed places, the bodies only move on OK"""
+        if not self.packing_active:
+            return
+        coordinates, indices = box_mesh([OBB.from_aabb(b_box) for b_box in self.part_boxes])
+        color = adsk.core.Color.create(30, 120, 220, 90)
+        g_coordinates = adsk.fusion.CustomGraphicsCoordinates.create(coordinates)
+        g_graphic = self.graphics_group.addMesh(g_coordinates, indices, [], [])
+        g_graphic.color = adsk.fusion.CustomGraphicsSolidColorEffect.create(color)
+
+    def draw_slot_mesh(self, mesh: Tuple[List[float], List[int]], refresh: bool = True):
+        coordinates, indices = mesh
+        if len(indices) == 0:
+            return
+
+        g_color = adsk.core.Color.create(0, 0, 0, 0)
+        g_color_effect = adsk.fusion.CustomGraphicsSolidColorEffect.create(g_color)
+        g_coordinates = adsk.fusion.CustomGraphicsCoordinates.create(coordinates)
+        g_graphic = self.graphics_group.addMesh(g_coordinates, indices, [], [])
+        g_graphic.depthPriority = 1
+        g_graphic.color = g_color_effect
+
+        if refresh:
+            app.activeViewport.refresh()
 
     def clear_graphics(self):
+        if self.worker is not None:
+            self.worker.invalidate(SLOTS_JOB)
         if self.graphics_box is not None:
             if self.graphics_box.isValid:
                 self.graphics_box.deleteMe()
@@ -170,32 +254,12 @@ class SinterBoxDefinition:
             if entity.isValid:
                 entity.deleteMe()
 
-    def create_brep(self) -> adsk.fusion.Occurrence:
-        design = get_design()
-        root_comp = design.rootComponent
-
-        new_occ: adsk.fusion.Occurrence = root_comp.occurrences.addNewComponent(adsk.core.Matrix3D.create())
-        new_comp = new_occ.component
-        new_comp.name = config.DEFAULT_COMPONENT_NAME
-
-        shell_box = create_brep_shell_box(self.modified_b_box, self.thickness_input.value)
-
-        gaps = create_gaps(self.modified_b_box, self.feature_values)
-        brep_mgr = adsk.fusion.TemporaryBRepManager.get()
-        for gap in gaps:
-            brep_mgr.booleanOperation(shell_box, gap, adsk.fusion.BooleanTypes.DifferenceBooleanType)
-
-        if design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
-
-            base_feature = new_comp.features.baseFeatures.add()
-            base_feature.startEdit()
-            new_body = new_comp.bRepBodies.add(shell_box, base_feature)
-            new_body.name = 'Sinterbox'
-            base_feature.finishEdit()
-
-        else:
-            new_body = new_comp.bRepBodies.add(shell_box)
-            new_body.name = 'Sinterbox'
-
+    def create_brep(self, progress: Progress = NO_PROGRESS) -> adsk.fusion.Occurrence:
+        new_occ, new_body, self.base_feature_token = build_cage(
+            get_design(), self.modified_b_box, self.feature_values, self.grid, progress=progress
+        )
         return new_occ
 
+    def save_definition(self, occurrence: adsk.fusion.Occurrence, bodies):
+        """Stores the parameters, enclosed bodies and wall layout on the new component"""
+        store_definition(occurrence, self.feature_values, self.b_box, bodies, self.grid, self.base_feature_token)
@@ -0,0 +1,712 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Lightweight geometry used for all internal Sinterbox computation.
+# Nothing in this module touches the Fusion 360 API so it is cheap to call and can be
+# exercised outside of Fusion.  Conversion to adsk types happens in SinterBoxUtils.
+import bisect
+import math
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+Bar = Union[float, Sequence[float]]
+
+
+class Vec3:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    @classmethod
+    def from_point(cls, point) -> 'Vec3':
+        """Creates a Vec3 from anything with x, y and z attributes (Point3D, Vector3D, Vec3)"""
+        return cls(point.x, point.y, point.z)
+
+    def copy(self) -> 'Vec3':
+        return Vec3(self.x, self.y, self.z)
+
+    def as_tuple(self) -> Tuple[float, float, float]:
+        return self.x, self.y, self.z
+
+    def scaled(self, factor: float) -> 'Vec3':
+        return Vec3(self.x * factor, self.y * factor, self.z * factor)
+
+    def __add__(self, other: 'Vec3') -> 'Vec3':
+        return Vec3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other: 'Vec3') -> 'Vec3':
+        return Vec3(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Vec3):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y and self.z == other.z
+
+    def __repr__(self) -> str:
+        return f'Vec3({self.x}, {self.y}, {self.z})'
+
+
+def x_axis() -> Vec3:
+    return Vec3(1.0, 0.0, 0.0)
+
+
+def y_axis() -> Vec3:
+    return Vec3(0.0, 1.0, 0.0)
+
+
+def z_axis() -> Vec3:
+    return Vec3(0.0, 0.0, 1.0)
+
+
+def middle(min_p_value: float, max_p_value: float) -> float:
+    return min_p_value + ((max_p_value - min_p_value) / 2)
+
+
+class AABB:
+    """Axis aligned bounding box stored as six floats."""
+    __slots__ = ('min_x', 'min_y', 'min_z', 'max_x', 'max_y', 'max_z')
+
+    def __init__(self, min_x: float, min_y: float, min_z: float, max_x: float, max_y: float, max_z: float):
+        self.min_x = min_x
+        self.min_y = min_y
+        self.min_z = min_z
+        self.max_x = max_x
+        self.max_y = max_y
+        self.max_z = max_z
+
+    @classmethod
+    def from_b_box(cls, b_box) -> 'AABB':
+        """Creates an AABB from a BoundingBox3D (or anything with minPoint and maxPoint)"""
+        min_p = b_box.minPoint
+        max_p = b_box.maxPoint
+        return cls(min_p.x, min_p.y, min_p.z, max_p.x, max_p.y, max_p.z)
+
+    @classmethod
+    def from_points(cls, min_point, max_point) -> 'AABB':
+        return cls(min_point.x, min_point.y, min_point.z, max_point.x, max_point.y, max_point.z)
+
+    def copy(self) -> 'AABB':
+        return AABB(self.min_x, self.min_y, self.min_z, self.max_x, self.max_y, self.max_z)
+
+    def as_tuple(self) -> Tuple[float, float, float, float, float, float]:
+        return self.min_x, self.min_y, self.min_z, self.max_x, self.max_y, self.max_z
+
+    @property
+    def min_point(self) -> Vec3:
+        return Vec3(self.min_x, self.min_y, self.min_z)
+
+    @property
+    def max_point(self) -> Vec3:
+        return Vec3(self.max_x, self.max_y, self.max_z)
+
+    @property
+    def length(self) -> float:
+        return self.max_x - self.min_x
+
+    @property
+    def width(self) -> float:
+        return self.max_y - self.min_y
+
+    @property
+    def height(self) -> float:
+        return self.max_z - self.min_z
+
+    @property
+    def sides(self) -> Tuple[float, float, float]:
+        return self.max_x - self.min_x, self.max_y - self.min_y, self.max_z - self.min_z
+
+    @property
+    def volume(self) -> float:
+        return (self.max_x - self.min_x) * (self.max_y - self.min_y) * (self.max_z - self.min_z)
+
+    def center(self) -> Vec3:
+        return Vec3(
+            middle(self.min_x, self.max_x),
+            middle(self.min_y, self.max_y),
+            middle(self.min_z, self.max_z)
+        )
+
+    def expand(self, x: float, y: float, z: float):
+        """Grows the box in place so that it contains the point (x, y, z)"""
+        if x < self.min_x:
+            self.min_x = x
+        elif x > self.max_x:
+            self.max_x = x
+        if y < self.min_y:
+            self.min_y = y
+        elif y > self.max_y:
+            self.max_y = y
+        if z < self.min_z:
+            self.min_z = z
+        elif z > self.max_z:
+            self.max_z = z
+
+    def combine(self, other: 'AABB'):
+        """Grows the box in place so that it contains other"""
+        if other.min_x < self.min_x:
+            self.min_x = other.min_x
+        if other.min_y < self.min_y:
+            self.min_y = other.min_y
+        if other.min_z < self.min_z:
+            self.min_z = other.min_z
+        if other.max_x > self.max_x:
+            self.max_x = other.max_x
+        if other.max_y > self.max_y:
+            self.max_y = other.max_y
+        if other.max_z > self.max_z:
+            self.max_z = other.max_z
+
+    def offset(self, x_pos: float, x_neg: float, y_pos: float, y_neg: float, z_pos: float, z_neg: float) -> 'AABB':
+        """Returns a new box with each face moved outward by the given distance"""
+        return AABB(
+            self.min_x - x_neg, self.min_y - y_neg, self.min_z - z_neg,
+            self.max_x + x_pos, self.max_y + y_pos, self.max_z + z_pos
+        )
+
+    def grown(self, distance: float) -> 'AABB':
+        return self.offset(*([distance] * 6))
+
+    def intersects(self, other: 'AABB', tolerance: float = 0.0) -> bool:
+        """True if the boxes overlap by more than tolerance along every axis"""
+        return (
+            self.min_x + tolerance < other.max_x and other.min_x + tolerance < self.max_x and
+            self.min_y + tolerance < other.max_y and other.min_y + tolerance < self.max_y and
+            self.min_z + tolerance < other.max_z and other.min_z + tolerance < self.max_z
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, AABB):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __repr__(self) -> str:
+        return f'AABB({self.min_x}, {self.min_y}, {self.min_z}, {self.max_x}, {self.max_y}, {self.max_z})'
+
+
+class OBB:
+    """Oriented box matching the layout of adsk.core.OrientedBoundingBox3D"""
+    __slots__ = ('center', 'length_direction', 'width_direction', 'length', 'width', 'height')
+
+    def __init__(self, center: Vec3, length_direction: Vec3, width_direction: Vec3,
+                 length: float, width: float, height: float):
+        self.center = center
+        self.length_direction = length_direction
+        self.width_direction = width_direction
+        self.length = length
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_aabb(cls, b_box: AABB) -> 'OBB':
+        return cls(b_box.center(), x_axis(), y_axis(), b_box.length, b_box.width, b_box.height)
+
+    def copy(self) -> 'OBB':
+        return OBB(self.center.copy(), self.length_direction.copy(), self.width_direction.copy(),
+                   self.length, self.width, self.height)
+
+    def grown(self, distance: float) -> 'OBB':
+        """Returns a new box with every side grown by distance on both ends"""
+        return OBB(self.center.copy(), self.length_direction.copy(), self.width_direction.copy(),
+                   self.length + distance * 2, self.width + distance * 2, self.height + distance * 2)
+
+    def __repr__(self) -> str:
+        return f'OBB({self.center!r}, {self.length}, {self.width}, {self.height})'
+
+
+# Batch variants.  Fusion 360 does not ship numpy so these work on flat sequences and
+# avoid building intermediate objects where possible.
+def combine_boxes(boxes: Iterable[AABB]) -> AABB:
+    boxes = iter(boxes)
+    result = next(boxes).copy()
+    for b_box in boxes:
+        result.combine(b_box)
+    return result
+
+
+def box_sides(boxes: Sequence[AABB]) -> List[Tuple[float, float, float]]:
+    return [(b.max_x - b.min_x, b.max_y - b.min_y, b.max_z - b.min_z) for b in boxes]
+
+
+def box_centers(boxes: Sequence[AABB]) -> List[Tuple[float, float, float]]:
+    return [((b.min_x + b.max_x) / 2, (b.min_y + b.max_y) / 2, (b.min_z + b.max_z) / 2) for b in boxes]
+
+
+def axis_slot_layout(length: float, gap: float, bar: float) -> Tuple[int, float]:
+    """Number of slots that fit along a side and the margin left at each end"""
+    if (length - gap) >= 0:
+        num = int(math.floor((length + bar) / (gap + bar)))
+        margin = (length - (gap * num) - (bar * (num - 1))) / 2
+    else:
+        num = 0
+        margin = 0
+    return num, margin
+
+
+def axis_slot_centers(start: float, length: float, gap: float, bar: float) -> List[float]:
+    num, margin = axis_slot_layout(length, gap, bar)
+    first = start + margin + gap / 2
+    pitch = bar + gap
+    return [first + i * pitch for i in range(num)]
+
+
+def spans_slot_centers(spans: Sequence[Tuple[float, float]], gap: float, bar: float) -> List[float]:
+    """Slot centers laid out independently in each span, used for the cells of a subdivided cage"""
+    return [center for start, end in spans for center in axis_slot_centers(start, end - start, gap, bar)]
+
+
+def axis_bars(bar: Bar) -> Tuple[float, float, float]:
+    """Bar width along x, y and z from a single width or one width per axis"""
+    if isinstance(bar, (int, float)):
+        return bar, bar, bar
+    return tuple(bar)
+
+
+AXES = ('x', 'y', 'z')
+WALL_KEYS = ('x_neg', 'x_pos', 'y_neg', 'y_pos', 'z_neg', 'z_pos')
+
+
+class CellGrid:
+    """Subdivision of a cage into cells by internal walls
+
+    walls holds the center positions of the internal walls along each axis.
+    """
+    __slots__ = ('b_box', 'thickness', 'walls')
+
+    def __init__(self, b_box: AABB, thickness: float, walls: Tuple[List[float], List[float], List[float]] = None):
+        self.b_box = b_box
+        self.thickness = thickness
+        self.walls = walls or ([], [], [])
+
+    def copy(self) -> 'CellGrid':
+        return CellGrid(self.b_box.copy(), self.thickness, tuple(list(positions) for positions in self.walls))
+
+    def _bounds(self, axis: int) -> Tuple[float, float]:
+        b_box = self.b_box
+        return ((b_box.min_x, b_box.max_x), (b_box.min_y, b_box.max_y), (b_box.min_z, b_box.max_z))[axis]
+
+    def spans(self, axis: int) -> List[Tuple[float, float]]:
+        """Open intervals of the cells along axis, between the internal walls"""
+        start, end = self._bounds(axis)
+        half = self.thickness / 2
+        edges = [start] + [edge for p in self.walls[axis] for edge in (p - half, p + half)] + [end]
+        return [(edges[i], edges[i + 1]) for i in range(0, len(edges), 2)]
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return len(self.walls[0]) + 1, len(self.walls[1]) + 1, len(self.walls[2]) + 1
+
+    @property
+    def cell_count(self) -> int:
+        i, j, k = self.shape
+        return i * j * k
+
+    def cell_index(self, x: float, y: float, z: float) -> Tuple[int, int, int]:
+        return (
+            bisect.bisect_left(self.walls[0], x),
+            bisect.bisect_left(self.walls[1], y),
+            bisect.bisect_left(self.walls[2], z)
+        )
+
+    def assign(self, part_boxes: Sequence[AABB]) -> List[Tuple[int, int, int]]:
+        """Cell index of each part, taken from the center of its bounding box"""
+        return [self.cell_index(x, y, z) for x, y, z in box_centers(part_boxes)]
+
+
+def _merged_intervals(intervals: Iterable[Tuple[float, float]]) -> List[List[float]]:
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def axis_wall_positions(intervals: Sequence[Tuple[float, float]], start: float, end: float,
+                        thickness: float, clearance: float, max_cells: int) -> List[float]:
+    """Positions for up to max_cells - 1 internal walls that do not cut through any part
+
+    A wall can only go in a free space between parts that is wide enough for the wall plus
+    clearance on both sides.  Walls are placed in the free spaces closest to an even split.
+    """
+    if max_cells < 2 or len(intervals) < 2:
+        return []
+
+    merged = _merged_intervals(intervals)
+    needed = thickness + clearance * 2
+    candidates = [
+        middle(merged[i][1], merged[i + 1][0])
+        for i in range(len(merged) - 1)
+        if merged[i + 1][0] - merged[i][1] >= needed
+    ]
+    if len(candidates) < max_cells:
+        return candidates
+
+    positions = []
+    for i in range(1, max_cells):
+        ideal = start + i * (end - start) / max_cells
+        best = min((c for c in candidates if c not in positions), key=lambda c: abs(c - ideal))
+        positions.append(best)
+    return sorted(positions)
+
+
+def plan_cell_grid(part_boxes: Sequence[AABB], b_box: AABB, thickness: float, clearance: float,
+                   max_cells: int) -> CellGrid:
+    """Subdivides b_box with internal walls along each axis, at most max_cells per axis"""
+    walls = tuple(
+        axis_wall_positions(
+            [(b.as_tuple()[axis], b.as_tuple()[axis + 3]) for b in part_boxes],
+            b_box.as_tuple()[axis], b_box.as_tuple()[axis + 3],
+            thickness, clearance, max_cells
+        )
+        for axis in range(3)
+    )
+    return CellGrid(b_box, thickness, walls)
+
+
+def shell_walls(b_box: AABB, thickness: float, grid: CellGrid = None) -> Dict[str, AABB]:
+    """Splits the shell around b_box into non overlapping slabs
+
+    The x walls cover the full outer extents, the y walls fit between the x walls and the
+    z walls fit between all four side walls, so the union of the slabs is the shell.
+    Internal walls of a grid span the inside of the shell and are keyed x_0, x_1, ...
+    """
+    outer = b_box.grown(thickness)
+    walls = {
+        'x_neg': AABB(outer.min_x, outer.min_y, outer.min_z, b_box.min_x, outer.max_y, outer.max_z),
+        'x_pos': AABB(b_box.max_x, outer.min_y, outer.min_z, outer.max_x, outer.max_y, outer.max_z),
+        'y_neg': AABB(b_box.min_x, outer.min_y, outer.min_z, b_box.max_x, b_box.min_y, outer.max_z),
+        'y_pos': AABB(b_box.min_x, b_box.max_y, outer.min_z, b_box.max_x, outer.max_y, outer.max_z),
+        'z_neg': AABB(b_box.min_x, b_box.min_y, outer.min_z, b_box.max_x, b_box.max_y, b_box.min_z),
+        'z_pos': AABB(b_box.min_x, b_box.min_y, b_box.max_z, b_box.max_x, b_box.max_y, outer.max_z),
+    }
+    if grid is not None:
+        half = thickness / 2
+        for axis, positions in enumerate(grid.walls):
+            for i, p in enumerate(positions):
+                wall = list(b_box.as_tuple())
+                wall[axis] = p - half
+                wall[axis + 3] = p + half
+                walls[f'{AXES[axis]}_{i}'] = AABB(*wall)
+    return walls
+
+
+def wall_slot_boxes(b_box: AABB, gap: float, bar: Bar, thickness: float,
+                    grid: CellGrid = None) -> Dict[str, List[OBB]]:
+    """Boxes to subtract from each wall of a shell built around b_box to create the bar pattern
+
+    bar is a single width or one width per axis.  With a grid the slot pattern is laid out
+    separately in every cell so slots never cut into the internal walls.
+    """
+    center = b_box.center()
+    length, width, height = b_box.sides
+    if grid is None:
+        grid = CellGrid(b_box, thickness)
+    x_bar, y_bar, z_bar = axis_bars(bar)
+    xs = spans_slot_centers(grid.spans(0), gap, x_bar)
+    ys = spans_slot_centers(grid.spans(1), gap, y_bar)
+    zs = spans_slot_centers(grid.spans(2), gap, z_bar)
+
+    x_dir, y_dir, z_dir = x_axis(), y_axis(), z_axis()
+    x_walls = (center.x - (length + thickness) / 2, center.x + (length + thickness) / 2)
+    y_walls = (center.y - (width + thickness) / 2, center.y + (width + thickness) / 2)
+    z_walls = (center.z - (height + thickness) / 2, center.z + (height + thickness) / 2)
+
+    slots = {
+        'x_neg': [OBB(Vec3(x_walls[0], y, z), x_dir, y_dir, thickness, gap, gap) for z in zs for y in ys],
+        'x_pos': [OBB(Vec3(x_walls[1], y, z), x_dir, y_dir, thickness, gap, gap) for z in zs for y in ys],
+        'y_neg': [OBB(Vec3(x, y_walls[0], z), y_dir, x_dir, thickness, gap, gap) for z in zs for x in xs],
+        'y_pos': [OBB(Vec3(x, y_walls[1], z), y_dir, x_dir, thickness, gap, gap) for z in zs for x in xs],
+        'z_neg': [OBB(Vec3(x, y, z_walls[0]), z_dir, y_dir, thickness, gap, gap) for y in ys for x in xs],
+        'z_pos': [OBB(Vec3(x, y, z_walls[1]), z_dir, y_dir, thickness, gap, gap) for y in ys for x in xs],
+    }
+    for i, p in enumerate(grid.walls[0]):
+        slots[f'x_{i}'] = [OBB(Vec3(p, y, z), x_dir, y_dir, thickness, gap, gap) for z in zs for y in ys]
+    for i, p in enumerate(grid.walls[1]):
+        slots[f'y_{i}'] = [OBB(Vec3(x, p, z), y_dir, x_dir, thickness, gap, gap) for z in zs for x in xs]
+    for i, p in enumerate(grid.walls[2]):
+        slots[f'z_{i}'] = [OBB(Vec3(x, y, p), z_dir, y_dir, thickness, gap, gap) for y in ys for x in xs]
+    return slots
+
+
+def slot_boxes(b_box: AABB, gap: float, bar: Bar, thickness: float, grid: CellGrid = None) -> List[OBB]:
+    """Boxes to subtract from a shell built around b_box to create the bar pattern"""
+    walls = wall_slot_boxes(b_box, gap, bar, thickness, grid)
+    return [slot for slots in walls.values() for slot in slots]
+
+
+def rounded(values: Iterable[float], digits: int = 6) -> Tuple[float, ...]:
+    return tuple(round(value, digits) for value in values)
+
+
+def wall_signature(wall: AABB, slots: Sequence[OBB], origin: Vec3 = None) -> Tuple:
+    """Hashable description of a wall and its slots relative to origin
+
+    With the default origin, the minimum corner of the wall, equal walls get the same
+    signature wherever they are.  Pass the cage origin to also tell where the wall sits
+    in the cage.
+    """
+    origin = origin or wall.min_point
+    x, y, z = origin.x, origin.y, origin.z
+    return (
+        rounded((wall.min_x - x, wall.min_y - y, wall.min_z - z, wall.max_x - x, wall.max_y - y, wall.max_z - z)),
+        tuple(
+            rounded((s.center.x - x, s.center.y - y, s.center.z - z, s.length, s.width, s.height) +
+                    s.length_direction.as_tuple() + s.width_direction.as_tuple())
+            for s in slots
+        )
+    )
+
+
+# Corner quads of a box, corners indexed as i + 2j + 4k for the -/+ side along length, width, height
+_BOX_QUADS = ((0, 4, 6, 2), (1, 3, 7, 5), (0, 1, 5, 4), (2, 6, 7, 3), (0, 2, 3, 1), (4, 5, 7, 6))
+BOX_TRIANGLES = tuple(i for a, b, c, d in _BOX_QUADS for i in (a, b, c, a, c, d))
+
+
+def box_mesh(boxes: Sequence[OBB]) -> Tuple[List[float], List[int]]:
+    """Flat coordinate and triangle index lists for a set of boxes, drawn as a single mesh"""
+    coordinates = []
+    indices = []
+    for box in boxes:
+        c, l_dir, w_dir = box.center, box.length_direction, box.width_direction
+        h_dir = Vec3(
+            l_dir.y * w_dir.z - l_dir.z * w_dir.y,
+            l_dir.z * w_dir.x - l_dir.x * w_dir.z,
+            l_dir.x * w_dir.y - l_dir.y * w_dir.x
+        )
+        l_half, w_half, h_half = box.length / 2, box.width / 2, box.height / 2
+        base = len(coordinates) // 3
+        for k in (-h_half, h_half):
+            for j in (-w_half, w_half):
+                for i in (-l_half, l_half):
+                    coordinates.append(c.x + l_dir.x * i + w_dir.x * j + h_dir.x * k)
+                    coordinates.append(c.y + l_dir.y * i + w_dir.y * j + h_dir.y * k)
+                    coordinates.append(c.z + l_dir.z * i + w_dir.z * j + h_dir.z * k)
+        indices.extend(base + i for i in BOX_TRIANGLES)
+    return coordinates, indices
+
+
+def slot_mesh(b_box: AABB, gap: float, bar: Bar, thickness: float,
+              grid: CellGrid = None) -> Tuple[List[float], List[int]]:
+    return box_mesh(slot_boxes(b_box, gap, bar, thickness, grid))
+
+
+class SpatialHash:
+    """Uniform grid of buckets used to find boxes that may overlap a query box
+
+    Boxes covering more than max_box_cells cells, for example a large unrelated body in
+    the design, are kept in a list checked by every query instead of in the buckets.
+    """
+    __slots__ = ('cell_size', 'max_box_cells', 'buckets', 'boxes', 'oversized')
+
+    def __init__(self, cell_size: float, max_box_cells: int = 512):
+        self.cell_size = cell_size
+        self.max_box_cells = max_box_cells
+        self.buckets = {}
+        self.boxes = {}
+        self.oversized = []
+
+    def _cell_range(self, b_box: AABB):
+        size = self.cell_size
+        return (
+            range(int(math.floor(b_box.min_x / size)), int(math.floor(b_box.max_x / size)) + 1),
+            range(int(math.floor(b_box.min_y / size)), int(math.floor(b_box.max_y / size)) + 1),
+            range(int(math.floor(b_box.min_z / size)), int(math.floor(b_box.max_z / size)) + 1)
+        )
+
+    def insert(self, key, b_box: AABB):
+        self.boxes[key] = b_box
+        x_range, y_range, z_range = self._cell_range(b_box)
+        if len(x_range) * len(y_range) * len(z_range) > self.max_box_cells:
+            self.oversized.append(key)
+            return
+        for i in x_range:
+            for j in y_range:
+                for k in z_range:
+                    self.buckets.setdefault((i, j, k), []).append(key)
+
+    def query(self, b_box: AABB, tolerance: float = 0.0) -> List:
+        """Keys of all inserted boxes overlapping b_box by more than tolerance"""
+        boxes = self.boxes
+        found = [key for key in self.oversized if boxes[key].intersects(b_box, tolerance)]
+        seen = set()
+        x_range, y_range, z_range = self._cell_range(b_box)
+        buckets = self.buckets
+        if len(x_range) * len(y_range) * len(z_range) > len(buckets):
+            # Querying a huge box, checking the filled buckets is cheaper than the cells
+            cells = (cell for cell in buckets
+                     if cell[0] in x_range and cell[1] in y_range and cell[2] in z_range)
+        else:
+            cells = ((i, j, k) for i in x_range for j in y_range for k in z_range)
+        for cell in cells:
+            for key in buckets.get(cell, ()):
+                if key not in seen:
+                    seen.add(key)
+                    if boxes[key].intersects(b_box, tolerance):
+                        found.append(key)
+        return found
+
+    def is_free(self, b_box: AABB, tolerance: float = 0.0) -> bool:
+        """True if no inserted box overlaps b_box by more than tolerance, stops at the first one"""
+        boxes = self.boxes
+        if any(boxes[key].intersects(b_box, tolerance) for key in self.oversized):
+            return False
+        x_range, y_range, z_range = self._cell_range(b_box)
+        buckets = self.buckets
+        for i in x_range:
+            for j in y_range:
+                for k in z_range:
+                    for key in buckets.get((i, j, k), ()):
+                        if boxes[key].intersects(b_box, tolerance):
+                            return False
+        return True
+
+
+def hash_cell_size(boxes: Sequence[AABB], extent: AABB, max_cells_per_side: int = 32) -> float:
+    """Cell size around the median box size, capped so extent spans at most max_cells_per_side cells"""
+    if len(boxes) == 0:
+        return max(max(extent.sides), 1e-6)
+    sizes = sorted(max(sides) for sides in box_sides(boxes))
+    median = sizes[len(sizes) // 2]
+    return max(median, max(extent.sides) / max_cells_per_side, 1e-6)
+
+
+def principal_max_gap(body_sides: Sequence[float]) -> float:
+    """Largest gap that still traps a body with the given (principal axis aligned) sides"""
+    a, b = sorted(body_sides)[:2]
+    diagonal = math.sqrt(a * a + b * b)
+    max_side = diagonal / math.sqrt(2)
+    return max_side * .9
+
+
+def auto_gap_value(box_sides: Sequence[float], body_max_gaps: Sequence[float],
+                   thickness_value: float, bar_value: float) -> float:
+    """Heuristic bar spacing given the cage sides and the per body gap limits"""
+    gap_minimum = thickness_value * 2
+
+    main_box_max_gaps = [side for side in box_sides if side > gap_minimum]
+    if len(main_box_max_gaps) > 0:
+        main_box_max_gap = min(main_box_max_gaps)
+    else:
+        main_box_max_gap = thickness_value
+
+    body_gap_maximum = min(body_max_gaps)
+    short_side = min(box_sides)
+
+    four_gaps = (short_side - bar_value * 3) / 4
+    three_gaps = (short_side - bar_value * 2) / 3
+    two_gaps = (short_side - bar_value) / 2
+
+    if body_gap_maximum > main_box_max_gap:
+        new_gap = main_box_max_gap
+    elif short_side > body_gap_maximum:
+        new_gap = body_gap_maximum
+    elif (body_gap_maximum > two_gaps) and (two_gaps > gap_minimum):
+        new_gap = two_gaps
+    elif (body_gap_maximum > three_gaps) and (three_gaps > gap_minimum):
+        new_gap = three_gaps
+    elif (body_gap_maximum > four_gaps) and (four_gaps > gap_minimum):
+        new_gap = four_gaps
+    else:
+        new_gap = body_gap_maximum
+    return new_gap
+
+
+def wall_counts(grid: CellGrid) -> Tuple[int, int, int]:
+    """Number of walls normal to x, y and z including the internal walls"""
+    return tuple(2 + len(positions) for positions in grid.walls)
+
+
+def fitted_bar(spans: Sequence[Tuple[float, float]], gap: float, min_bar: float) -> float:
+    """Widest bar that keeps the slot count reached with min_bar in every span
+
+    The slots are spread over the span leaving half of min_bar at each end, so the extra
+    material goes into the bars instead of the margins.  Spans with a single slot do not
+    limit the bar, if no span has more than one slot min_bar is returned.
+    """
+    bar = None
+    for start, end in spans:
+        usable = end - start - min_bar
+        num, _ = axis_slot_layout(end - start, gap, min_bar)
+        if num > 1:
+            # Stay just below the width at which a slot would drop out
+            width = (usable - num * gap) / (num - 1) - 1e-9
+            bar = width if bar is None else min(bar, width)
+    return min_bar if bar is None else max(bar, min_bar)
+
+
+def gap_candidates(spans: Iterable[Tuple[float, float]], min_gap: float, max_gap: float, min_bar: float) -> List[float]:
+    """Largest gaps that still fit each slot count of a span, plus max_gap
+
+    A span of length fits num slots up to a gap of (length + min_bar) / num - min_bar.
+    Between two of these gaps the slot counts of all spans stay the same and the open
+    area grows with the gap, so the best layout is at one of them or at max_gap.
+    Raises ValueError unless min_gap and min_bar are positive.
+    """
+    if min_gap <= 0 or min_bar <= 0:
+        raise ValueError(f'Bar spacing and bar width must be positive, got {min_gap} and {min_bar}')
+    candidates = {max_gap}
+    for start, end in spans:
+        length = end - start
+        num = 1
+        while True:
+            gap = (length + min_bar) / num - min_bar
+            if gap < min_gap:
+                break
+            if gap <= max_gap:
+                # Rounding can leave the exact breakpoint one slot short
+                while gap > min_gap and axis_slot_layout(length, gap, min_bar)[0] < num:
+                    gap -= 1e-9
+                candidates.add(gap)
+            num += 1
+    return sorted(candidates)
+
+
+def layout_open_area(grid: CellGrid, gap: float, bars: Sequence[float]) -> Tuple[float, int]:
+    """Total slot area on all walls and the number of slots"""
+    counts = [
+        sum(axis_slot_layout(end - start, gap, bars[axis])[0] for start, end in grid.spans(axis))
+        for axis in range(3)
+    ]
+    x_walls, y_walls, z_walls = wall_counts(grid)
+    slots = x_walls * counts[1] * counts[2] + y_walls * counts[0] * counts[2] + z_walls * counts[0] * counts[1]
+    return slots * gap * gap, slots
+
+
+def optimize_slot_layout(b_box: AABB, thickness: float, min_gap: float, max_gap: float, min_bar: float,
+                         grid: CellGrid = None) -> Tuple[float, Tuple[float, float, float], float]:
+    """Gap and per axis bar widths that leave the least cage material
+
+    Every wall is the same solid slab minus its slots, so minimizing the cage volume is
+    maximizing the open slot area.  max_gap is the largest gap that still holds the parts
+    and wins over min_gap if they conflict.  Bars are at least min_bar wide and widened
+    along each axis so the slots spread evenly over the walls.
+    Returns the gap, the bar widths along x, y and z and the open area.
+    Raises ValueError unless min_bar and the smaller of min_gap and max_gap are positive.
+    """
+    if grid is None:
+        grid = CellGrid(b_box, thickness)
+    min_gap = min(min_gap, max_gap)
+    min_bars = (min_bar, min_bar, min_bar)
+    spans = [grid.spans(axis) for axis in range(3)]
+
+    best = None
+    for gap in gap_candidates((span for axis_spans in spans for span in axis_spans), min_gap, max_gap, min_bar):
+        area, slots = layout_open_area(grid, gap, min_bars)
+        # Prefer the larger gap on ties, fewer slots are cheaper to cut
+        if best is None or area >= best[0] * (1 - 1e-9):
+            best = (area, gap)
+
+    area, gap = best
+    bars = tuple(fitted_bar(spans[axis], gap, min_bar) for axis in range(3))
+    return gap, bars, layout_open_area(grid, gap, bars)[0]
@@ -0,0 +1,75 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Volume, mass and surface area of a cage computed from its dimensions and slot counts.
+# The cage is slabs with box shaped slots, so the values are exact without building a
+# BRep body, and the cost does not depend on the number of slots.
+from dataclasses import dataclass
+
+from .SinterBoxGeometry import AABB, Bar, CellGrid, axis_bars, layout_open_area, shell_walls
+
+
+@dataclass(frozen=True)
+class CageMetrics:
+    """Values in internal units (cm, cm^2, cm^3), mass in grams"""
+    volume: float
+    mass: float
+    surface_area: float
+    open_area: float
+    open_fraction: float
+    slot_count: int
+
+
+def solid_wall_volume(b_box: AABB, thickness: float, grid: CellGrid) -> float:
+    """Volume of the walls before slotting
+
+    The outer slabs do not overlap, internal walls of different axes cross each other in
+    columns of thickness x thickness which are only counted once.
+    """
+    volume = sum(wall.volume for wall in shell_walls(b_box, thickness, grid).values())
+    nx, ny, nz = (len(positions) for positions in grid.walls)
+    length, width, height = b_box.sides
+    area = thickness * thickness
+    volume -= area * (nx * ny * height + nx * nz * width + ny * nz * length)
+    volume += nx * ny * nz * area * thickness
+    return volume
+
+
+def cell_surface_area(grid: CellGrid) -> float:
+    """Inner surface of all cells, every cell is a box bounded by the walls"""
+    sums = [sum(end - start for start, end in grid.spans(axis)) for axis in range(3)]
+    counts = grid.shape
+    return 2 * (sums[0] * sums[1] * counts[2] + sums[1] * sums[2] * counts[0] + sums[0] * sums[2] * counts[1])
+
+
+def cage_metrics(b_box: AABB, thickness: float, gap: float, bar: Bar, grid: CellGrid = None,
+                 density: float = 1.0) -> CageMetrics:
+    """Metrics of the cage built around b_box, density in g/cm^3
+
+    Every slot goes through one wall and stays clear of the others, so it removes
+    thickness x gap x gap of material, two gap x gap faces and adds four thickness x gap
+    faces.  open_fraction is the slot area over the face area of all walls.
+    """
+    if grid is None:
+        grid = CellGrid(b_box, thickness)
+    open_area, slots = layout_open_area(grid, gap, axis_bars(bar))
+
+    wall_volume = solid_wall_volume(b_box, thickness, grid)
+    volume = wall_volume - open_area * thickness
+
+    outer = b_box.grown(thickness)
+    length, width, height = outer.sides
+    surface_area = 2 * (length * width + width * height + length * height) + cell_surface_area(grid)
+    surface_area += slots * (4 * gap * thickness) - 2 * open_area
+
+    wall_area = wall_volume / thickness if thickness > 0 else 0.0
+    open_fraction = open_area / wall_area if wall_area > 0 else 0.0
+    return CageMetrics(volume, volume * density, surface_area, open_area, open_fraction, slots)
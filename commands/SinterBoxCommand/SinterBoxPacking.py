@@ -0,0 +1,240 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Packs part bounding boxes into a compact block before the cage is built around them.
+# Like SinterBoxGeometry this is pure math so it can run in the geometry worker.
+import math
+from typing import List, Sequence, Tuple
+
+from .SinterBoxGeometry import AABB, Vec3, SpatialHash, combine_boxes, hash_cell_size
+
+# Orientations reachable with 90 degree rotations that give different box sides.  Each entry
+# is the axis permutation (new side i is old side p[i]) and the matching rotation matrix rows.
+ROTATIONS: Tuple[Tuple[Tuple[int, int, int], Tuple[Tuple[int, int, int], ...]], ...] = (
+    ((0, 1, 2), ((1, 0, 0), (0, 1, 0), (0, 0, 1))),
+    ((1, 2, 0), ((0, 1, 0), (0, 0, 1), (1, 0, 0))),
+    ((2, 0, 1), ((0, 0, 1), (1, 0, 0), (0, 1, 0))),
+    ((1, 0, 2), ((0, -1, 0), (1, 0, 0), (0, 0, 1))),
+    ((0, 2, 1), ((-1, 0, 0), (0, 0, 1), (0, 1, 0))),
+    ((2, 1, 0), ((0, 0, -1), (0, 1, 0), (1, 0, 0))),
+)
+
+# Allowed overlap of neighbouring boxes, they may touch
+PACKING_TOLERANCE = 1e-7
+
+# Expected ratio of part box volume to block volume, sizes the footprint of the block
+FILL_ESTIMATE = 0.7
+
+
+class Packing:
+    """Result of packing: for every source box its rotation index and packed box"""
+    __slots__ = ('source_boxes', 'spacing', 'rotations', 'boxes')
+
+    def __init__(self, source_boxes: List[AABB], spacing: float, rotations: List[int], boxes: List[AABB]):
+        self.source_boxes = source_boxes
+        self.spacing = spacing
+        self.rotations = rotations
+        self.boxes = boxes
+
+    def matches(self, source_boxes: Sequence[AABB], spacing: float) -> bool:
+        return spacing == self.spacing and list(source_boxes) == self.source_boxes
+
+    def transform(self, index: int) -> Tuple[Tuple[Tuple[int, int, int], ...], Vec3, Vec3]:
+        """Rotation rows, source center and packed center of a box
+
+        A point p of the part moves to packed_center + R * (p - source_center).
+        """
+        return ROTATIONS[self.rotations[index]][1], self.source_boxes[index].center(), self.boxes[index].center()
+
+    @property
+    def volume(self) -> float:
+        return combine_boxes(self.boxes).volume if self.boxes else 0.0
+
+
+def rotated_sides(sides: Sequence[float], rotation: int) -> Tuple[float, float, float]:
+    permutation = ROTATIONS[rotation][0]
+    return sides[permutation[0]], sides[permutation[1]], sides[permutation[2]]
+
+
+def distinct_rotations(sides: Sequence[float]) -> List[int]:
+    """Rotations giving different sides, a cube only needs one"""
+    seen = {}
+    for rotation in range(len(ROTATIONS)):
+        seen.setdefault(tuple(round(side, 9) for side in rotated_sides(sides, rotation)), rotation)
+    return sorted(seen.values())
+
+
+_OTHER_AXES = ((1, 2), (0, 2), (0, 1))
+
+
+def _inside(point: Tuple[float, float, float], box: Tuple[float, ...]) -> bool:
+    """True if a box placed at point would overlap box, points on its maximum faces are free"""
+    return box[0] - PACKING_TOLERANCE <= point[0] < box[3] - PACKING_TOLERANCE and \
+        box[1] - PACKING_TOLERANCE <= point[1] < box[4] - PACKING_TOLERANCE and \
+        box[2] - PACKING_TOLERANCE <= point[2] < box[5] - PACKING_TOLERANCE
+
+
+def _clip_free(point: Tuple[float, float, float], free: List[float], box: Tuple[float, ...]):
+    """Shortens the free distances from point along +x, +y and +z that run into box"""
+    for axis in range(3):
+        i, j = _OTHER_AXES[axis]
+        if box[axis] >= point[axis] - PACKING_TOLERANCE and \
+                box[i] - PACKING_TOLERANCE <= point[i] < box[i + 3] - PACKING_TOLERANCE and \
+                box[j] - PACKING_TOLERANCE <= point[j] < box[j + 3] - PACKING_TOLERANCE:
+            free[axis] = min(free[axis], box[axis] - point[axis])
+
+
+def _ray_boxes(index: SpatialHash, point: Tuple[float, float, float], axis: int, end: float) \
+        -> List[Tuple[float, ...]]:
+    """Placed boxes touching the segment from point to end along axis"""
+    ray = list(point + point)
+    ray[axis] = min(point[axis], end)
+    ray[axis + 3] = max(point[axis], end)
+    return [index.boxes[key].as_tuple() for key in index.query(AABB(*ray), -2 * PACKING_TOLERANCE)]
+
+
+def _clip_free_near(index: SpatialHash, point: Tuple[float, float, float], free: List[float], top: float):
+    """_clip_free with only the placed boxes along the +x, +y and +z rays from point
+
+    No placed box reaches above top, so the +z ray ends there.
+    """
+    for axis in range(3):
+        end = point[axis] + free[axis] if axis < 2 else top
+        for box in _ray_boxes(index, point, axis, end):
+            _clip_free(point, free, box)
+
+
+def _project(point: Tuple[float, float, float], axis: int, index: SpatialHash) -> Tuple[float, float, float]:
+    """Moves point towards -axis until it reaches the face of a placed box or 0"""
+    i, j = _OTHER_AXES[axis]
+    limit = 0.0
+    for box in _ray_boxes(index, point, axis, 0.0):
+        if limit < box[axis + 3] <= point[axis] + PACKING_TOLERANCE and \
+                box[i] - PACKING_TOLERANCE <= point[i] < box[i + 3] - PACKING_TOLERANCE and \
+                box[j] - PACKING_TOLERANCE <= point[j] < box[j + 3] - PACKING_TOLERANCE:
+            limit = box[axis + 3]
+    projected = list(point)
+    projected[axis] = limit
+    return tuple(projected)
+
+
+def index_boxes(index: SpatialHash, point: Tuple[float, float, float]) -> List[Tuple[float, ...]]:
+    """Placed boxes around point"""
+    probe = AABB(point[0], point[1], point[2], point[0], point[1], point[2])
+    return [index.boxes[key].as_tuple() for key in index.query(probe, -PACKING_TOLERANCE)]
+
+
+def pack_boxes(source_boxes: Sequence[AABB], spacing: float, allow_rotation: bool = True,
+               origin: Vec3 = None) -> Packing:
+    """Places the boxes in a compact block with at least spacing between them
+
+    Extreme point heuristic: the boxes are placed largest first on a square footprint
+    sized for a roughly cubic block.  Each box goes to the free extreme point and
+    orientation that keeps the block lowest, then closest to the origin.  Candidates are
+    scored before they are checked against the placed boxes through a spatial hash, so
+    only the best few candidates of each box need a collision query.  The same hash gives
+    the boxes that limit the free room of a new extreme point.  The block starts at
+    origin, the minimum corner of the source boxes by default.
+    """
+    source_boxes = [box.copy() for box in source_boxes]
+    count = len(source_boxes)
+    if count == 0:
+        return Packing([], spacing, [], [])
+
+    origin = origin or combine_boxes(source_boxes).min_point
+    padded_sides = [tuple(side + spacing for side in box.sides) for box in source_boxes]
+    order = sorted(range(count), key=lambda i: padded_sides[i][0] * padded_sides[i][1] * padded_sides[i][2],
+                   reverse=True)
+
+    total_volume = sum(a * b * c for a, b, c in padded_sides)
+    # Every box has to fit on the footprint standing on its smallest side
+    footprint = max(
+        (total_volume / FILL_ESTIMATE) ** (1 / 3), max(sorted(sides)[1] for sides in padded_sides)
+    )
+    index = SpatialHash(hash_cell_size(
+        [AABB(0, 0, 0, *sides) for sides in padded_sides], AABB(0, 0, 0, *([2 * total_volume ** (1 / 3)] * 3))
+    ))
+    # Extreme points with the free distance from each along +x, +y and +z.  Points without
+    # room for the smallest remaining box are dropped, they can only get more crowded.
+    points = {(0.0, 0.0, 0.0): [footprint, footprint, math.inf]}
+    smallest_left = [0.0] * count
+    smallest = math.inf
+    for n in range(count - 1, -1, -1):
+        smallest = min(smallest, min(padded_sides[order[n]]))
+        smallest_left[n] = smallest
+    top = 0.0
+    rotations = [0] * count
+    padded_boxes = [None] * count
+
+    for n, i in enumerate(order):
+        sides = padded_sides[i]
+        options = [(rotation, rotated_sides(sides, rotation))
+                   for rotation in (distinct_rotations(sides) if allow_rotation else [0])]
+
+        candidates = []
+        for point, free in points.items():
+            for rotation, (a, b, c) in options:
+                if a <= free[0] + PACKING_TOLERANCE and b <= free[1] + PACKING_TOLERANCE and \
+                        c <= free[2] + PACKING_TOLERANCE:
+                    far = (point[0] + a, point[1] + b, point[2] + c)
+                    candidates.append((max(top, far[2]), far[2], far[0] + far[1], point, rotation, far))
+        candidates.sort(key=lambda candidate: candidate[:3])
+
+        for _, _, _, point, rotation, far in candidates:
+            box = AABB(point[0], point[1], point[2], far[0], far[1], far[2])
+            if index.is_free(box, PACKING_TOLERANCE):
+                break
+        else:
+            # Nothing fits at the extreme points, start a new layer on top
+            rotation, (a, b, c) = min(options, key=lambda option: max(option[1][:2]))
+            point = (0.0, 0.0, top)
+            far = (a, b, top + c)
+            box = AABB(0.0, 0.0, top, a, b, far[2])
+
+        index.insert(i, box)
+        box_tuple = box.as_tuple()
+        rotations[i] = rotation
+        padded_boxes[i] = box
+        top = max(top, far[2])
+
+        new_points = []
+        for new_point in ((far[0], point[1], point[2]), (point[0], far[1], point[2]), (point[0], point[1], far[2])):
+            new_points.append(new_point)
+            for axis in range(3):
+                if new_point[axis] > 0:
+                    new_points.append(_project(new_point, axis, index))
+
+        room = smallest_left[n + 1] - PACKING_TOLERANCE if n + 1 < count else math.inf
+        remaining = {}
+        for other, free in points.items():
+            if not _inside(other, box_tuple):
+                _clip_free(other, free, box_tuple)
+                if min(free) >= room:
+                    remaining[other] = free
+        for new_point in new_points:
+            if new_point in remaining or new_point[0] >= footprint or new_point[1] >= footprint:
+                continue
+            if any(_inside(new_point, other) for other in index_boxes(index, new_point)):
+                continue
+            free = [footprint - new_point[0], footprint - new_point[1], math.inf]
+            _clip_free_near(index, new_point, free, top)
+            if min(free) >= room:
+                remaining[new_point] = free
+        points = remaining
+
+    boxes = []
+    for box in padded_boxes:
+        min_x, min_y, min_z, max_x, max_y, max_z = box.as_tuple()
+        boxes.append(AABB(
+            origin.x + min_x, origin.y + min_y, origin.z + min_z,
+            origin.x + max_x - spacing, origin.y + max_y - spacing, origin.z + max_z - spacing
+        ))
+    return Packing(source_boxes, spacing, rotations, boxes)
@@ -0,0 +1,221 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Stores the parameters and layout of a Sinterbox as attributes on its component so the
+# cage can be regenerated after the enclosed parts move.
+import hashlib
+import json
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+import adsk.core
+import adsk.fusion
+
+from ... import config
+from ...lib import fusion360utils as futil
+from .SinterBoxGeometry import AABB, CellGrid
+from .SinterBoxUtils import FeatureValues, bounding_boxes_from_selections, cage_wall_signatures, create_cage_body, \
+    get_design, combine_boxes, moved_copy, plan_grid, rebuild_cage_body
+
+DEFINITION_ATTRIBUTE = 'definition'
+ROLE_ATTRIBUTE = 'role'
+CAGE_ROLE = 'cage'
+# Version 2 stores the wall digests relative to the cage, version 1 digests are ignored
+DEFINITION_VERSION = 2
+
+# Boxes closer than this (internal units, cm) are treated as unchanged
+TOLERANCE = 1e-6
+
+
+@dataclass
+class StoredDefinition:
+    feature_values: FeatureValues
+    b_box: AABB
+    body_tokens: List[str] = field(default_factory=list)
+    walls: Dict[str, str] = field(default_factory=dict)
+    base_feature_token: str = ''
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'version': DEFINITION_VERSION,
+            'feature_values': asdict(self.feature_values),
+            'b_box': list(self.b_box.as_tuple()),
+            'body_tokens': self.body_tokens,
+            'walls': self.walls,
+            'base_feature_token': self.base_feature_token,
+        })
+
+    @classmethod
+    def from_json(cls, value: str) -> 'StoredDefinition':
+        data = json.loads(value)
+        return cls(
+            FeatureValues(**data['feature_values']),
+            AABB(*data['b_box']),
+            data.get('body_tokens', []),
+            data.get('walls', {}) if data.get('version', 1) >= 2 else {},
+            data.get('base_feature_token', '')
+        )
+
+
+def wall_digests(b_box: AABB, feature_values: FeatureValues, grid: CellGrid = None) -> Dict[str, str]:
+    signatures = cage_wall_signatures(b_box, feature_values, grid)
+    return {key: hashlib.sha1(repr(signature).encode()).hexdigest() for key, signature in signatures.items()}
+
+
+def cage_box(b_box: AABB, feature_values: FeatureValues) -> AABB:
+    return b_box.offset(
+        feature_values.x_pos, feature_values.x_neg,
+        feature_values.y_pos, feature_values.y_neg,
+        feature_values.z_pos, feature_values.z_neg
+    )
+
+
+def save_definition(component: adsk.fusion.Component, definition: StoredDefinition):
+    component.attributes.add(config.ATTRIBUTE_GROUP, DEFINITION_ATTRIBUTE, definition.to_json())
+
+
+def load_definition(component: adsk.fusion.Component) -> Optional[StoredDefinition]:
+    attribute = component.attributes.itemByName(config.ATTRIBUTE_GROUP, DEFINITION_ATTRIBUTE)
+    if attribute is None:
+        return None
+    try:
+        return StoredDefinition.from_json(attribute.value)
+    except (ValueError, KeyError, TypeError):
+        futil.handle_error(f'Invalid Sinterbox definition on {component.name}')
+        return None
+
+
+def is_sinterbox(occurrence: adsk.fusion.Occurrence) -> bool:
+    attribute = occurrence.component.attributes.itemByName(config.ATTRIBUTE_GROUP, DEFINITION_ATTRIBUTE)
+    return attribute is not None
+
+
+def tag_cage_body(body: adsk.fusion.BRepBody):
+    body.attributes.add(config.ATTRIBUTE_GROUP, ROLE_ATTRIBUTE, CAGE_ROLE)
+
+
+def is_cage_body(body: adsk.fusion.BRepBody) -> bool:
+    attribute = body.attributes.itemByName(config.ATTRIBUTE_GROUP, ROLE_ATTRIBUTE)
+    return attribute is not None and attribute.value == CAGE_ROLE
+
+
+def find_cage_body(component: adsk.fusion.Component) -> Optional[adsk.fusion.BRepBody]:
+    body: adsk.fusion.BRepBody
+    for body in component.bRepBodies:
+        if is_cage_body(body):
+            return body
+    return None
+
+
+def resolve_bodies(design: adsk.fusion.Design, tokens: List[str]) -> List[adsk.fusion.BRepBody]:
+    bodies = []
+    for token in tokens:
+        for entity in design.findEntityByToken(token):
+            if isinstance(entity, adsk.fusion.BRepBody) and entity.isValid:
+                bodies.append(entity)
+                break
+    return bodies
+
+
+def _same_box(b_box_1: AABB, b_box_2: AABB) -> bool:
+    return all(abs(v1 - v2) <= TOLERANCE for v1, v2 in zip(b_box_1.as_tuple(), b_box_2.as_tuple()))
+
+
+def replace_cage_body(design: adsk.fusion.Design, component: adsk.fusion.Component,
+                      definition: StoredDefinition, new_brep: adsk.fusion.BRepBody):
+    old_body = find_cage_body(component)
+
+    if design.designType == adsk.fusion.DesignTypes.ParametricDesignType:
+        base_feature = None
+        if definition.base_feature_token:
+            for entity in design.findEntityByToken(definition.base_feature_token):
+                if isinstance(entity, adsk.fusion.BaseFeature):
+                    base_feature = entity
+                    break
+
+        if base_feature is not None and base_feature.bodies.count > 0:
+            base_feature.startEdit()
+            base_feature.updateBody(base_feature.bodies.item(0), new_brep)
+            base_feature.finishEdit()
+            new_body = find_cage_body(component) or base_feature.bodies.item(0)
+        else:
+            base_feature = component.features.baseFeatures.add()
+            base_feature.startEdit()
+            new_body = component.bRepBodies.add(new_brep, base_feature)
+            base_feature.finishEdit()
+            if old_body is not None:
+                component.features.removeFeatures.add(old_body)
+            definition.base_feature_token = base_feature.entityToken
+
+    else:
+        if old_body is not None:
+            old_body.deleteMe()
+        new_body = component.bRepBodies.add(new_brep)
+
+    new_body.name = config.DEFAULT_COMPONENT_NAME
+    if find_cage_body(component) is None:
+        tag_cage_body(new_body)
+
+
+def update_sinterbox(occurrence: adsk.fusion.Occurrence, feature_values: FeatureValues = None) -> str:
+    """Rebuilds the cage of an existing Sinterbox if its parts or parameters changed
+
+    Only the walls whose digest changed are slotted again, the others are taken from the
+    existing cage body.  Returns a short message describing what was done.
+    """
+    component = occurrence.component
+    definition = load_definition(component)
+    if definition is None:
+        return f'{occurrence.name} is not a Sinterbox'
+
+    design = get_design()
+    bodies = resolve_bodies(design, definition.body_tokens)
+    if len(bodies) == 0:
+        return f'{occurrence.name}: none of the enclosed bodies could be found'
+
+    new_feature_values = feature_values or definition.feature_values
+    part_boxes = bounding_boxes_from_selections(bodies)
+    b_box = combine_boxes(part_boxes)
+    if _same_box(b_box, definition.b_box) and new_feature_values == definition.feature_values:
+        return f'{occurrence.name} is up to date'
+
+    old_cage_box = cage_box(definition.b_box, definition.feature_values)
+    new_cage_box = cage_box(b_box, new_feature_values)
+    grid = plan_grid(part_boxes, new_cage_box, new_feature_values)
+    walls = wall_digests(new_cage_box, new_feature_values, grid)
+    changed = [key for key in walls if walls[key] != definition.walls.get(key)]
+    changed += [key for key in definition.walls if key not in walls]
+    old_body = find_cage_body(component)
+    moved = not _same_box(new_cage_box, old_cage_box)
+
+    rebuilt = [key for key in walls if key in changed]
+    if len(changed) == 0 and old_body is not None:
+        if moved:
+            # Same cage in a new place, move the existing body instead of rebuilding it
+            new_brep = moved_copy(old_body, new_cage_box.min_point - old_cage_box.min_point)
+            replace_cage_body(design, component, definition, new_brep)
+    elif old_body is not None and len(definition.walls) > 0:
+        new_brep = rebuild_cage_body(old_body, old_cage_box, new_cage_box, new_feature_values, grid, rebuilt)
+        replace_cage_body(design, component, definition, new_brep)
+    else:
+        rebuilt = list(walls)
+        new_brep = create_cage_body(new_cage_box, new_feature_values, grid)
+        replace_cage_body(design, component, definition, new_brep)
+
+    definition.feature_values = new_feature_values
+    definition.b_box = b_box
+    definition.walls = walls
+    definition.body_tokens = [body.entityToken for body in bodies]
+    save_definition(component, definition)
+
+    if len(changed) == 0 and old_body is not None:
+        return f'{occurrence.name}: cage moved' if moved else f'{occurrence.name} is up to date'
+    return f'{occurrence.name}: cage rebuilt, {len(rebuilt)} of {len(walls)} walls slotted again'
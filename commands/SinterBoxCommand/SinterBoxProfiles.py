@@ -0,0 +1,80 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Printer profiles from config.PRINTER_PROFILES.  The expressions are evaluated once per
+# unit system and the results kept, so dialogs and batch runs only look up floats.
+from dataclasses import dataclass
+from typing import Dict, List
+
+import adsk.fusion
+
+from ... import config
+
+METRIC = 'metric'
+INCH = 'inch'
+
+INCH_UNITS = [adsk.fusion.DistanceUnits.InchDistanceUnits, adsk.fusion.DistanceUnits.FootDistanceUnits]
+
+
+@dataclass(frozen=True)
+class PrinterProfile:
+    """Profile values in internal units (cm), density in g/cm^3"""
+    name: str
+    thickness: float
+    bar: float
+    gap: float
+    offset: float
+    min_bar: float
+    min_gap: float
+    density: float = config.DEFAULT_DENSITY
+
+
+# Evaluated profiles by unit system
+_profiles: Dict[str, Dict[str, PrinterProfile]] = {}
+
+
+def unit_system(design: adsk.fusion.Design) -> str:
+    try:
+        if design.fusionUnitsManager.distanceDisplayUnits in INCH_UNITS:
+            return INCH
+    except AttributeError:
+        pass
+    return METRIC
+
+
+def profile_names() -> List[str]:
+    return list(config.PRINTER_PROFILES)
+
+
+def load_profiles(design: adsk.fusion.Design) -> Dict[str, PrinterProfile]:
+    system = unit_system(design)
+    profiles = _profiles.get(system)
+    if profiles is None:
+        evaluate = design.unitsManager.evaluateExpression
+        profiles = {}
+        for name, unit_sets in config.PRINTER_PROFILES.items():
+            values = unit_sets.get(system, unit_sets[METRIC])
+            profiles[name] = PrinterProfile(
+                name, **{key: evaluate(value) for key, value in values.items()},
+                density=unit_sets.get('density', config.DEFAULT_DENSITY)
+            )
+        _profiles[system] = profiles
+    return profiles
+
+
+def get_profile(design: adsk.fusion.Design, name: str = None) -> PrinterProfile:
+    """The named profile, unknown names and None give the default profile"""
+    profiles = load_profiles(design)
+    return profiles.get(name) or profiles[config.DEFAULT_PROFILE]
+
+
+def clear_profile_cache():
+    _profiles.clear()
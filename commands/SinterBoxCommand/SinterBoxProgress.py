@@ -0,0 +1,100 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import time
+
+import adsk
+import adsk.core
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+# Seconds between updates of the dialog, Fusion only repaints and handles the Cancel
+# button while adsk.doEvents runs
+YIELD_INTERVAL = 0.1
+
+# Seconds before the dialog appears, short commits finish without it flashing up
+DIALOG_DELAY = 1
+
+
+class CommitCancelled(Exception):
+    pass
+
+
+class Progress:
+    """Counts the steps of a long operation and optionally shows them in a progress dialog
+
+    step() is called after every boolean or body move.  At most every YIELD_INTERVAL it
+    updates the dialog, lets Fusion process events and raises CommitCancelled if Cancel
+    was clicked.  A command undoes what was done so far by setting executeFailed.
+    """
+
+    def __init__(self, dialog: adsk.core.ProgressDialog = None):
+        self.dialog = dialog
+        self.value = 0
+        self.last_yield = time.perf_counter()
+
+    @classmethod
+    def show(cls, title: str, total: int) -> 'Progress':
+        dialog = ui.createProgressDialog()
+        dialog.isCancelButtonShown = True
+        dialog.cancelButtonText = 'Cancel'
+        dialog.show(title, '%p% (%v of %m steps)', 0, max(total, 1), DIALOG_DELAY)
+        return cls(dialog)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.dialog is not None and self.dialog.wasCancelled
+
+    def set_total(self, total: int):
+        """Changes the number of steps, for totals only known after the dialog was shown"""
+        if self.dialog is not None:
+            self.dialog.maximumValue = max(total, 1)
+
+    def step(self, count: int = 1, message: str = None):
+        self.value += count
+        if self.dialog is None:
+            return
+
+        now = time.perf_counter()
+        if now - self.last_yield < YIELD_INTERVAL:
+            return
+        self.last_yield = now
+        self.dialog.progressValue = min(self.value, self.dialog.maximumValue)
+        if message is not None:
+            self.dialog.message = message
+        adsk.doEvents()
+        self.check()
+
+    def check(self):
+        if self.cancelled:
+            raise CommitCancelled()
+
+    def close(self):
+        if self.dialog is not None:
+            self.dialog.hide()
+            self.dialog = None
+
+    def __enter__(self) -> 'Progress':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class NoProgress(Progress):
+    """Progress that is not reported, steps are not counted so a single instance is shared"""
+
+    def step(self, count: int = 1, message: str = None):
+        pass
+
+
+NO_PROGRESS = NoProgress()
@@ -0,0 +1,128 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Records the events of a Sinterbox command session with the values of all inputs, one
+# JSON object per line, so tools/replay_session.py can drive the same sequence headless.
+import json
+import time
+import uuid
+from typing import Any, Dict, Optional, Set
+
+import adsk.core
+import adsk.fusion
+
+from ...lib import fusion360utils as futil
+
+logger = futil.get_logger('SessionRecorder')
+
+# Input types whose value is stored, by objectType
+VALUE_TYPES = (
+    adsk.core.ValueCommandInput.classType(),
+    adsk.core.DistanceValueCommandInput.classType(),
+    adsk.core.BoolValueCommandInput.classType(),
+    adsk.core.IntegerSpinnerCommandInput.classType(),
+)
+
+
+def input_value(command_input: adsk.core.CommandInput) -> Any:
+    """JSON value of an input, None for inputs without a value worth replaying"""
+    object_type = command_input.objectType
+    if object_type in VALUE_TYPES:
+        return command_input.value
+    if object_type == adsk.core.DropDownCommandInput.classType():
+        selected = command_input.selectedItem
+        return selected.name if selected is not None else None
+    if object_type == adsk.core.SelectionCommandInput.classType():
+        return [command_input.selection(i).entity.entityToken for i in range(command_input.selectionCount)]
+    return None
+
+
+def input_values(inputs: adsk.core.CommandInputs, values: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Values of all inputs by id, including the inputs inside groups"""
+    values = {} if values is None else values
+    for command_input in inputs:
+        if command_input.objectType == adsk.core.GroupCommandInput.classType():
+            input_values(command_input.children, values)
+            continue
+        value = input_value(command_input)
+        if value is not None:
+            values[command_input.id] = value
+    return values
+
+
+def body_record(body: adsk.fusion.BRepBody) -> Dict[str, Any]:
+    b_box = body.boundingBox
+    min_p, max_p = b_box.minPoint, b_box.maxPoint
+    return {
+        'name': body.name,
+        'box': [min_p.x, min_p.y, min_p.z, max_p.x, max_p.y, max_p.z],
+        'volume': body.volume,
+    }
+
+
+class SessionRecorder:
+    """Appends the events of one command session to a JSON lines file
+
+    Every record holds the event, the seconds since the command was created and the
+    values of all inputs at that moment.  Bodies are described (bounding box and volume)
+    the first time they are selected, so a replay can stand in for them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.session = uuid.uuid4().hex
+        self.start = time.perf_counter()
+        self.known_bodies: Set[str] = set()
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def record(self, event: str, inputs: adsk.core.CommandInputs, input_id: str = None, **fields):
+        values = input_values(inputs)
+        entry = {
+            'session': self.session,
+            'event': event,
+            'time': round(time.perf_counter() - self.start, 6),
+            'values': values,
+        }
+        if input_id is not None:
+            entry['input'] = input_id
+
+        new_bodies = self.new_bodies(inputs)
+        if len(new_bodies) > 0:
+            entry['bodies'] = new_bodies
+        entry.update(fields)
+        self.file.write(json.dumps(entry) + '\n')
+
+    def new_bodies(self, inputs: adsk.core.CommandInputs) -> Dict[str, Dict[str, Any]]:
+        selection_input: adsk.core.SelectionCommandInput = inputs.itemById('body_select')
+        if selection_input is None:
+            return {}
+        bodies = {}
+        for i in range(selection_input.selectionCount):
+            body = selection_input.selection(i).entity
+            token = body.entityToken
+            if token not in self.known_bodies:
+                self.known_bodies.add(token)
+                bodies[token] = body_record(body)
+        return bodies
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+            logger.info('Session recorded to %s', self.path, session=self.session)
+
+
+def open_recorder(path: str) -> Optional[SessionRecorder]:
+    try:
+        return SessionRecorder(path)
+    except OSError:
+        futil.handle_error(f'Cannot record the session to {path}')
+        return None
@@ -9,15 +9,20 @@
 #  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
 #  UNINTERRUPTED OR ERROR FREE.
 
-import math
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import adsk.core
 import adsk.fusion
 
-from ... import config
 from ...lib import fusion360utils as futil
+from .SinterBoxGeometry import Vec3, AABB, OBB, CellGrid, combine_boxes, principal_max_gap, \
+    auto_gap_value, shell_walls, wall_slot_boxes, wall_signature, plan_cell_grid, optimize_slot_layout, WALL_KEYS
+from .SinterBoxMetrics import CageMetrics, cage_metrics
+from .SinterBoxPacking import Packing
+from .SinterBoxProfiles import get_profile
+from .SinterBoxProgress import NO_PROGRESS, Progress
 
 app = adsk.core.Application.get()
 ui = app.userInterface
@@ -34,33 +39,38 @@ class FeatureValues:
     y_neg: float
     z_pos: float
     z_neg: float
+    cells: int = 1
+    bars: Optional[List[float]] = None
 
+    @property
+    def slot_bar(self):
+        """Bar width used to lay out the slots, one per axis if the layout was optimized"""
+        return tuple(self.bars) if self.bars else self.bar
 
-def middle(min_p_value: float, max_p_value: float) -> float:
-    return min_p_value + ((max_p_value - min_p_value) / 2)
 
+def to_point3d(point: Vec3) -> adsk.core.Point3D:
+    return adsk.core.Point3D.create(point.x, point.y, point.z)
 
-def mid_point(p1: adsk.core.Point3D, p2: adsk.core.Point3D) -> adsk.core.Point3D:
-    return adsk.core.Point3D.create(
-        middle(p1.x, p2.x),
-        middle(p1.y, p2.y),
-        middle(p1.z, p2.z)
-    )
 
+def to_vector3d(vector: Vec3) -> adsk.core.Vector3D:
+    return adsk.core.Vector3D.create(vector.x, vector.y, vector.z)
 
-def oriented_b_box_from_b_box(b_box: adsk.core.BoundingBox3D) -> adsk.core.OrientedBoundingBox3D:
-    design = get_design()
-    root_comp = design.rootComponent
 
-    o_box = adsk.core.OrientedBoundingBox3D.create(
-        mid_point(b_box.minPoint, b_box.maxPoint),
-        root_comp.yZConstructionPlane.geometry.normal.copy(),
-        root_comp.xZConstructionPlane.geometry.normal.copy(),
-        b_box.maxPoint.x - b_box.minPoint.x,
-        b_box.maxPoint.y - b_box.minPoint.y,
-        b_box.maxPoint.z - b_box.minPoint.z
+def to_o_box(o_box: OBB) -> adsk.core.OrientedBoundingBox3D:
+    return adsk.core.OrientedBoundingBox3D.create(
+        to_point3d(o_box.center),
+        to_vector3d(o_box.length_direction),
+        to_vector3d(o_box.width_direction),
+        o_box.length,
+        o_box.width,
+        o_box.height
     )
-    return o_box
+
+
+def as_aabb(b_box) -> AABB:
+    if isinstance(b_box, AABB):
+        return b_box
+    return AABB.from_b_box(b_box)
 
 
 #
@@ -70,225 +80,293 @@ def oriented_b_box_from_b_box(b_box: adsk.core.BoundingBox3D) -> adsk.core.Orien
 #     returnValue = matrix3D_var.setToAlignCoordinateSystems(fromOrigin, fromXAxis, fromYAxis, fromZAxis, toOrigin,
 #                                                            toXAxis, toYAxis, toZAxis)
 
-def bounding_box_from_selections(selections):
+def bounding_boxes_from_selections(selections) -> List[AABB]:
+    return [AABB.from_b_box(selection.boundingBox) for selection in selections]
+
+
+def bounding_box_from_selections(selections) -> AABB:
     if len(selections) > 0:
-        b_box: adsk.core.BoundingBox3D = selections[0].boundingBox
-        for selection in selections[1:]:
-            b_box.combine(selection.boundingBox)
-
-    else:
-        b_box = adsk.core.BoundingBox3D.create(
-            adsk.core.Point3D.create(-1, -1, -1),
-            adsk.core.Point3D.create(1, 1, 1)
-        )
-    return b_box
+        return combine_boxes(bounding_boxes_from_selections(selections))
 
+    return AABB(-1, -1, -1, 1, 1, 1)
 
-def create_brep_shell_box(modified_b_box, thickness):
-    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
-    inner_o_box = oriented_b_box_from_b_box(modified_b_box)
 
-    outer_o_box = inner_o_box.copy()
+def part_clearance(feature_values: FeatureValues) -> float:
+    """Smallest offset, also used as the clearance between parts and internal walls or other parts"""
+    return min(
+        feature_values.x_pos, feature_values.x_neg,
+        feature_values.y_pos, feature_values.y_neg,
+        feature_values.z_pos, feature_values.z_neg
+    )
+
+
+def plan_grid(part_boxes: List[AABB], b_box, feature_values: FeatureValues) -> Optional[CellGrid]:
+    """Cell grid for a multi cell cage, or None if the cage is a single cell"""
+    if feature_values.cells < 2 or len(part_boxes) < 2:
+        return None
+
+    clearance = part_clearance(feature_values)
+    grid = plan_cell_grid(part_boxes, as_aabb(b_box), feature_values.shell_thickness, clearance, feature_values.cells)
+    if grid.cell_count < 2:
+        return None
+    return grid
 
-    outer_o_box.length = outer_o_box.length + thickness * 2
-    outer_o_box.width = outer_o_box.width + thickness * 2
-    outer_o_box.height = outer_o_box.height + thickness * 2
 
-    inner_box = brep_mgr.createBox(inner_o_box)
-    outer_box = brep_mgr.createBox(outer_o_box)
+def create_brep_shell_box(modified_b_box, thickness, grid: CellGrid = None) -> adsk.fusion.BRepBody:
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    b_box = as_aabb(modified_b_box)
+    inner_o_box = OBB.from_aabb(b_box)
+    outer_o_box = inner_o_box.grown(thickness)
+
+    inner_box = brep_mgr.createBox(to_o_box(inner_o_box))
+    outer_box = brep_mgr.createBox(to_o_box(outer_o_box))
 
     brep_mgr.booleanOperation(outer_box, inner_box, adsk.fusion.BooleanTypes.DifferenceBooleanType)
 
+    if grid is not None:
+        for key, wall in shell_walls(b_box, thickness, grid).items():
+            if key not in WALL_KEYS:
+                brep_mgr.booleanOperation(
+                    outer_box, brep_mgr.createBox(to_o_box(OBB.from_aabb(wall))),
+                    adsk.fusion.BooleanTypes.UnionBooleanType
+                )
+
     return outer_box
 
 
-def create_gaps(b_box: adsk.core.BoundingBox3D, feature_values: FeatureValues) -> List[adsk.fusion.BRepBody]:
-    gap = feature_values.gap
-    bar = feature_values.bar
-    thk = feature_values.shell_thickness
-
-    o_box = oriented_b_box_from_b_box(b_box)
-    create_o_box = adsk.core.OrientedBoundingBox3D.create
-    create_point = adsk.core.Point3D.create
-
-    if (o_box.length - gap) >= 0:
-        x_num = int(math.floor((o_box.length + bar) / (gap + bar)))
-        x_step = (o_box.length - (gap * x_num) - (bar * (x_num - 1))) / 2
-    else:
-        x_num = 0
-        x_step = 0
-
-    if (o_box.width - gap) >= 0:
-        y_num = int(math.floor((o_box.width + bar) / (gap + bar)))
-        y_step = (o_box.width - (gap * y_num) - (bar * (y_num - 1))) / 2
-    else:
-        y_num = 0
-        y_step = 0
-
-    if (o_box.height - gap) >= 0:
-        z_num = int(math.floor((o_box.height + bar) / (gap + bar)))
-        z_step = (o_box.height - (gap * z_num) - (bar * (z_num - 1))) / 2
-    else:
-        z_num = 0
-        z_step = 0
-
-    x_min = b_box.minPoint.x + x_step + gap / 2
-    y_min = b_box.minPoint.y + y_step + gap / 2
-    z_min = b_box.minPoint.z + z_step + gap / 2
+# Temporary wall bodies, their minimum corner and the cage build that made them keyed by
+# wall_signature, a cached wall is moved into place when an equal wall is built again
+_wall_cache = OrderedDict()
+WALL_CACHE_SIZE = 64
+_cage_build = 0
+_reused_walls = 0
 
-    gaps = []
-    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
 
-    for z in range(z_num):
-        for y in range(y_num):
-            cp_x = create_point(
-                o_box.centerPoint.x - (o_box.length + thk) / 2, y_min + y * (bar + gap), z_min + z * (bar + gap))
-            x_box = create_o_box(cp_x, o_box.lengthDirection, o_box.widthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(x_box))
-
-            cp_x = create_point(
-                o_box.centerPoint.x + (o_box.length + thk) / 2, y_min + y * (bar + gap), z_min + z * (bar + gap))
-            x_box = create_o_box(cp_x, o_box.lengthDirection, o_box.widthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(x_box))
-
-    for z in range(z_num):
-        for x in range(x_num):
-            cp_y = create_point(
-                x_min + x * (bar + gap), o_box.centerPoint.y - (o_box.width + thk) / 2, z_min + z * (bar + gap))
-            y_box = create_o_box(cp_y, o_box.widthDirection, o_box.lengthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(y_box))
-
-            cp_y = create_point(
-                x_min + x * (bar + gap), o_box.centerPoint.y + (o_box.width + thk) / 2, z_min + z * (bar + gap))
-            y_box = create_o_box(cp_y, o_box.widthDirection, o_box.lengthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(y_box))
-
-    for y in range(y_num):
-        for x in range(x_num):
-            cp_z = create_point(
-                x_min + x * (bar + gap), y_min + y * (bar + gap), o_box.centerPoint.z - (o_box.height + thk) / 2)
-            z_box = create_o_box(cp_z, o_box.heightDirection, o_box.widthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(z_box))
-
-            cp_z = create_point(
-                x_min + x * (bar + gap), y_min + y * (bar + gap), o_box.centerPoint.z + (o_box.height + thk) / 2)
-            z_box = create_o_box(cp_z, o_box.heightDirection, o_box.widthDirection, thk, gap, gap)
-            gaps.append(brep_mgr.createBox(z_box))
+def clear_wall_cache():
+    _wall_cache.clear()
 
-    return gaps
 
+def reused_walls() -> int:
+    """Walls taken from the cache that an earlier build made, compare before and after a build
 
-def get_default_offset():
-    design = get_design()
-    units = design.unitsManager.defaultLengthUnits
-    try:
-        if units in [adsk.fusion.DistanceUnits.InchDistanceUnits, adsk.fusion.DistanceUnits.FootDistanceUnits]:
-            default_offset = config.DEFAULT_OFFSET_INCHES
-        else:
-            default_offset = config.DEFAULT_OFFSET_METRIC
+    Opposite walls of a cage are often equal, so a build also reuses its own walls.
+    """
+    return _reused_walls
+
+
+def translation_matrix(vector: Vec3) -> adsk.core.Matrix3D:
+    matrix = adsk.core.Matrix3D.create()
+    matrix.setWithArray([
+        1, 0, 0, vector.x,
+        0, 1, 0, vector.y,
+        0, 0, 1, vector.z,
+        0, 0, 0, 1
+    ])
+    return matrix
+
+
+def moved_copy(body: adsk.fusion.BRepBody, vector: Vec3) -> adsk.fusion.BRepBody:
+    """Temporary copy of body translated by vector"""
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    body_copy = brep_mgr.copy(body)
+    if vector != Vec3():
+        brep_mgr.transform(body_copy, translation_matrix(vector))
+    return body_copy
+
+
+def create_wall_body(wall: AABB, slots: List[OBB], progress: Progress = NO_PROGRESS) -> adsk.fusion.BRepBody:
+    global _reused_walls
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    signature = wall_signature(wall, slots)
+    cached = _wall_cache.get(signature)
+    if cached is not None:
+        _wall_cache.move_to_end(signature)
+        progress.step(len(slots))
+        cached_body, cached_corner, build = cached
+        if build < _cage_build:
+            _reused_walls += 1
+        return moved_copy(cached_body, wall.min_point - cached_corner)
+
+    wall_body = brep_mgr.createBox(to_o_box(OBB.from_aabb(wall)))
+    for slot in slots:
+        brep_mgr.booleanOperation(
+            wall_body, brep_mgr.createBox(to_o_box(slot)), adsk.fusion.BooleanTypes.DifferenceBooleanType
+        )
+        progress.step()
 
-    except AttributeError:
-        default_offset = f"1 {units}"
+    _wall_cache[signature] = (brep_mgr.copy(wall_body), wall.min_point, _cage_build)
+    if len(_wall_cache) > WALL_CACHE_SIZE:
+        _wall_cache.popitem(last=False)
+    return wall_body
 
-    default_value = design.unitsManager.evaluateExpression(default_offset)
-    return default_value
 
+def create_cage_body(b_box, feature_values: FeatureValues, grid: CellGrid = None,
+                     progress: Progress = NO_PROGRESS) -> adsk.fusion.BRepBody:
+    """Builds the slotted cage one wall at a time and unions the walls together"""
+    global _cage_build
+    _cage_build += 1
+    b_box = as_aabb(b_box)
+    thickness = feature_values.shell_thickness
+    walls = shell_walls(b_box, thickness, grid)
+    slots = wall_slot_boxes(b_box, feature_values.gap, feature_values.slot_bar, thickness, grid)
 
-def get_default_thickness():
-    design = get_design()
-    units = design.fusionUnitsManager.distanceDisplayUnits
-    try:
-        if units in [adsk.fusion.DistanceUnits.InchDistanceUnits, adsk.fusion.DistanceUnits.FootDistanceUnits]:
-            default_shell = config.DEFAULT_SHELL_INCHES
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    cage_body = None
+    for key in walls:
+        wall_body = create_wall_body(walls[key], slots[key], progress)
+        if cage_body is None:
+            cage_body = wall_body
         else:
-            default_shell = config.DEFAULT_SHELL_METRIC
+            brep_mgr.booleanOperation(cage_body, wall_body, adsk.fusion.BooleanTypes.UnionBooleanType)
+        progress.step()
+    return cage_body
+
+
+def rebuild_cage_body(old_body: adsk.fusion.BRepBody, old_b_box, b_box, feature_values: FeatureValues,
+                      grid: CellGrid = None, changed: Sequence[str] = (),
+                      progress: Progress = NO_PROGRESS) -> adsk.fusion.BRepBody:
+    """Builds the cage around b_box, only the walls in changed are slotted again
+
+    The other walls are cut out of old_body, the cage built around old_b_box, moved along
+    with the cage.  Walls are separate slabs and the regions where internal walls cross are
+    never slotted, so intersecting the old cage with a wall gives back that wall.
+    """
+    b_box = as_aabb(b_box)
+    thickness = feature_values.shell_thickness
+    walls = shell_walls(b_box, thickness, grid)
+    slots = wall_slot_boxes(b_box, feature_values.gap, feature_values.slot_bar, thickness, grid)
+    old_cage = moved_copy(old_body, b_box.min_point - as_aabb(old_b_box).min_point)
 
-    except AttributeError:
-        default_shell = f"1 {units}"
+    brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    cage_body = None
+    for key in walls:
+        if key in changed:
+            wall_body = create_wall_body(walls[key], slots[key], progress)
+        else:
+            wall_body = brep_mgr.copy(old_cage)
+            brep_mgr.booleanOperation(
+                wall_body, brep_mgr.createBox(to_o_box(OBB.from_aabb(walls[key]))),
+                adsk.fusion.BooleanTypes.IntersectionBooleanType
+            )
+            progress.step(len(slots[key]))
+        if cage_body is None:
+            cage_body = wall_body
+        else:
+            brep_mgr.booleanOperation(cage_body, wall_body, adsk.fusion.BooleanTypes.UnionBooleanType)
+        progress.step()
+    return cage_body
 
-    default_value = design.unitsManager.evaluateExpression(default_shell)
-    return default_value
 
+def cage_wall_signatures(b_box, feature_values: FeatureValues, grid: CellGrid = None) -> Dict[str, Tuple]:
+    """Wall signatures relative to the minimum corner of b_box, unchanged when the cage only moves"""
+    b_box = as_aabb(b_box)
+    thickness = feature_values.shell_thickness
+    walls = shell_walls(b_box, thickness, grid)
+    slots = wall_slot_boxes(b_box, feature_values.gap, feature_values.slot_bar, thickness, grid)
+    origin = b_box.min_point
+    return {key: wall_signature(walls[key], slots[key], origin) for key in walls}
 
-def auto_gaps(selections, modified_b_box, thickness_value, bar_value):
-    gap_minimum = thickness_value * 2
-    o_box = oriented_b_box_from_b_box(modified_b_box)
-    main_box_max_gaps = []
-    sides = [o_box.length, o_box.width, o_box.height]
 
-    for main_box_side in [o_box.length, o_box.width, o_box.height]:
-        if main_box_side > gap_minimum:
-            main_box_max_gaps.append(main_box_side)
+def get_default_offset(design: adsk.fusion.Design = None, profile_name: str = None) -> float:
+    return get_profile(design or get_design(), profile_name).offset
 
-    if len(main_box_max_gaps) > 0:
-        main_box_max_gap = min(main_box_max_gaps)
-    else:
-        main_box_max_gap = thickness_value
 
-    body_max_gaps = []
+def get_default_thickness(design: adsk.fusion.Design = None, profile_name: str = None) -> float:
+    return get_profile(design or get_design(), profile_name).thickness
 
+
+def principal_body_sides(body: adsk.fusion.BRepBody) -> Tuple[float, float, float]:
     temp_brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+    t_body = temp_brep_mgr.copy(body)
+    physical_props = body.getPhysicalProperties(adsk.fusion.CalculationAccuracy.MediumCalculationAccuracy)
+    (returnValue, xAxis, yAxis, zAxis) = physical_props.getPrincipalAxes()
+    # (returnValue, rx, ry, rz) = t_body.physicalProperties.getRotationToPrincipal()
+    com = physical_props.centerOfMass
+    matrix = adsk.core.Matrix3D.create()
+
+    returnValue = matrix.setToAlignCoordinateSystems(
+        com, xAxis, yAxis, zAxis, com,
+        adsk.core.Vector3D.create(1, 0, 0),
+        adsk.core.Vector3D.create(0, 1, 0),
+        adsk.core.Vector3D.create(0, 0, 1)
+    )
 
-    # TODO could cache results if proves slow
-    body: adsk.fusion.BRepBody
+    temp_brep_mgr.transform(t_body, matrix)
+    return AABB.from_b_box(t_body.boundingBox).sides
+
+
+def body_max_gaps(selections, escape_gaps: Dict[str, float] = None) -> List[float]:
+    """Largest gap each body cannot escape through
+
+    Measuring a body needs its physical properties, so pass the same escape_gaps dict
+    (keyed by entityToken) for as long as the bodies cannot change, e.g. one command.
+    """
+    if escape_gaps is None:
+        return [principal_max_gap(principal_body_sides(body)) for body in selections]
+
+    gaps = []
     for body in selections:
+        token = body.entityToken
+        gap = escape_gaps.get(token)
+        if gap is None:
+            gap = escape_gaps[token] = principal_max_gap(principal_body_sides(body))
+        gaps.append(gap)
+    return gaps
+
+
+def auto_gaps(selections, modified_b_box, thickness_value, bar_value, escape_gaps: Dict[str, float] = None):
+    return auto_gap_value(
+        as_aabb(modified_b_box).sides, body_max_gaps(selections, escape_gaps), thickness_value, bar_value)
 
-        t_body = temp_brep_mgr.copy(body)
-        physical_props = body.getPhysicalProperties(adsk.fusion.CalculationAccuracy.MediumCalculationAccuracy)
-        (returnValue, xAxis, yAxis, zAxis) = physical_props.getPrincipalAxes()
-        # (returnValue, rx, ry, rz) = t_body.physicalProperties.getRotationToPrincipal()
-        com = physical_props.centerOfMass
-        matrix = adsk.core.Matrix3D.create()
-
-        # futil.log(f'zAxis {str(zAxis.asArray())}')
-        # futil.log(f'yAxis {str(yAxis.asArray())}')
-        # futil.log(f'xAxis {str(xAxis.asArray())}')
-        # futil.log(f'matrix 1 {str(matrix.asArray())}')
-
-        returnValue = matrix.setToAlignCoordinateSystems(
-            com, xAxis, yAxis, zAxis, com,
-            body.parentComponent.xConstructionAxis.geometry.direction,
-            body.parentComponent.yConstructionAxis.geometry.direction,
-            body.parentComponent.zConstructionAxis.geometry.direction
-        )
 
-        # futil.log(f'matrix 2 {str(matrix.asArray())}')
-
-        temp_brep_mgr.transform(t_body, matrix)
-
-        body_o_box = oriented_b_box_from_b_box(t_body.boundingBox)
-
-        body_sides = [body_o_box.length, body_o_box.width, body_o_box.height]
-        # futil.log(f'body_sides {str(body_sides)}')
-
-        body_sides.sort(key=float)
-        a = body_sides[0]
-        b = body_sides[1]
-        diagonal = math.sqrt(a * a + b * b)
-        max_side = diagonal / math.sqrt(2)
-        max_side_gap = max_side * .9
-        body_max_gaps.append(max_side_gap)
-
-    body_gap_maximum = min(body_max_gaps)
-    short_side = min(sides)
-
-    four_gaps = (short_side - bar_value * 3) / 4
-    three_gaps = (short_side - bar_value * 2) / 3
-    two_gaps = (short_side - bar_value) / 2
-
-    if body_gap_maximum > main_box_max_gap:
-        new_gap = main_box_max_gap
-    elif short_side > body_gap_maximum:
-        new_gap = body_gap_maximum
-    elif (body_gap_maximum > two_gaps) and (two_gaps > gap_minimum):
-        new_gap = two_gaps
-    elif (body_gap_maximum > three_gaps) and (three_gaps > gap_minimum):
-        new_gap = three_gaps
-    elif (body_gap_maximum > four_gaps) and (four_gaps > gap_minimum):
-        new_gap = four_gaps
-    else:
-        new_gap = body_gap_maximum
-    return new_gap
+def optimized_layout(selections, modified_b_box, feature_values: FeatureValues, min_gap: float, min_bar: float,
+                     grid: CellGrid = None, escape_gaps: Dict[str, float] = None) -> Tuple[float, List[float]]:
+    """Gap and per axis bars with the most open area that still hold the selected bodies
+
+    The bars are at least the bar width of feature_values and min_bar wide.
+    """
+    gap, bars, _ = optimize_slot_layout(
+        as_aabb(modified_b_box), feature_values.shell_thickness, min_gap,
+        min(body_max_gaps(selections, escape_gaps)), max(feature_values.bar, min_bar), grid
+    )
+    return gap, list(bars)
+
+
+def feature_metrics(b_box, feature_values: FeatureValues, grid: CellGrid = None,
+                    density: float = 1.0) -> CageMetrics:
+    return cage_metrics(as_aabb(b_box), feature_values.shell_thickness, feature_values.gap, feature_values.slot_bar,
+                        grid, density)
+
+
+def metrics_message(metrics: CageMetrics, design: adsk.fusion.Design = None) -> str:
+    """Metrics formatted in the default length units of the design"""
+    units_manager = (design or get_design()).unitsManager
+    units = units_manager.defaultLengthUnits
+    lines = [
+        f'Volume: {units_manager.formatInternalValue(metrics.volume, f"{units}^3", True)}',
+        f'Mass: {metrics.mass:.1f} g',
+        f'Surface area: {units_manager.formatInternalValue(metrics.surface_area, f"{units}^2", True)}',
+        f'Open area: {metrics.open_fraction:.0%} ({metrics.slot_count} slots)',
+    ]
+    return '<br>'.join(lines)
+
+
+def packing_matrix(packing: Packing, index: int) -> adsk.core.Matrix3D:
+    """World space move of a part from its current place to its packed place"""
+    rows, source, target = packing.transform(index)
+    translation = [
+        target.x - (rows[0][0] * source.x + rows[0][1] * source.y + rows[0][2] * source.z),
+        target.y - (rows[1][0] * source.x + rows[1][1] * source.y + rows[1][2] * source.z),
+        target.z - (rows[2][0] * source.x + rows[2][1] * source.y + rows[2][2] * source.z),
+    ]
+    matrix = adsk.core.Matrix3D.create()
+    matrix.setWithArray([
+        rows[0][0], rows[0][1], rows[0][2], translation[0],
+        rows[1][0], rows[1][1], rows[1][2], translation[1],
+        rows[2][0], rows[2][1], rows[2][2], translation[2],
+        0, 0, 0, 1
+    ])
+    return matrix
 
 
 def get_design() -> adsk.fusion.Design:
@@ -0,0 +1,125 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Checks that the walls of a cage do not cut through any part or other sinterbox.
+# Bounding boxes in a spatial hash find the candidate pairs, only those are checked
+# precisely with the TemporaryBRepManager.
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import adsk.core
+import adsk.fusion
+
+from .SinterBoxGeometry import AABB, OBB, CellGrid, SpatialHash, hash_cell_size
+from .SinterBoxPersistence import is_cage_body
+from .SinterBoxUtils import FeatureValues, as_aabb, get_design, shell_walls, to_o_box
+
+# Overlaps smaller than this (internal units, cm) are treated as touching
+TOLERANCE = 1e-4
+
+
+@dataclass
+class Interference:
+    body: adsk.fusion.BRepBody
+    name: str
+    is_sinterbox: bool
+
+
+def body_display_name(body: adsk.fusion.BRepBody) -> str:
+    if body.assemblyContext is not None:
+        return f'{body.assemblyContext.name}/{body.name}'
+    return body.name
+
+
+def design_bodies(design: adsk.fusion.Design) -> List[adsk.fusion.BRepBody]:
+    """All visible solid bodies in the design, as proxies in the root component context"""
+    root_comp = design.rootComponent
+    bodies = [body for body in root_comp.bRepBodies]
+    occurrence: adsk.fusion.Occurrence
+    for occurrence in root_comp.allOccurrences:
+        bodies.extend(body for body in occurrence.bRepBodies)
+    return [body for body in bodies if body.isSolid and body.isVisible]
+
+
+class ClearanceValidator:
+    """Finds bodies intersected by the walls of a cage
+
+    The bodies of the design are indexed once, so repeated validation while the user
+    edits the command only costs a few hash lookups unless a wall is actually close to a body.
+    """
+
+    def __init__(self, design: adsk.fusion.Design = None):
+        self.design = design or get_design()
+        self.index: Optional[SpatialHash] = None
+        self.bodies = []
+        self.tokens = []
+        self.last_key = None
+        self.last_result: List[Interference] = []
+
+    def build_index(self, extent: AABB):
+        self.bodies = design_bodies(self.design)
+        self.tokens = [body.entityToken for body in self.bodies]
+        boxes = [AABB.from_b_box(body.boundingBox) for body in self.bodies]
+        self.index = SpatialHash(hash_cell_size(boxes, extent))
+        for i, b_box in enumerate(boxes):
+            self.index.insert(i, b_box)
+
+    def validate(self, cage_box, feature_values: FeatureValues, grid: CellGrid = None,
+                 exclude: Sequence[adsk.fusion.BRepBody] = ()) -> List[Interference]:
+        """Bodies cut by the walls, bodies in exclude (the enclosed parts) are skipped"""
+        cage_box = as_aabb(cage_box)
+        excluded = frozenset(body.entityToken for body in exclude)
+        key = (cage_box.as_tuple(), feature_values.shell_thickness, grid.walls if grid else None, excluded)
+        if key == self.last_key:
+            return self.last_result
+
+        if self.index is None:
+            self.build_index(cage_box)
+
+        # The walls are checked without their slots, building slotted walls here would cost
+        # as much as the commit.  A part reaching into a slot is reported as well.
+        walls = shell_walls(cage_box, feature_values.shell_thickness, grid)
+        brep_mgr = adsk.fusion.TemporaryBRepManager.get()
+
+        offending = {}
+        for wall in walls.values():
+            wall_body = None
+            for i in self.index.query(wall, TOLERANCE):
+                if i in offending or self.tokens[i] in excluded:
+                    continue
+
+                if wall_body is None:
+                    wall_body = brep_mgr.createBox(to_o_box(OBB.from_aabb(wall)))
+                body = self.bodies[i]
+                target = brep_mgr.copy(body)
+                brep_mgr.booleanOperation(
+                    target, brep_mgr.copy(wall_body), adsk.fusion.BooleanTypes.IntersectionBooleanType
+                )
+                if target.volume > TOLERANCE ** 3:
+                    offending[i] = Interference(body, body_display_name(body), is_cage_body(body))
+
+        self.last_key = key
+        self.last_result = list(offending.values())
+        return self.last_result
+
+
+def interference_message(interferences: List[Interference]) -> str:
+    if len(interferences) == 0:
+        return 'No interference'
+
+    names = [item.name for item in interferences if not item.is_sinterbox]
+    cages = [item.name for item in interferences if item.is_sinterbox]
+    lines = []
+    if len(names) > 0:
+        lines.append('Cage intersects: ' + ', '.join(names))
+    if len(cages) > 0:
+        lines.append('Cage intersects other sinterboxes: ' + ', '.join(cages))
+    return '<br>'.join(lines)
@@ -0,0 +1,120 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Runs pure geometry jobs (no adsk calls) in a thread pool so the command dialog stays
+# responsive.  Results are handed back to Fusion's main thread through a custom event.
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Tuple
+
+import adsk.core
+
+from ...lib import fusion360utils as futil
+
+app = adsk.core.Application.get()
+logger = futil.get_logger('GeometryWorker')
+
+
+class GeometryWorker:
+    """Thread pool for jobs grouped by kind
+
+    Each submit bumps the generation of its kind.  When a job finishes the result is only
+    delivered if no newer job of the same kind was submitted in the meantime, so slow
+    results from an earlier state of the dialog are discarded.  on_result callbacks always
+    run on the main thread and are the only place adsk objects may be touched.
+    """
+
+    def __init__(self, event_id: str, max_workers: int = 2):
+        self.event_id = event_id
+        self.max_workers = max_workers
+        self.executor: ThreadPoolExecutor = None
+        self.custom_event: adsk.core.CustomEvent = None
+        self.handlers = []
+        self.generations: Dict[str, int] = {}
+        self.pending: Dict[str, int] = {}
+        self.results: Dict[str, Tuple[int, Future, Callable]] = {}
+        self.lock = threading.Lock()
+
+    def start(self):
+        self.custom_event = app.registerCustomEvent(self.event_id)
+        futil.add_handler(self.custom_event, self._on_custom_event, local_handlers=self.handlers)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.event_id)
+
+    def stop(self):
+        with self.lock:
+            for kind in self.generations:
+                self.generations[kind] += 1
+            self.pending.clear()
+            self.results.clear()
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+        futil.remove_handlers(self.handlers)
+        if self.custom_event is not None:
+            app.unregisterCustomEvent(self.event_id)
+            self.custom_event = None
+
+    def submit(self, kind: str, function: Callable, args: tuple, on_result: Callable) -> int:
+        """Runs function(*args) in the pool and later calls on_result(result) on the main thread
+
+        args must not be changed by the main thread while the job runs, pass copies.
+        Returns the generation of the job, 0 if the worker is not running.
+        """
+        if self.executor is None:
+            return 0
+        with self.lock:
+            generation = self.generations.get(kind, 0) + 1
+            self.generations[kind] = generation
+            self.pending[kind] = generation
+
+        future = self.executor.submit(function, *args)
+        future.add_done_callback(lambda done: self._on_done(kind, generation, done, on_result))
+        return generation
+
+    def invalidate(self, kind: str):
+        """Discards any result of kind that has not been delivered yet"""
+        with self.lock:
+            self.generations[kind] = self.generations.get(kind, 0) + 1
+            self.pending.pop(kind, None)
+            self.results.pop(kind, None)
+
+    def is_pending(self, kind: str) -> bool:
+        with self.lock:
+            return kind in self.pending
+
+    def _on_done(self, kind: str, generation: int, future: Future, on_result: Callable):
+        # Worker thread, no adsk calls other than firing the event
+        if future.cancelled():
+            return
+        with self.lock:
+            if generation != self.generations.get(kind):
+                return
+            self.results[kind] = (generation, future, on_result)
+        app.fireCustomEvent(self.event_id, kind)
+
+    def _on_custom_event(self, args: adsk.core.CustomEventArgs):
+        kind = args.additionalInfo
+        with self.lock:
+            item = self.results.pop(kind, None)
+            if item is None:
+                return
+            generation, future, on_result = item
+            if generation != self.generations.get(kind):
+                return
+            self.pending.pop(kind, None)
+
+        exception = future.exception()
+        if exception is not None:
+            logger.error('%s job failed: %r', kind, exception, event=self.event_id)
+            return
+        on_result(future.result())
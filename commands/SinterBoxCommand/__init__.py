@@ -0,0 +1,3 @@
+from .SinterBoxAPI import create_sinterbox, update_sinterbox, benchmark_boolean_strategies, commit_step_count, \
+    clear_wall_cache, clear_profile_cache, SinterboxResult, SinterboxError
+from .SinterBoxProgress import Progress, CommitCancelled
@@ -13,8 +13,17 @@ import adsk.core
 import adsk.fusion
 import os
 
-from .SinterBoxUtils import bounding_box_from_selections, get_default_thickness, auto_gaps
+from .SinterBoxUtils import bounding_box_from_selections, auto_gaps, body_max_gaps, metrics_message, \
+    optimized_layout, part_clearance
+from .SinterBoxProfiles import get_profile, profile_names
+from .SinterBoxGeometry import auto_gap_value, optimize_slot_layout
+from .SinterBoxAPI import commit_step_count, move_bodies, pack_bodies
+from .SinterBoxPacking import pack_boxes
+from .SinterBoxProgress import CommitCancelled, Progress
+from .SinterBoxRecorder import SessionRecorder, open_recorder
 from .SinterBoxDefinition import SinterBoxDefinition
+from .SinterBoxValidation import interference_message
+from .SinterBoxWorker import GeometryWorker
 from ...lib import fusion360utils as futil
 from ... import config
 
@@ -37,14 +46,28 @@ PANEL_ID = 'SolidCreatePanel'
 COMMAND_BESIDE_ID = 'PrimitivePipe'
 ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', '')
 local_handlers = []
+logger = futil.get_logger(CMD_NAME)
 
 # Sinterbox specific global variables
 IS_DRAGGING = False
 AUTO_SIZE_GAPS = True
+OPTIMIZE_LAYOUT = False
 
 the_box: SinterBoxDefinition
 the_box = None
 
+worker: GeometryWorker
+worker = None
+
+recorder: SessionRecorder
+recorder = None
+AUTO_GAP_JOB = 'auto_gap'
+LAYOUT_JOB = 'layout'
+PACK_JOB = 'pack'
+
+# Inputs that change the walls and therefore the optimized bar layout
+LAYOUT_INPUTS = ('body_select', 'bar', 'thick_input', 'cells_input', 'profile_input')
+
 
 def start():
     cmd_def = ui.commandDefinitions.addButtonDefinition(CMD_ID, CMD_NAME, CMD_Description, ICON_FOLDER)
@@ -73,8 +96,15 @@ def stop():
 
 
 def command_created(args: adsk.core.CommandCreatedEventArgs):
-    global the_box
-    futil.log(f'{CMD_NAME} Command Created Event')
+    global the_box, worker, recorder, AUTO_SIZE_GAPS, OPTIMIZE_LAYOUT
+    logger.debug('Command Created Event', event='created')
+
+    if config.PROFILE_API:
+        futil.start_profiling()
+
+    # Match the initial state of the check boxes
+    AUTO_SIZE_GAPS = True
+    OPTIMIZE_LAYOUT = False
 
     futil.add_handler(args.command.execute, command_execute, local_handlers=local_handlers)
     futil.add_handler(args.command.inputChanged, command_input_changed, local_handlers=local_handlers)
@@ -93,15 +123,21 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
     # selection_input.addSelectionFilter('MeshBodies')   # TODO When bounding box is supported for mesh bodies
     selection_input.setSelectionLimits(1, 0)
 
+    inputs.addBoolValueInput('pack_input', 'Pack Parts', True, '', False)
+
     default_selections = []
 
     b_box = bounding_box_from_selections(default_selections)
 
-    default_thickness = get_default_thickness()
-    default_thickness_value = adsk.core.ValueInput.createByReal(default_thickness)
+    profile = get_profile(design)
+    profile_input = inputs.addDropDownCommandInput(
+        'profile_input', 'Printer Profile', adsk.core.DropDownStyles.TextListDropDownStyle)
+    for name in profile_names():
+        profile_input.listItems.add(name, name == profile.name, '')
 
-    default_gap_value = adsk.core.ValueInput.createByReal(default_thickness * 4)
-    default_bar_value = adsk.core.ValueInput.createByReal(default_thickness * 2)
+    default_thickness_value = adsk.core.ValueInput.createByReal(profile.thickness)
+    default_gap_value = adsk.core.ValueInput.createByReal(profile.gap)
+    default_bar_value = adsk.core.ValueInput.createByReal(profile.bar)
 
     inputs.addValueInput('thick_input', "Cage Thickness", units, default_thickness_value)
     inputs.addValueInput('bar', "Bar Width", units, default_bar_value)
@@ -110,29 +146,51 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
     gap_input = inputs.addValueInput('gap', "Bar Spacing", units, default_gap_value)
     gap_input.isEnabled = False
 
+    inputs.addBoolValueInput('optimize_input', 'Optimize Bar Layout', True, '', False)
+
+    inputs.addIntegerSpinnerCommandInput('cells_input', 'Max Cells Per Axis', 1, 10, 1, 1)
+
     inputs.addBoolValueInput('full_preview_input', 'Preview', True, '', True)
 
     inputs.addBoolValueInput('new_component_input', 'Move Bodies to New Component', True, '', True)
 
-    the_box = SinterBoxDefinition(b_box, inputs)
+    validation_input = inputs.addTextBoxCommandInput('validation_text', 'Clearance', '', 2, True)
+    validation_input.isVisible = False
+
+    metrics_input = inputs.addTextBoxCommandInput('metrics_text', 'Cage', '', 4, True)
+    metrics_input.isVisible = False
+
+    worker = GeometryWorker(f'{CMD_ID}_geometry')
+    worker.start()
+
+    the_box = SinterBoxDefinition(b_box, inputs, worker, profile)
+
+    if config.RECORD_SESSIONS:
+        recorder = open_recorder(config.SESSION_RECORD_FILE)
+        if recorder is not None:
+            is_parametric = design.designType == adsk.fusion.DesignTypes.ParametricDesignType
+            recorder.record('created', inputs, units=units, parametric=is_parametric)
 
 
 def command_execute(args: adsk.core.CommandEventArgs):
-    futil.log(f'{CMD_NAME} Command Execute Event')
+    logger.debug('Command Execute Event', event='execute')
 
     inputs = args.command.commandInputs
+    if recorder is not None:
+        recorder.record('execute', inputs)
+
     selection_input: adsk.core.SelectionCommandInput = inputs.itemById('body_select')
     new_component_input: adsk.core.BoolValueCommandInput = inputs.itemById('new_component_input')
     bar_input: adsk.core.ValueCommandInput = inputs.itemById('bar')
     thickness_input: adsk.core.ValueCommandInput = inputs.itemById('thick_input')
     gap_input: adsk.core.ValueCommandInput = inputs.itemById('gap')
+    cells_input: adsk.core.IntegerSpinnerCommandInput = inputs.itemById('cells_input')
 
     selection_bodies = [selection_input.selection(i).entity for i in range(selection_input.selectionCount)]
     if len(selection_bodies) < 1:
         return
 
     design: adsk.fusion.Design = app.activeProduct
-    root_comp = design.rootComponent
 
     group_start_index = 0
     group_end_index = 0
@@ -145,27 +203,74 @@ def command_execute(args: adsk.core.CommandEventArgs):
 
     the_box.clear_graphics()
 
-    the_box.update_selections(selection_bodies)
-
     the_box.feature_values.bar = bar_input.value
     the_box.feature_values.gap = gap_input.value
     the_box.feature_values.shell_thickness = thickness_input.value
+    the_box.feature_values.cells = cells_input.value
 
-    new_occurrence = the_box.create_brep()
-
-    if new_component_input.value:
-        body: adsk.fusion.BRepBody
-        for body in selection_bodies:
-            new_body = body.copyToComponent(new_occurrence)
-            # TODO think about Occurrences
-            # new_body.name = f'{body.parentComponent.name} - {body.name}'
-        for body in selection_bodies:
-            if body.isValid:
-                if is_parametric:
-                    remove_feature = root_comp.features.removeFeatures.add(body)
-                    group_end_index = remove_feature.timelineObject.index
-                else:
-                    body.deleteMe()
+    the_box.update_selections(selection_bodies)
+
+    # The progress dialog processes events, results arriving now must not touch the inputs.
+    # Results still pending are computed below instead.
+    pending = {job: worker.is_pending(job) for job in (AUTO_GAP_JOB, LAYOUT_JOB, PACK_JOB)}
+    for job in pending:
+        worker.invalidate(job)
+
+    try:
+        # Packing and the layout fallbacks can take a while too, the total is set once known
+        with Progress.show('Creating Sinterbox', 1) as progress:
+            if the_box.pack_parts:
+                spacing = part_clearance(the_box.feature_values)
+                if the_box.packing is None or not the_box.packing.matches(the_box.source_boxes, spacing):
+                    the_box.packing = pack_boxes(the_box.source_boxes, spacing)
+                    the_box.update_selections(selection_bodies)
+                    progress.step(0)
+
+            if AUTO_SIZE_GAPS and not OPTIMIZE_LAYOUT and pending[AUTO_GAP_JOB]:
+                new_gap = auto_gaps(selection_bodies, the_box.modified_b_box, thickness_input.value,
+                                    bar_input.value, the_box.escape_gaps)
+                gap_input.value = new_gap
+                the_box.feature_values.gap = new_gap
+                progress.step(0)
+
+            if OPTIMIZE_LAYOUT and pending[LAYOUT_JOB]:
+                new_gap, new_bars = optimized_layout(
+                    selection_bodies, the_box.modified_b_box, the_box.feature_values,
+                    the_box.profile.min_gap, the_box.profile.min_bar, the_box.grid, the_box.escape_gaps
+                )
+                gap_input.value = new_gap
+                the_box.feature_values.gap = new_gap
+                the_box.feature_values.bars = new_bars
+                progress.step(0)
+
+            # Interference is shown in the dialog while editing, the commit is not blocked by it
+            interferences = the_box.validate()
+            if len(interferences) > 0:
+                logger.warning('Sinterbox created with interference: %s',
+                               ', '.join(item.name for item in interferences), event='execute')
+
+            progress.set_total(commit_step_count(
+                the_box.modified_b_box, the_box.feature_values, the_box.grid, len(selection_bodies),
+                the_box.packing_active, new_component_input.value
+            ))
+            new_occurrence = the_box.create_brep(progress)
+            enclosed_bodies = selection_bodies
+
+            if the_box.packing_active:
+                last_index = pack_bodies(design, selection_bodies, the_box.packing, progress)
+                group_end_index = max(group_end_index, last_index)
+
+            if new_component_input.value:
+                enclosed_bodies, last_index = move_bodies(design, selection_bodies, new_occurrence, progress)
+                group_end_index = max(group_end_index, last_index)
+    except CommitCancelled:
+        logger.info('Sinterbox cancelled', event='execute')
+        # Fusion rolls back everything done in this execute
+        args.executeFailed = True
+        args.executeFailedMessage = 'Sinterbox creation was cancelled'
+        return
+
+    the_box.save_definition(new_occurrence, enclosed_bodies)
 
     if is_parametric:
         t_group = design.timeline.timelineGroups.add(group_start_index, group_end_index)
@@ -173,8 +278,10 @@ def command_execute(args: adsk.core.CommandEventArgs):
 
 
 def command_preview(args: adsk.core.CommandEventArgs):
-    futil.log(f'{CMD_NAME} Command Preview Event')
+    logger.debug('Command Preview Event', event='preview', dragging=IS_DRAGGING)
     inputs = args.command.commandInputs
+    if recorder is not None:
+        recorder.record('preview', inputs)
 
     selection_input: adsk.core.SelectionCommandInput = inputs.itemById('body_select')
     selection_bodies = [selection_input.selection(i).entity for i in range(selection_input.selectionCount)]
@@ -190,14 +297,26 @@ def command_preview(args: adsk.core.CommandEventArgs):
         else:
             the_box.update_graphics()
 
+        metrics_input: adsk.core.TextBoxCommandInput = inputs.itemById('metrics_text')
+        metrics_input.formattedText = metrics_message(the_box.metrics())
+        metrics_input.isVisible = True
+
+        if not IS_DRAGGING:
+            validation_input: adsk.core.TextBoxCommandInput = inputs.itemById('validation_text')
+            validation_input.formattedText = interference_message(the_box.validate())
+            validation_input.isVisible = True
+
 
 def command_input_changed(args: adsk.core.InputChangedEventArgs):
-    global AUTO_SIZE_GAPS
+    global AUTO_SIZE_GAPS, OPTIMIZE_LAYOUT
 
     changed_input = args.input
     command: adsk.core.Command = args.firingEvent.sender
     inputs = command.commandInputs
-    futil.log(f'{CMD_NAME} Input Changed Event fired from a change to {changed_input.id}')
+    logger.debug('Input Changed Event fired from a change to %s', futil.Lazy(lambda: changed_input.id),
+                 event='input_changed')
+    if recorder is not None:
+        recorder.record('input_changed', inputs, changed_input.id)
 
     selection_input: adsk.core.SelectionCommandInput = inputs.itemById('body_select')
     selection_bodies = [selection_input.selection(i).entity for i in range(selection_input.selectionCount)]
@@ -226,10 +345,8 @@ def command_input_changed(args: adsk.core.InputChangedEventArgs):
 
             the_box.update_selections(selection_bodies)
 
-            if AUTO_SIZE_GAPS:
-                new_gap = auto_gaps(selection_bodies, the_box.modified_b_box, thickness_value, bar_value)
-                gap_input.value = new_gap
-                the_box.feature_values.gap = new_gap
+            if AUTO_SIZE_GAPS and not OPTIMIZE_LAYOUT:
+                request_auto_gap(command, selection_bodies, thickness_value, bar_value)
         else:
             if direction_group is not None:
                 direction_input: adsk.core.DirectionCommandInput
@@ -243,41 +360,181 @@ def command_input_changed(args: adsk.core.InputChangedEventArgs):
         the_box.feature_values.gap = gap_value
     elif changed_input.id == 'thick_input':
         the_box.feature_values.shell_thickness = thickness_value
+    elif changed_input.id == 'cells_input':
+        cells_input: adsk.core.IntegerSpinnerCommandInput = changed_input
+        the_box.feature_values.cells = cells_input.value
+    elif changed_input.id == 'profile_input':
+        profile_input: adsk.core.DropDownCommandInput = changed_input
+        profile = get_profile(app.activeProduct, profile_input.selectedItem.name)
+        the_box.apply_profile(profile)
+        # Results computed with the previous profile are dropped, new jobs are submitted below
+        for job in (AUTO_GAP_JOB, LAYOUT_JOB, PACK_JOB):
+            worker.invalidate(job)
+        if AUTO_SIZE_GAPS and not OPTIMIZE_LAYOUT and len(selection_bodies) > 0:
+            request_auto_gap(command, selection_bodies, profile.thickness, profile.bar)
     elif changed_input.id == 'auto_gaps_input':
         AUTO_SIZE_GAPS = auto_gaps_value
         if AUTO_SIZE_GAPS:
             gap_input.isEnabled = False
             if len(selection_bodies) > 0:
-                new_gap = auto_gaps(selection_bodies, the_box.modified_b_box, thickness_value, bar_value)
-                gap_input.value = new_gap
-                the_box.feature_values.gap = new_gap
+                request_auto_gap(command, selection_bodies, thickness_value, bar_value)
         else:
+            worker.invalidate(AUTO_GAP_JOB)
             gap_input.isEnabled = True
+    elif changed_input.id == 'pack_input':
+        pack_input: adsk.core.BoolValueCommandInput = changed_input
+        the_box.pack_parts = pack_input.value
+        if not the_box.pack_parts:
+            worker.invalidate(PACK_JOB)
+            if len(selection_bodies) > 0:
+                the_box.update_selections(selection_bodies)
+    elif changed_input.id == 'optimize_input':
+        optimize_input: adsk.core.BoolValueCommandInput = changed_input
+        OPTIMIZE_LAYOUT = optimize_input.value
+        auto_gaps_input.isEnabled = not OPTIMIZE_LAYOUT
+        if OPTIMIZE_LAYOUT:
+            worker.invalidate(AUTO_GAP_JOB)
+            gap_input.isEnabled = False
+        else:
+            worker.invalidate(LAYOUT_JOB)
+            the_box.feature_values.bars = None
+            gap_input.isEnabled = not AUTO_SIZE_GAPS
+            if AUTO_SIZE_GAPS and len(selection_bodies) > 0:
+                request_auto_gap(command, selection_bodies, thickness_value, bar_value)
+
+    is_offset_input = changed_input.id.startswith('dist_')
+    if the_box.pack_parts and not IS_DRAGGING and len(selection_bodies) > 0 and \
+            (changed_input.id in ('body_select', 'pack_input', 'profile_input') or is_offset_input):
+        the_box.refresh_box()
+        request_packing(command)
+
+    is_layout_input = changed_input.id in LAYOUT_INPUTS or is_offset_input
+    if OPTIMIZE_LAYOUT and not IS_DRAGGING and len(selection_bodies) > 0 and \
+            (is_layout_input or changed_input.id == 'optimize_input'):
+        the_box.refresh_box()
+        request_layout(command, selection_bodies)
+
+
+def request_auto_gap(command: adsk.core.Command, selection_bodies, thickness_value, bar_value):
+    # Body measurements need the API, the heuristic itself runs in the worker pool
+    max_gaps = body_max_gaps(selection_bodies, the_box.escape_gaps)
+    sides = the_box.modified_b_box.sides
+    worker.submit(
+        AUTO_GAP_JOB, auto_gap_value, (sides, max_gaps, thickness_value, bar_value),
+        lambda new_gap: apply_auto_gap(command, new_gap)
+    )
+
+
+def request_packing(command: adsk.core.Command):
+    spacing = part_clearance(the_box.feature_values)
+    worker.submit(
+        PACK_JOB, pack_boxes, ([b_box.copy() for b_box in the_box.source_boxes], spacing),
+        lambda packing: apply_packing(command, packing)
+    )
+
+
+def apply_packing(command: adsk.core.Command, packing):
+    if the_box is None or not the_box.pack_parts:
+        return
+    the_box.packing = packing
+    logger.debug('Parts packed', event='pack', parts=len(packing.boxes), volume=packing.volume)
+
+    selection_input: adsk.core.SelectionCommandInput = command.commandInputs.itemById('body_select')
+    selection_bodies = [selection_input.selection(i).entity for i in range(selection_input.selectionCount)]
+    if len(selection_bodies) > 0:
+        the_box.update_selections(selection_bodies)
+        if OPTIMIZE_LAYOUT:
+            request_layout(command, selection_bodies)
+        elif AUTO_SIZE_GAPS:
+            request_auto_gap(command, selection_bodies, the_box.feature_values.shell_thickness,
+                             the_box.feature_values.bar)
+    command.doExecutePreview()
+
+
+def request_layout(command: adsk.core.Command, selection_bodies):
+    # Like the auto gap, only the body measurements need the API
+    escape_gap = min(body_max_gaps(selection_bodies, the_box.escape_gaps))
+    feature_values = the_box.feature_values
+    profile = the_box.profile
+    worker.submit(
+        LAYOUT_JOB, optimize_slot_layout,
+        (the_box.modified_b_box.copy(), feature_values.shell_thickness, profile.min_gap, escape_gap,
+         max(feature_values.bar, profile.min_bar), the_box.grid.copy() if the_box.grid else None),
+        lambda layout: apply_layout(command, layout)
+    )
+
+
+def apply_layout(command: adsk.core.Command, layout):
+    if the_box is None or not OPTIMIZE_LAYOUT:
+        return
+    new_gap, new_bars, open_area = layout
+    gap_input: adsk.core.ValueCommandInput = command.commandInputs.itemById('gap')
+    gap_input.value = new_gap
+    the_box.feature_values.gap = new_gap
+    the_box.feature_values.bars = list(new_bars)
+    logger.debug('Bar layout optimized', event='layout', gap=new_gap, bars=new_bars, open_area=open_area)
+    command.doExecutePreview()
+
+
+def apply_auto_gap(command: adsk.core.Command, new_gap: float):
+    if the_box is None or not AUTO_SIZE_GAPS:
+        return
+    gap_input: adsk.core.ValueCommandInput = command.commandInputs.itemById('gap')
+    gap_input.value = new_gap
+    the_box.feature_values.gap = new_gap
+    command.doExecutePreview()
 
 
 def mouse_drag_begin(args: adsk.core.MouseEventArgs):
-    futil.log(f'{CMD_NAME} mouse_drag_begin')
+    logger.debug('mouse_drag_begin', event='drag_begin')
     global IS_DRAGGING
     IS_DRAGGING = True
+    if recorder is not None:
+        recorder.record('drag_begin', args.firingEvent.sender.commandInputs)
 
 
 def mouse_drag_end(args: adsk.core.MouseEventArgs):
-    futil.log(f'{CMD_NAME} mouse_drag_end')
+    logger.debug('mouse_drag_end', event='drag_end')
     global IS_DRAGGING
     IS_DRAGGING = False
 
     command: adsk.core.Command = args.firingEvent.sender
     inputs = command.commandInputs
+    if recorder is not None:
+        recorder.record('drag_end', inputs)
+
     full_preview_input: adsk.core.BoolValueCommandInput = inputs.itemById('full_preview_input')
     full_preview_value = full_preview_input.value
 
+    if OPTIMIZE_LAYOUT or the_box.pack_parts:
+        selection_input: adsk.core.SelectionCommandInput = inputs.itemById('body_select')
+        selection_bodies = [selection_input.selection(i).entity for i in range(selection_input.selectionCount)]
+        if len(selection_bodies) > 0:
+            the_box.refresh_box()
+            if the_box.pack_parts:
+                request_packing(command)
+            else:
+                request_layout(command, selection_bodies)
+
     if full_preview_value:
         command.doExecutePreview()
 
 
 def command_destroy(args: adsk.core.CommandEventArgs):
-    global local_handlers
-    futil.log(f'{CMD_NAME} Command Destroy Event')
+    global worker, recorder
+    logger.debug('Command Destroy Event', event='destroy')
+    if recorder is not None:
+        recorder.record('destroy', args.command.commandInputs)
+        recorder.close()
+        recorder = None
+    if worker is not None:
+        worker.stop()
+        worker = None
+    the_box.worker = None
     the_box.clear_graphics()
-    local_handlers = []
+    futil.remove_handlers(local_handlers)
+    logger.debug('Handlers still attached', event='destroy', **futil.handler_counts())
+    if futil.get_profiler().enabled:
+        logger.log(futil.INFO_LEVEL, 'adsk API profile\n%s', futil.stop_profiling(), force_console=True)
+    futil.flush_logs()
 
@@ -0,0 +1,99 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import adsk.core
+import adsk.fusion
+import os
+
+from ..SinterBoxCommand.SinterBoxPersistence import is_sinterbox, update_sinterbox
+from ...lib import fusion360utils as futil
+from ... import config
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+
+CMD_NAME = 'Update Sinterbox'
+CMD_Description = 'Regenerates the cage of existing sinterboxes after the enclosed parts have moved.<br><br>' \
+                  'Only sinterboxes whose parts or parameters changed are rebuilt.'
+IS_PROMOTED = False
+CMD_ID = f'{config.COMPANY_NAME}_{config.ADDIN_NAME}_UpdateSinterbox'
+
+WORKSPACE_IDS = ['FusionSolidEnvironment']
+PANEL_ID = 'SolidCreatePanel'
+COMMAND_BESIDE_ID = f'{config.COMPANY_NAME}_{config.ADDIN_NAME}_Sinterbox'
+ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', '')
+local_handlers = []
+logger = futil.get_logger(CMD_NAME)
+
+
+def start():
+    cmd_def = ui.commandDefinitions.addButtonDefinition(CMD_ID, CMD_NAME, CMD_Description, ICON_FOLDER)
+    futil.add_handler(cmd_def.commandCreated, command_created)
+
+    for WORKSPACE_ID in WORKSPACE_IDS:
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        panel = workspace.toolbarPanels.itemById(PANEL_ID)
+        control = panel.controls.addCommand(cmd_def, COMMAND_BESIDE_ID, False)
+        control.isPromoted = IS_PROMOTED
+
+
+def stop():
+    for WORKSPACE_ID in WORKSPACE_IDS:
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        panel = workspace.toolbarPanels.itemById(PANEL_ID)
+        command_control = panel.controls.itemById(CMD_ID)
+        command_definition = ui.commandDefinitions.itemById(CMD_ID)
+
+        if command_control:
+            command_control.deleteMe()
+
+        if command_definition:
+            command_definition.deleteMe()
+
+
+def command_created(args: adsk.core.CommandCreatedEventArgs):
+    logger.debug('Command Created Event', event='created')
+
+    futil.add_handler(args.command.execute, command_execute, local_handlers=local_handlers)
+    futil.add_handler(args.command.preSelect, command_pre_select, local_handlers=local_handlers)
+    futil.add_handler(args.command.destroy, command_destroy, local_handlers=local_handlers)
+
+    inputs = args.command.commandInputs
+    selection_input = inputs.addSelectionInput('sinterbox_select', "Sinterboxes", "Sinterboxes to update")
+    selection_input.addSelectionFilter('Occurrences')
+    selection_input.setSelectionLimits(1, 0)
+
+
+def command_pre_select(args: adsk.core.SelectionEventArgs):
+    entity = args.selection.entity
+    args.isSelectable = isinstance(entity, adsk.fusion.Occurrence) and is_sinterbox(entity)
+
+
+def command_execute(args: adsk.core.CommandEventArgs):
+    logger.debug('Command Execute Event', event='execute')
+
+    inputs = args.command.commandInputs
+    selection_input: adsk.core.SelectionCommandInput = inputs.itemById('sinterbox_select')
+    occurrences = [selection_input.selection(i).entity for i in range(selection_input.selectionCount)]
+
+    messages = []
+    for occurrence in occurrences:
+        message = update_sinterbox(occurrence)
+        logger.info(message, event='update')
+        messages.append(message)
+    ui.messageBox('\n'.join(messages), CMD_NAME)
+
+
+def command_destroy(args: adsk.core.CommandEventArgs):
+    logger.debug('Command Destroy Event', event='destroy')
+    futil.remove_handlers(local_handlers)
+    futil.flush_logs()
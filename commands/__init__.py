@@ -4,12 +4,14 @@
 # If you want to add an additional command, duplicate one of the existing directories and import it here.
 # You need to use aliases (import "entry" as "my_module") assuming you have the default module named "entry".
 from .SinterBoxCommand import entry as sinter_box_command
+from .SinterBoxUpdateCommand import entry as sinter_box_update_command
 
 
 # TODO add your imported modules to this list.
 # Fusion will automatically call the start() and stop() functions.
 commands = [
-    sinter_box_command
+    sinter_box_command,
+    sinter_box_update_command
 ]
 
 
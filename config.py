@@ -13,6 +13,8 @@
 # This module serves as a way to share variables across different
 # modules (global variables).
 import os
+import sys
+import tempfile
 
 # Flag that indicates to run in Debug mode or not. When running in Debug mode
 # more information is written to the Text Command window. Generally, it's useful
@@ -20,6 +22,15 @@ import os
 # are ready to distribute it.
 DEBUG = False
 
+# Log records are buffered in memory and written in batches to a rotating log file.
+# Only messages at or above INFO are recorded unless DEBUG is True.
+LOG_FILE = os.path.join(tempfile.gettempdir(), 'SinterBox.log')
+LOG_BUFFER_SIZE = 200
+
+# Counts calls and time spent in the adsk API for each command event and writes a report
+# to the log when the Sinterbox command closes.  Adds overhead to every wrapped call.
+PROFILE_API = False
+
 # Gets the name of the add-in from the name of the folder the py file is in.
 # This is used when defining unique internal names for various UI elements 
 # that need a unique name. It's also recommended to use a company name as 
@@ -38,3 +49,64 @@ DEFAULT_OFFSET_INCHES = ".125 in"
 DEFAULT_SHELL_INCHES = ".06 in"
 
 DEFAULT_COMPONENT_NAME = "Sinterbox"
+
+# Density of the printed material in g/cm^3, used for the cage mass of profiles without one
+DEFAULT_DENSITY = 0.95
+
+# Printer profiles, selectable in the Sinterbox dialog.  Values are expressions evaluated
+# once per unit system.  A profile without an 'inch' set uses its 'metric' values.
+# gap is the default Bar Spacing, min_bar and min_gap are the smallest bar width and
+# bar spacing the printer can reliably produce and clear of powder.  density is the
+# printed part density in g/cm^3, the same in every unit system.
+PRINTER_PROFILES = {
+    'Default': {
+        'metric': {
+            'thickness': DEFAULT_SHELL_METRIC, 'bar': '4 mm', 'gap': '8 mm', 'offset': DEFAULT_OFFSET_METRIC,
+            'min_bar': '1 mm', 'min_gap': '2 mm'
+        },
+        'inch': {
+            'thickness': DEFAULT_SHELL_INCHES, 'bar': '.12 in', 'gap': '.24 in', 'offset': DEFAULT_OFFSET_INCHES,
+            'min_bar': '.04 in', 'min_gap': '.08 in'
+        },
+        'density': DEFAULT_DENSITY,
+    },
+    'EOS (PA 2200)': {
+        'metric': {
+            'thickness': '1.5 mm', 'bar': '3 mm', 'gap': '6 mm', 'offset': '2 mm',
+            'min_bar': '1 mm', 'min_gap': '2 mm'
+        },
+        'density': 0.93,
+    },
+    'HP Multi Jet Fusion (PA 12)': {
+        'metric': {
+            'thickness': '2 mm', 'bar': '2.5 mm', 'gap': '5 mm', 'offset': '3 mm',
+            'min_bar': '1.5 mm', 'min_gap': '2.5 mm'
+        },
+        'density': 1.01,
+    },
+    'Formlabs Fuse (Nylon 12)': {
+        'metric': {
+            'thickness': '2 mm', 'bar': '3 mm', 'gap': '6 mm', 'offset': '2.5 mm',
+            'min_bar': '1.5 mm', 'min_gap': '3 mm'
+        },
+        'density': 1.0,
+    },
+}
+DEFAULT_PROFILE = 'Default'
+
+# Records the events and input values of every Sinterbox command session to
+# SESSION_RECORD_FILE, replay them with tools/replay_session.py to time each step
+RECORD_SESSIONS = False
+SESSION_RECORD_FILE = os.path.join(tempfile.gettempdir(), 'SinterBox_sessions.jsonl')
+
+# Folder for data kept between sessions, created when first written to
+if sys.platform == 'win32':
+    USER_DATA_DIR = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~')), COMPANY_NAME, ADDIN_NAME)
+else:
+    USER_DATA_DIR = os.path.join(os.path.expanduser('~'), 'Library', 'Application Support', COMPANY_NAME, ADDIN_NAME)
+
+# Measured cage build times used to pick the fastest boolean strategy
+BOOLEAN_TIMINGS_FILE = os.path.join(USER_DATA_DIR, 'boolean_timings.json')
+
+# Attribute group used to store Sinterbox definitions on the created component
+ATTRIBUTE_GROUP = f'{COMPANY_NAME}_Sinterbox'
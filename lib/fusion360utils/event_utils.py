@@ -10,15 +10,25 @@
 #  UNINTERRUPTED OR ERROR FREE.
 
 import sys
-from typing import Callable, Union
+from collections import Counter
+from typing import Callable, Dict, Union
 
 import adsk.core
 from .general_utils import handle_error
+from .profile_utils import get_profiler
 
 
 # Global Variable to hold Event Handlers
 _handlers = []
 
+# One handler class per adsk handler type, shared by every add_handler call
+_handler_classes: Dict[type, type] = {}
+
+# Number of handlers currently attached, by handler type name
+_handler_counts = Counter()
+
+_profiler = get_profiler()
+
 
 def add_handler(
         event: adsk.core.Event,
@@ -47,14 +57,38 @@ def add_handler(
     handler_type = module.__dict__[event.add.__annotations__['handler']]
     handler = _create_handler(handler_type, callback, event, name, local_handlers)
     event.add(handler)
+    _handler_counts[handler_type.__name__] += 1
     return handler
 
 
+def remove_handlers(handlers: list):
+    """Detaches the handlers from their events and empties the list.
+
+    Call this when a command is destroyed with the list passed as local_handlers,
+    so the handlers and their callbacks can be released.
+    """
+    for handler in handlers:
+        event = handler.event
+        if event is not None:
+            try:
+                event.remove(handler)
+            except:
+                pass
+            handler.event = None
+            _handler_counts[handler.type_name] -= 1
+    handlers.clear()
+
+
 def clear_handlers():
-    """Clears the global list of handlers.
+    """Detaches and clears the global list of handlers.
+    """
+    remove_handlers(_handlers)
+
+
+def handler_counts() -> Dict[str, int]:
+    """Number of attached handlers by handler type, to spot handlers that are never removed.
     """
-    global _handlers
-    _handlers = []
+    return {type_name: count for type_name, count in _handler_counts.items() if count != 0}
 
 
 def _create_handler(
@@ -64,22 +98,34 @@ def _create_handler(
         name: str = None,
         local_handlers: list = None
 ):
-    handler = _define_handler(handler_type, callback, name)()
+    handler = _define_handler(handler_type)(callback, event, name or handler_type.__name__)
     (local_handlers if local_handlers is not None else _handlers).append(handler)
     return handler
 
 
-def _define_handler(handler_type, callback, name: str = None):
-    name = name or handler_type.__name__
+def _define_handler(handler_type):
+    handler_class = _handler_classes.get(handler_type)
+    if handler_class is not None:
+        return handler_class
 
     class Handler(handler_type):
-        def __init__(self):
+        def __init__(self, callback: Callable, event: adsk.core.Event, name: str):
             super().__init__()
+            self.callback = callback
+            self.event = event
+            self.name = name
+            self.type_name = handler_type.__name__
+            self.event_name = getattr(callback, '__name__', name)
 
         def notify(self, args):
             try:
-                callback(args)
+                if _profiler.enabled:
+                    with _profiler.event(self.event_name):
+                        self.callback(args)
+                else:
+                    self.callback(args)
             except:
-                handle_error(name)
+                handle_error(self.name)
 
+    _handler_classes[handler_type] = Handler
     return Handler
@@ -12,6 +12,7 @@
 import os
 import traceback
 import adsk.core
+from .log_utils import get_logger, to_log_level
 
 app = adsk.core.Application.get()
 ui = app.userInterface
@@ -23,27 +24,21 @@ try:
 except:
     DEBUG = False
 
+_app_logger = get_logger('app')
+
 
 def log(message: str, level: adsk.core.LogLevels = adsk.core.LogLevels.InfoLogLevel, force_console: bool = False):
     """Utility function to easily handle logging in your app.
 
+    Messages below the configured level are dropped before any other work is done.
+    Prefer get_logger for frequent messages, it formats lazily and accepts key/value fields.
+
     Arguments:
     message -- The message to log.
     level -- The logging severity level.
     force_console -- Forces the message to be written to the Text Command window. 
     """    
-    # Always print to console, only seen through IDE.
-    print(message)  
-
-    # Log all errors to Fusion log file.
-    if level == adsk.core.LogLevels.ErrorLogLevel:
-        log_type = adsk.core.LogTypes.FileLogType
-        app.log(message, level, log_type)
-
-    # If config.DEBUG is True write all log messages to the console.
-    if DEBUG or force_console:
-        log_type = adsk.core.LogTypes.ConsoleLogType
-        app.log(message, level, log_type)
+    _app_logger.log(to_log_level(level), message, force_console=force_console)
 
 
 def handle_error(name: str, show_message_box: bool = False):
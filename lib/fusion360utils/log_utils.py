@@ -0,0 +1,227 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import logging
+import logging.handlers
+import os
+import tempfile
+
+import adsk.core
+
+app = adsk.core.Application.get()
+
+# Attempt to read logging settings from parent config.
+try:
+    from ... import config
+    DEBUG = config.DEBUG
+    LOG_FILE = getattr(config, 'LOG_FILE', None)
+    LOG_BUFFER_SIZE = getattr(config, 'LOG_BUFFER_SIZE', 200)
+except:
+    DEBUG = False
+    LOG_FILE = None
+    LOG_BUFFER_SIZE = 200
+
+LOG_FILE = LOG_FILE or os.path.join(tempfile.gettempdir(), 'fusion360utils.log')
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+DEBUG_LEVEL = logging.DEBUG
+INFO_LEVEL = logging.INFO
+WARNING_LEVEL = logging.WARNING
+ERROR_LEVEL = logging.ERROR
+
+_FUSION_LEVELS = {
+    adsk.core.LogLevels.InfoLogLevel: INFO_LEVEL,
+    adsk.core.LogLevels.WarningLogLevel: WARNING_LEVEL,
+    adsk.core.LogLevels.ErrorLogLevel: ERROR_LEVEL,
+}
+
+
+def to_log_level(level) -> int:
+    """Converts an adsk.core.LogLevels value to a logging level, ints are passed through"""
+    return _FUSION_LEVELS.get(level, level if isinstance(level, int) and level >= DEBUG_LEVEL else INFO_LEVEL)
+
+
+def to_fusion_level(level: int) -> adsk.core.LogLevels:
+    if level >= ERROR_LEVEL:
+        return adsk.core.LogLevels.ErrorLogLevel
+    if level >= WARNING_LEVEL:
+        return adsk.core.LogLevels.WarningLogLevel
+    return adsk.core.LogLevels.InfoLogLevel
+
+
+class FieldsFormatter(logging.Formatter):
+    """Appends the key/value fields of a record after the message"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            text += ' ' + ' '.join(f'{key}={value!r}' for key, value in fields.items())
+        return text
+
+
+class FusionConsoleHandler(logging.Handler):
+    """Writes records to the Text Command window, errors also go to the Fusion log file"""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = self.format(record)
+            fusion_level = to_fusion_level(record.levelno)
+            if record.levelno >= ERROR_LEVEL:
+                app.log(message, fusion_level, adsk.core.LogTypes.FileLogType)
+            if DEBUG or getattr(record, 'force_console', False):
+                app.log(message, fusion_level, adsk.core.LogTypes.ConsoleLogType)
+        except:
+            self.handleError(record)
+
+
+class Lazy:
+    """Log argument that is only evaluated if the record is written
+
+        logger.debug('Changed %s', Lazy(lambda: changed_input.id))
+    """
+    __slots__ = ('function', 'value')
+    _UNSET = object()
+
+    def __init__(self, function):
+        self.function = function
+        self.value = Lazy._UNSET
+
+    def get(self):
+        # Every handler formats the record, the function is only called once
+        if self.value is Lazy._UNSET:
+            self.value = self.function()
+        return self.value
+
+    def __str__(self) -> str:
+        return str(self.get())
+
+    def __repr__(self) -> str:
+        return repr(self.get())
+
+
+class StructuredLogger:
+    """Level gated logger with lazy formatting and buffered file output
+
+    The level check happens before any formatting, so a disabled call only costs an int
+    comparison.  Messages use %-style arguments that are only formatted if the record is
+    written, wrap arguments that are costly to get (adsk properties) in Lazy.  Extra
+    keyword arguments are recorded as key/value fields:
+
+        logger.debug('Preview for %d bodies', len(bodies), event='preview', dragging=False)
+
+    Records are buffered in memory and written to a rotating file in batches.  The buffer
+    is flushed when full, on any error and when flush() is called.  The handlers are
+    attached when the first record is written, so a logger kept by a module still works
+    after close_logs() and the add-in is started again.
+    """
+
+    def __init__(self, name: str, level: int = None):
+        self.name = name
+        self.level = level if level is not None else (DEBUG_LEVEL if DEBUG else INFO_LEVEL)
+        self._logger = logging.getLogger(f'fusion360utils.{name}')
+        self._logger.setLevel(DEBUG_LEVEL)
+        self._logger.propagate = False
+
+    def _emit(self, level: int, message: str, args: tuple, extra: dict):
+        logger = self._logger
+        if not logger.handlers:
+            for handler in _shared_handlers():
+                logger.addHandler(handler)
+        logger.log(level, message, *args, extra=extra)
+
+    def is_enabled_for(self, level: int) -> bool:
+        return level >= self.level
+
+    def log(self, level: int, message: str, *args, force_console: bool = False, **fields):
+        if level < self.level and not force_console:
+            return
+        self._emit(level, message, args, {'fields': fields, 'force_console': force_console})
+
+    def debug(self, message: str, *args, **fields):
+        if DEBUG_LEVEL < self.level:
+            return
+        self._emit(DEBUG_LEVEL, message, args, {'fields': fields})
+
+    def info(self, message: str, *args, **fields):
+        if INFO_LEVEL < self.level:
+            return
+        self._emit(INFO_LEVEL, message, args, {'fields': fields})
+
+    def warning(self, message: str, *args, **fields):
+        if WARNING_LEVEL < self.level:
+            return
+        self._emit(WARNING_LEVEL, message, args, {'fields': fields})
+
+    def error(self, message: str, *args, **fields):
+        self._emit(ERROR_LEVEL, message, args, {'fields': fields})
+
+    def flush(self):
+        for handler in self._logger.handlers:
+            handler.flush()
+
+
+_handlers = []
+_loggers = {}
+
+
+def _shared_handlers() -> list:
+    if len(_handlers) == 0:
+        formatter = FieldsFormatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True
+        )
+        file_handler.setFormatter(formatter)
+        buffer_handler = logging.handlers.MemoryHandler(
+            LOG_BUFFER_SIZE, flushLevel=ERROR_LEVEL, target=file_handler
+        )
+
+        console_handler = FusionConsoleHandler()
+        console_handler.setFormatter(logging.Formatter('%(message)s'))
+
+        _handlers.extend([buffer_handler, console_handler])
+    return _handlers
+
+
+def get_logger(name: str = 'app', level: int = None) -> StructuredLogger:
+    """Returns the shared logger for name, creating it on first use"""
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = StructuredLogger(name, level)
+        _loggers[name] = logger
+    elif level is not None:
+        logger.level = level
+    return logger
+
+
+def flush_logs():
+    """Writes any buffered records to the log file"""
+    for handler in _handlers:
+        handler.flush()
+
+
+def close_logs():
+    """Flushes and closes the log file, called when the add-in stops
+
+    Loggers stay registered and reopen the log file if they are used again.
+    """
+    for handler in _handlers:
+        handler.flush()
+        target = getattr(handler, 'target', None)
+        handler.close()
+        if target is not None:
+            target.close()
+    for logger in _loggers.values():
+        for handler in _handlers:
+            logger._logger.removeHandler(handler)
+    _handlers.clear()
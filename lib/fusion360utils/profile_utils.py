@@ -0,0 +1,168 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Tuple
+
+import adsk.core
+import adsk.fusion
+
+
+class ApiProfiler:
+    """Counts calls and cumulative time of adsk API methods, grouped by event
+
+    instrument() replaces methods, static methods and properties on the adsk classes with
+    counting wrappers until restore() is called, so it only costs anything while enabled.
+    Wrap event handlers in event() to attribute the calls made while handling them.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.current_event = 'other'
+        self.stats: Dict[Tuple[str, str], List] = {}
+        self._patches = []
+
+    def _record(self, label: str, seconds: float):
+        key = (self.current_event, label)
+        entry = self.stats.get(key)
+        if entry is None:
+            self.stats[key] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def _wrap(self, function, label: str):
+        profiler = self
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler._record(label, time.perf_counter() - start)
+        return wrapper
+
+    def instrument(self, owner: type, names: Iterable[str]):
+        """Wraps the named attributes of an adsk class, unknown names are ignored"""
+        for name in names:
+            try:
+                original = inspect.getattr_static(owner, name)
+            except AttributeError:
+                continue
+
+            label = f'{owner.__name__}.{name}'
+            if isinstance(original, staticmethod):
+                patched = staticmethod(self._wrap(original.__func__, label))
+            elif isinstance(original, classmethod):
+                patched = classmethod(self._wrap(original.__func__, label))
+            elif isinstance(original, property):
+                patched = property(
+                    self._wrap(original.fget, label) if original.fget else None,
+                    self._wrap(original.fset, f'{label}=') if original.fset else None,
+                    original.fdel
+                )
+            elif callable(original):
+                patched = self._wrap(original, label)
+            else:
+                continue
+
+            had_own = name in owner.__dict__
+            setattr(owner, name, patched)
+            self._patches.append((owner, name, original, had_own))
+        self.enabled = True
+
+    def restore(self):
+        """Removes all wrappers"""
+        for owner, name, original, had_own in reversed(self._patches):
+            if had_own:
+                setattr(owner, name, original)
+            else:
+                delattr(owner, name)
+        self._patches = []
+        self.enabled = False
+
+    @contextmanager
+    def event(self, name: str):
+        """Attributes the API calls made inside the block to the event name"""
+        previous = self.current_event
+        self.current_event = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record('(event total)', time.perf_counter() - start)
+            self.current_event = previous
+
+    def reset(self):
+        self.stats = {}
+
+    def report(self, limit: int = 20) -> str:
+        """Text report with the most expensive API methods of each event"""
+        events: Dict[str, List[Tuple[str, int, float]]] = {}
+        for (event, label), (count, seconds) in self.stats.items():
+            events.setdefault(event, []).append((label, count, seconds))
+
+        lines = []
+        for event, rows in sorted(events.items()):
+            rows.sort(key=lambda row: row[2], reverse=True)
+            lines.append(f'== {event} ==')
+            lines.append(f'{"method":<48}{"calls":>10}{"total ms":>12}{"avg us":>10}')
+            for label, count, seconds in rows[:limit]:
+                lines.append(f'{label:<48}{count:>10}{seconds * 1000:>12.2f}{seconds * 1e6 / count:>10.1f}')
+        return '\n'.join(lines)
+
+
+# The adsk calls made on the hot paths of the preview and commit
+API_TARGETS = (
+    (adsk.core.Point3D, ('create',)),
+    (adsk.core.Vector3D, ('create',)),
+    (adsk.core.Matrix3D, ('create',)),
+    (adsk.core.OrientedBoundingBox3D, ('create',)),
+    (adsk.core.ValueCommandInput, ('value',)),
+    (adsk.core.DistanceValueCommandInput, ('value', 'setManipulator')),
+    (adsk.core.BoolValueCommandInput, ('value',)),
+    (adsk.core.IntegerSpinnerCommandInput, ('value',)),
+    (adsk.core.SelectionCommandInput, ('selection', 'selectionCount')),
+    (adsk.core.CommandInputs, ('itemById',)),
+    (adsk.fusion.TemporaryBRepManager, ('get', 'createBox', 'booleanOperation', 'copy')),
+    (adsk.fusion.CustomGraphicsGroups, ('add',)),
+    (adsk.fusion.CustomGraphicsGroup, ('addBRepBody', 'addMesh', 'deleteMe')),
+    (adsk.fusion.CustomGraphicsCoordinates, ('create',)),
+    (adsk.fusion.BRepBody, ('boundingBox', 'copyToComponent', 'entityToken')),
+    (adsk.fusion.BRepBodies, ('add',)),
+    (adsk.fusion.Design, ('findEntityByToken',)),
+)
+
+_profiler = ApiProfiler()
+
+
+def get_profiler() -> ApiProfiler:
+    return _profiler
+
+
+def start_profiling(targets=API_TARGETS) -> ApiProfiler:
+    """Instruments the adsk API, handlers added with add_handler are profiled per event"""
+    if not _profiler.enabled:
+        for owner, names in targets:
+            _profiler.instrument(owner, names)
+    return _profiler
+
+
+def stop_profiling() -> str:
+    """Removes the instrumentation and returns the report of everything recorded since start"""
+    report = _profiler.report()
+    _profiler.restore()
+    _profiler.reset()
+    return report
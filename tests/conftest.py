@@ -0,0 +1,49 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# The tests import the add-in as the Sinterbox package, like Fusion does.  The packages
+# are registered without running their __init__ modules, those start the commands, so
+# the pure geometry modules can be tested without the adsk package.  Tests of modules
+# that use the API run against the stand-in adsk package in tools/adsk.
+import os
+import sys
+import types
+
+import pytest
+
+ADDIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGES = {
+    'Sinterbox': ADDIN_DIR,
+    'Sinterbox.commands': os.path.join(ADDIN_DIR, 'commands'),
+    'Sinterbox.commands.SinterBoxCommand': os.path.join(ADDIN_DIR, 'commands', 'SinterBoxCommand'),
+}
+
+sys.path.insert(0, os.path.join(ADDIN_DIR, 'tools'))
+
+for name, path in PACKAGES.items():
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [path]
+        sys.modules[name] = package
+
+
+@pytest.fixture
+def design():
+    """Empty parametric design in mm, set as the active product"""
+    pytest.importorskip('adsk.fusion')
+    import adsk.core
+    import adsk.fusion
+
+    app = adsk.core.Application.get()
+    design = adsk.fusion.Design('mm', True)
+    app.activeProduct = design
+    yield design
+    app.activeProduct = None
@@ -0,0 +1,115 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# API paths run against the stand-in adsk package in tools/adsk, where bodies are boxes
+import pytest
+
+pytest.importorskip('adsk.fusion')
+
+from Sinterbox.commands.SinterBoxCommand import SinterBoxUtils
+from Sinterbox.commands.SinterBoxCommand.SinterBoxAPI import SinterboxError, create_sinterbox
+from Sinterbox.commands.SinterBoxCommand.SinterBoxGeometry import AABB, combine_boxes
+from Sinterbox.commands.SinterBoxCommand.SinterBoxPersistence import find_cage_body, is_sinterbox, load_definition, \
+    update_sinterbox
+from Sinterbox.commands.SinterBoxCommand.SinterBoxUtils import clear_wall_cache
+
+
+def add_parts(design, count=4):
+    return [design.add_body((i * 2.0, 0, 0, i * 2.0 + 1.2, 1.0, 0.8), name=f'Part {i}') for i in range(count)]
+
+
+def test_create_sinterbox_encloses_the_bodies(design):
+    bodies = add_parts(design)
+    result = create_sinterbox(bodies, thickness=0.1, bar=0.1, offsets=0.2)
+
+    part_box = combine_boxes([AABB.from_b_box(body.boundingBox) for body in bodies])
+    assert result.b_box == part_box.grown(0.2)
+    assert result.feature_values.gap > 0
+    assert result.metrics.volume > 0
+    assert is_sinterbox(result.occurrence)
+
+    definition = load_definition(result.occurrence.component)
+    assert definition.body_tokens == [body.entityToken for body in bodies]
+    assert definition.b_box == part_box
+    assert [group.name for group in design.timeline.groups] == [result.occurrence.component.name]
+
+
+def test_create_sinterbox_with_cells_and_optimized_layout(design):
+    bodies = add_parts(design)
+    result = create_sinterbox(bodies, thickness=0.1, bar=0.1, offsets=0.2, cells=4, optimize_layout=True)
+    assert result.grid is not None
+    assert len(set(result.cells)) == len(bodies)
+    assert len(result.feature_values.bars) == 3
+    assert min(result.feature_values.bars) >= 0.1
+
+
+def test_create_sinterbox_packs_and_moves_bodies(design):
+    bodies = add_parts(design, 6)
+    result = create_sinterbox(bodies, thickness=0.1, bar=0.1, offsets=0.2, pack=True,
+                              move_bodies_to_component=True)
+    assert len(result.bodies) == len(bodies)
+    assert all(not body.isValid for body in bodies)
+
+
+def test_create_sinterbox_errors(design):
+    with pytest.raises(SinterboxError):
+        create_sinterbox([])
+    with pytest.raises(SinterboxError):
+        create_sinterbox(add_parts(design), offsets=(0.1, 0.2))
+
+
+def test_escape_gaps_are_measured_once(design, monkeypatch):
+    measured = []
+    original = SinterBoxUtils.principal_body_sides
+
+    def counting(body):
+        measured.append(body.entityToken)
+        return original(body)
+
+    monkeypatch.setattr(SinterBoxUtils, 'principal_body_sides', counting)
+    bodies = add_parts(design, 3)
+    escape_gaps = {}
+    first = SinterBoxUtils.body_max_gaps(bodies, escape_gaps)
+    assert SinterBoxUtils.body_max_gaps(bodies[1:], escape_gaps) == first[1:]
+    assert sorted(measured) == sorted(body.entityToken for body in bodies)
+    assert set(escape_gaps) == set(measured)
+
+
+def test_update_sinterbox_moves_or_rebuilds_the_cage(design):
+    bodies = add_parts(design)
+    result = create_sinterbox(bodies, thickness=0.1, bar=0.1, gap=0.3, offsets=0.2)
+    occurrence = result.occurrence
+    assert update_sinterbox(occurrence).endswith('is up to date')
+
+    old_box = AABB.from_b_box(find_cage_body(occurrence.component).boundingBox)
+    for body in bodies:
+        box = body.box
+        body.box = (box[0] + 5, box[1], box[2] - 1, box[3] + 5, box[4], box[5] - 1)
+    assert update_sinterbox(occurrence).endswith('cage moved')
+    new_box = AABB.from_b_box(find_cage_body(occurrence.component).boundingBox)
+    assert new_box.as_tuple() == pytest.approx(old_box.offset(5, -5, 0, 0, -1, 1).as_tuple())
+
+
+def test_update_sinterbox_slots_only_the_changed_walls(design, monkeypatch):
+    bodies = add_parts(design)
+    occurrence = create_sinterbox(bodies, thickness=0.1, bar=0.1, gap=0.3, offsets=0.2).occurrence
+    clear_wall_cache()
+    built = []
+    create_wall_body = SinterBoxUtils.create_wall_body
+    monkeypatch.setattr(SinterBoxUtils, 'create_wall_body', lambda wall, *args: built.append(wall) or
+                        create_wall_body(wall, *args))
+
+    # Growing along +x changes every wall except x_neg
+    bodies[-1].box = bodies[-1].box[:3] + (bodies[-1].box[3] + 1,) + bodies[-1].box[4:]
+    assert update_sinterbox(occurrence).endswith('cage rebuilt, 5 of 6 walls slotted again')
+    assert len(built) == 5
+    cage_box = AABB.from_b_box(find_cage_body(occurrence.component).boundingBox)
+    assert all(wall.min_x > cage_box.min_x for wall in built)
@@ -0,0 +1,85 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+import json
+import os
+
+import pytest
+
+pytest.importorskip('adsk.fusion')
+
+from Sinterbox.commands.SinterBoxCommand import SinterBoxBoolean
+from Sinterbox.commands.SinterBoxCommand.SinterBoxBoolean import (
+    STRATEGIES, BooleanStrategy, StrategyTimings, slot_bucket, slot_count, timed_build)
+from Sinterbox.commands.SinterBoxCommand.SinterBoxGeometry import AABB
+from Sinterbox.commands.SinterBoxCommand.SinterBoxUtils import FeatureValues, clear_wall_cache
+
+FEATURE_VALUES = FeatureValues(0.1, 0.1, 0.3, *([0.2] * 6))
+B_BOX = AABB(0, 0, 0, 3, 2, 1)
+
+
+@pytest.fixture
+def timings(tmp_path, monkeypatch):
+    timings = StrategyTimings(str(tmp_path / 'Sinterbox' / 'timings.json'))
+    timings.loaded = True
+    monkeypatch.setattr(SinterBoxBoolean, 'timings', timings)
+    return timings
+
+
+def test_strategies_must_implement_build():
+    class Incomplete(BooleanStrategy):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize('name', list(STRATEGIES))
+def test_strategies_build_the_cage(name, timings):
+    clear_wall_cache()
+    body, _ = timed_build(STRATEGIES[name], B_BOX, FEATURE_VALUES)
+    assert AABB.from_b_box(body.boundingBox).as_tuple() == pytest.approx(B_BOX.grown(0.1).as_tuple())
+    assert name in timings.timings[slot_bucket(slot_count(B_BOX, FEATURE_VALUES))]
+
+
+def test_cached_builds_are_not_recorded(timings):
+    strategy = STRATEGIES['per_wall_union']
+    bucket = slot_bucket(slot_count(B_BOX, FEATURE_VALUES))
+    clear_wall_cache()
+    timed_build(strategy, B_BOX, FEATURE_VALUES)
+    cold = timings.timings[bucket][strategy.name]
+
+    timed_build(strategy, B_BOX, FEATURE_VALUES)
+    assert timings.timings[bucket][strategy.name] == cold
+
+
+def test_every_strategy_is_tried_before_the_fastest_is_picked(timings):
+    count = 100
+    tried = []
+    for seconds in (4.0, 1.0, 2.0, 3.0):
+        name = timings.fastest(count)
+        assert name not in tried
+        tried.append(name)
+        timings.record(name, count, seconds)
+    assert tried[0] == 'per_wall_union'
+    assert sorted(tried) == sorted(STRATEGIES)
+    assert timings.fastest(count) == tried[1]
+    assert timings.fastest(10) == 'sequential_difference'
+
+
+def test_timings_are_saved_once(timings):
+    timings.record('sequential_difference', 10, 1.0)
+    timings.record('sequential_difference', 10, 2.0)
+    assert not os.path.exists(timings.path)
+
+    timings.save()
+    with open(timings.path) as timings_file:
+        assert json.load(timings_file) == {slot_bucket(10): {'sequential_difference': pytest.approx(1.3)}}
+    assert not timings.changed
@@ -0,0 +1,163 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+import random
+
+import pytest
+
+from Sinterbox.commands.SinterBoxCommand.SinterBoxGeometry import (
+    AABB, CellGrid, SpatialHash, axis_slot_centers, axis_slot_layout, axis_wall_positions, combine_boxes,
+    hash_cell_size, plan_cell_grid, shell_walls, slot_boxes, wall_slot_boxes)
+
+
+def random_boxes(count, seed=1, extent=10.0, max_side=1.5):
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(count):
+        x, y, z = (rng.uniform(0, extent) for _ in range(3))
+        boxes.append(AABB(x, y, z, x + rng.uniform(0.1, max_side), y + rng.uniform(0.1, max_side),
+                          z + rng.uniform(0.1, max_side)))
+    return boxes
+
+
+def test_axis_slot_layout_centers_the_slots():
+    num, margin = axis_slot_layout(10.0, 1.0, 0.5)
+    assert num == 7
+    assert margin == pytest.approx((10.0 - 7 * 1.0 - 6 * 0.5) / 2)
+
+    centers = axis_slot_centers(2.0, 10.0, 1.0, 0.5)
+    assert len(centers) == num
+    assert centers[0] - 0.5 - 2.0 == pytest.approx(margin)
+    assert 12.0 - (centers[-1] + 0.5) == pytest.approx(margin)
+
+
+def test_axis_slot_layout_gap_larger_than_side():
+    assert axis_slot_layout(1.0, 2.0, 0.5) == (0, 0)
+
+
+def test_cell_grid_spans_and_cells():
+    grid = CellGrid(AABB(0, 0, 0, 10, 6, 4), 0.4, ([3.0, 7.0], [], [2.0]))
+    assert grid.spans(0) == [(0, pytest.approx(2.8)), (pytest.approx(3.2), pytest.approx(6.8)),
+                             (pytest.approx(7.2), 10)]
+    assert grid.spans(1) == [(0, 6)]
+    assert grid.shape == (3, 1, 2)
+    assert grid.cell_count == 6
+    assert grid.assign([AABB(0, 0, 0, 1, 1, 1), AABB(8, 1, 3, 9, 2, 3.5)]) == [(0, 0, 0), (2, 0, 1)]
+
+
+def test_cell_grid_copy_is_independent():
+    grid = CellGrid(AABB(0, 0, 0, 10, 6, 4), 0.4, ([3.0], [], []))
+    grid_copy = grid.copy()
+    grid.b_box.expand(20, 0, 0)
+    grid.walls[0].append(7.0)
+    assert grid_copy.b_box == AABB(0, 0, 0, 10, 6, 4)
+    assert grid_copy.walls == ([3.0], [], [])
+
+
+def test_axis_wall_positions_stay_clear_of_parts():
+    intervals = [(0.0, 2.0), (1.5, 3.0), (4.0, 5.0), (5.2, 7.0), (8.0, 10.0)]
+    thickness, clearance = 0.3, 0.2
+    positions = axis_wall_positions(intervals, 0.0, 10.0, thickness, clearance, 3)
+    assert len(positions) == 2
+    for p in positions:
+        for start, end in intervals:
+            assert p + thickness / 2 + clearance <= start or p - thickness / 2 - clearance >= end
+    # The free space between 5.0 and 5.2 is too narrow for a wall
+    assert axis_wall_positions([(4.0, 5.0), (5.2, 7.0)], 0.0, 10.0, thickness, clearance, 3) == []
+
+
+def test_plan_cell_grid_puts_every_part_in_one_cell():
+    parts = [AABB(i * 3.0, j * 3.0, 0, i * 3.0 + 2, j * 3.0 + 2, 2) for i in range(3) for j in range(2)]
+    b_box = combine_boxes(parts).grown(0.5)
+    grid = plan_cell_grid(parts, b_box, 0.3, 0.2, 4)
+    assert grid.shape == (3, 2, 1)
+    assert len(set(grid.assign(parts))) == len(parts)
+
+
+@pytest.mark.parametrize('walls', [None, ([2.0], [1.5], []), ([1.0, 3.0], [2.0], [0.8])])
+def test_shell_walls_fill_the_shell(walls):
+    b_box = AABB(0, 0, 0, 4, 3, 2)
+    thickness = 0.25
+    grid = CellGrid(b_box, thickness, walls) if walls else None
+    pieces = shell_walls(b_box, thickness, grid)
+
+    outer = pieces.pop('x_neg'), pieces.pop('x_pos'), pieces.pop('y_neg'), pieces.pop('y_pos'), \
+        pieces.pop('z_neg'), pieces.pop('z_pos')
+    shell_volume = b_box.grown(thickness).volume - b_box.volume
+    assert sum(wall.volume for wall in outer) == pytest.approx(shell_volume)
+    for i, first in enumerate(outer):
+        for second in outer[i + 1:]:
+            assert not first.intersects(second, 1e-9)
+    # Internal walls span the inside of the shell
+    for wall in pieces.values():
+        assert combine_boxes([wall, b_box]) == b_box
+
+
+def test_slot_boxes_count_and_placement():
+    b_box = AABB(0, 0, 0, 4, 3, 2)
+    gap, bar, thickness = 0.4, 0.3, 0.2
+    nx = axis_slot_layout(4, gap, bar)[0]
+    ny = axis_slot_layout(3, gap, bar)[0]
+    nz = axis_slot_layout(2, gap, bar)[0]
+    slots = slot_boxes(b_box, gap, bar, thickness)
+    assert len(slots) == 2 * (ny * nz + nx * nz + nx * ny)
+
+    walls = shell_walls(b_box, thickness)
+    for key, wall_slots in wall_slot_boxes(b_box, gap, bar, thickness).items():
+        wall = walls[key]
+        for slot in wall_slots:
+            assert wall.min_x - 1e-9 <= slot.center.x <= wall.max_x + 1e-9
+            assert wall.min_y - 1e-9 <= slot.center.y <= wall.max_y + 1e-9
+            assert wall.min_z - 1e-9 <= slot.center.z <= wall.max_z + 1e-9
+
+
+def test_spatial_hash_matches_brute_force():
+    boxes = random_boxes(300)
+    index = SpatialHash(hash_cell_size(boxes, combine_boxes(boxes)))
+    for i, box in enumerate(boxes):
+        index.insert(i, box)
+
+    for probe in random_boxes(50, seed=2, max_side=3.0):
+        expected = {i for i, box in enumerate(boxes) if box.intersects(probe)}
+        assert set(index.query(probe)) == expected
+
+
+def test_spatial_hash_is_free_matches_query():
+    boxes = random_boxes(300)
+    index = SpatialHash(hash_cell_size(boxes, combine_boxes(boxes)))
+    for i, box in enumerate(boxes):
+        index.insert(i, box)
+    index.insert('large', AABB(20, 20, 20, 40, 40, 40))
+
+    for probe in random_boxes(100, seed=3, extent=40.0, max_side=1.0):
+        assert index.is_free(probe, 1e-6) == (len(index.query(probe, 1e-6)) == 0)
+
+
+def test_hash_cell_size_is_capped_by_extent():
+    extent = AABB(0, 0, 0, 64, 1, 1)
+    assert hash_cell_size([AABB(0, 0, 0, 0.1, 0.1, 0.1)] * 3, extent) == pytest.approx(2.0)
+    assert hash_cell_size([], extent) == pytest.approx(64)
+
+
+def test_spatial_hash_keeps_large_boxes_out_of_the_buckets():
+    boxes = random_boxes(100)
+    index = SpatialHash(0.5)
+    for i, box in enumerate(boxes):
+        index.insert(i, box)
+    index.insert('enclosure', AABB(-30, -30, -30, 30, 30, 30))
+
+    assert index.oversized == ['enclosure']
+    assert all('enclosure' not in keys for keys in index.buckets.values())
+    assert 'enclosure' in index.query(AABB(1, 1, 1, 2, 2, 2))
+    assert index.query(AABB(40, 40, 40, 41, 41, 41)) == []
+
+    # A query box larger than the whole index only visits the filled buckets
+    found = index.query(AABB(-1000, -1000, -1000, 1000, 1000, 1000))
+    assert sorted(found, key=str) == sorted(index.boxes, key=str)
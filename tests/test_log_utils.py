@@ -0,0 +1,62 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+import pytest
+
+pytest.importorskip('adsk.fusion')
+
+from Sinterbox.lib.fusion360utils import log_utils
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    path = tmp_path / 'test.log'
+    log_utils.close_logs()
+    monkeypatch.setattr(log_utils, 'LOG_FILE', str(path))
+    yield path
+    log_utils.close_logs()
+
+
+def test_records_are_buffered_until_flushed(log_file):
+    logger = log_utils.get_logger('buffered', log_utils.DEBUG_LEVEL)
+    logger.debug('Preview for %d bodies', 3, event='preview')
+    assert not log_file.exists()
+
+    log_utils.flush_logs()
+    assert "Preview for 3 bodies event='preview'" in log_file.read_text()
+
+
+def test_loggers_kept_by_modules_work_after_close(log_file):
+    logger = log_utils.get_logger('kept')
+    logger.info('Before stop')
+    log_utils.close_logs()
+    assert 'Before stop' in log_file.read_text()
+
+    # A module level logger is not fetched again after a restart
+    logger.error('After stop')
+    assert 'After stop' in log_file.read_text()
+    assert log_utils.get_logger('kept') is logger
+
+
+def test_lazy_arguments_are_only_evaluated_when_written(log_file):
+    calls = []
+
+    def input_id():
+        calls.append(1)
+        return 'bar'
+
+    logger = log_utils.get_logger('lazy', log_utils.INFO_LEVEL)
+    logger.debug('Changed %s', log_utils.Lazy(input_id))
+    assert calls == []
+
+    logger.info('Changed %s', log_utils.Lazy(input_id))
+    log_utils.flush_logs()
+    assert calls == [1]
+    assert 'Changed bar' in log_file.read_text()
@@ -0,0 +1,58 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+import math
+
+import pytest
+
+from Sinterbox.commands.SinterBoxCommand.SinterBoxGeometry import AABB, CellGrid, slot_boxes
+from Sinterbox.commands.SinterBoxCommand.SinterBoxMetrics import cage_metrics
+
+
+def cell_volume(grid):
+    lengths = [sum(end - start for start, end in grid.spans(axis)) for axis in range(3)]
+    return math.prod(lengths)
+
+
+def test_solid_cage_volume_and_area():
+    b_box = AABB(0, 0, 0, 4, 3, 2)
+    thickness = 0.5
+    # A gap wider than every side leaves the walls solid
+    metrics = cage_metrics(b_box, thickness, 10.0, 0.2, density=2.0)
+    outer = b_box.grown(thickness)
+    assert metrics.slot_count == 0
+    assert metrics.volume == pytest.approx(outer.volume - b_box.volume)
+    assert metrics.mass == pytest.approx(2.0 * metrics.volume)
+    assert metrics.surface_area == pytest.approx(2 * (5 * 4 + 4 * 3 + 5 * 3) + 2 * (4 * 3 + 3 * 2 + 4 * 2))
+    assert metrics.open_fraction == 0.0
+
+
+@pytest.mark.parametrize('walls', [([], [], []), ([2.5], [2.0], []), ([1.5, 3.5], [2.0], [1.8])])
+def test_slotted_cage_volume(walls):
+    b_box = AABB(0, 0, 0, 5.3, 4.1, 3.7)
+    thickness, gap, bar = 0.3, 0.7, 0.4
+    grid = CellGrid(b_box, thickness, walls)
+    metrics = cage_metrics(b_box, thickness, gap, bar, grid)
+
+    slots = slot_boxes(b_box, gap, bar, thickness, grid)
+    assert metrics.slot_count == len(slots)
+    assert metrics.open_area == pytest.approx(len(slots) * gap * gap)
+
+    solid = b_box.grown(thickness).volume - cell_volume(grid)
+    assert metrics.volume == pytest.approx(solid - len(slots) * gap * gap * thickness)
+    assert 0.0 < metrics.open_fraction < 1.0
+
+
+def test_per_axis_bars():
+    b_box = AABB(0, 0, 0, 6, 6, 6)
+    same = cage_metrics(b_box, 0.2, 0.5, 0.3)
+    wider = cage_metrics(b_box, 0.2, 0.5, (0.3, 0.3, 1.0))
+    assert wider.slot_count < same.slot_count
+    assert wider.volume > same.volume
@@ -0,0 +1,85 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+import pytest
+
+from Sinterbox.commands.SinterBoxCommand.SinterBoxGeometry import (
+    AABB, CellGrid, axis_slot_layout, gap_candidates, layout_open_area, optimize_slot_layout)
+
+
+def brute_force(grid, min_gap, max_gap, bar, steps=20000):
+    """Best open area over a fine sweep of gaps"""
+    best = (0.0, min_gap)
+    for i in range(steps + 1):
+        gap = min_gap + (max_gap - min_gap) * i / steps
+        area, _ = layout_open_area(grid, gap, (bar, bar, bar))
+        if area > best[0]:
+            best = (area, gap)
+    return best
+
+
+@pytest.mark.parametrize('b_box, thickness, min_gap, max_gap, bar', [
+    (AABB(0, 0, 0, 10, 10, 10), 0.2, 0.3, 2.0, 0.1),
+    (AABB(0, 0, 0, 3, 3, 3), 0.2, 0.3, 1.5, 0.1),
+    (AABB(-2, 1, 0, 7.3, 4.1, 2.9), 0.25, 0.2, 1.7, 0.15),
+])
+def test_optimize_slot_layout_matches_brute_force(b_box, thickness, min_gap, max_gap, bar):
+    grid = CellGrid(b_box, thickness)
+    gap, bars, _ = optimize_slot_layout(b_box, thickness, min_gap, max_gap, bar, grid)
+    area, _ = layout_open_area(grid, gap, bars)
+    brute_area, brute_gap = brute_force(grid, min_gap, max_gap, bar)
+
+    assert area >= brute_area * (1 - 1e-6)
+    assert gap == pytest.approx(brute_gap, abs=1e-3)
+
+
+def test_optimize_slot_layout_cube():
+    b_box = AABB(0, 0, 0, 10, 10, 10)
+    grid = CellGrid(b_box, 0.0)
+    gap, _, area = optimize_slot_layout(b_box, 0.0, 0.5, 2.0, 0.1, grid)
+    assert gap == pytest.approx(1.92)
+    assert area == pytest.approx(552.96)
+
+
+def test_gap_candidates_keep_the_slot_count():
+    length, bar = 10.0, 0.1
+    for gap in gap_candidates([(0.0, length)], 0.3, 3.0, bar):
+        num, margin = axis_slot_layout(length, gap, bar)
+        assert margin >= -1e-9
+        # A slightly larger gap loses a slot, so the candidate is a breakpoint
+        if gap < 3.0:
+            assert axis_slot_layout(length, gap + 1e-6, bar)[0] == num - 1
+
+
+def test_bars_are_at_least_the_bar_width():
+    b_box = AABB(0, 0, 0, 6.4, 5.1, 3.3)
+    gap, bars, _ = optimize_slot_layout(b_box, 0.2, 0.4, 1.2, 0.3)
+    assert 0.4 <= gap <= 1.2
+    assert all(bar >= 0.3 for bar in bars)
+    grid = CellGrid(b_box, 0.2)
+    for axis, bar in enumerate(bars):
+        for start, end in grid.spans(axis):
+            # Widening the bars keeps the slots reached with the bar width
+            assert axis_slot_layout(end - start, gap, bar)[0] == axis_slot_layout(end - start, gap, 0.3)[0]
+
+
+def test_single_slot_spans_keep_the_bar_width():
+    b_box = AABB(0, 0, 0, 1.5, 1.5, 1.5)
+    gap, bars, _ = optimize_slot_layout(b_box, 0.2, 0.4, 1.2, 0.3)
+    assert gap == pytest.approx(1.2)
+    assert bars == (0.3, 0.3, 0.3)
+
+
+@pytest.mark.parametrize('min_gap, min_bar', [(0.0, 0.1), (0.3, 0.0), (-1.0, 0.1)])
+def test_gap_candidates_reject_zero_sizes(min_gap, min_bar):
+    with pytest.raises(ValueError):
+        gap_candidates([(0.0, 10.0)], min_gap, 3.0, min_bar)
+    with pytest.raises(ValueError):
+        optimize_slot_layout(AABB(0, 0, 0, 10, 10, 10), 0.2, min_gap, 3.0, min_bar)
@@ -0,0 +1,80 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+import random
+
+import pytest
+
+from Sinterbox.commands.SinterBoxCommand.SinterBoxGeometry import AABB, combine_boxes
+from Sinterbox.commands.SinterBoxCommand.SinterBoxPacking import pack_boxes
+
+
+def random_parts(count, seed):
+    rng = random.Random(seed)
+    parts = []
+    for _ in range(count):
+        x, y, z = (rng.uniform(-20, 20) for _ in range(3))
+        parts.append(AABB(x, y, z, x + rng.uniform(0.2, 3), y + rng.uniform(0.2, 3), z + rng.uniform(0.2, 3)))
+    return parts
+
+
+def assert_valid_packing(parts, packing, spacing, allow_rotation):
+    assert len(packing.boxes) == len(parts)
+    for part, box in zip(parts, packing.boxes):
+        if allow_rotation:
+            assert sorted(box.sides) == pytest.approx(sorted(part.sides))
+        else:
+            assert box.sides == pytest.approx(part.sides)
+    for i, first in enumerate(packing.boxes):
+        for second in packing.boxes[i + 1:]:
+            assert not first.grown(spacing / 2).intersects(second.grown(spacing / 2), 1e-6)
+
+
+@pytest.mark.parametrize('count, seed', [(1, 0), (12, 1), (60, 2), (200, 3)])
+@pytest.mark.parametrize('allow_rotation', [True, False])
+def test_packing_has_no_overlaps_and_keeps_sizes(count, seed, allow_rotation):
+    parts = random_parts(count, seed)
+    spacing = 0.25
+    packing = pack_boxes(parts, spacing, allow_rotation)
+    assert_valid_packing(parts, packing, spacing, allow_rotation)
+    assert packing.matches(parts, spacing)
+
+
+def test_packing_hundreds_of_parts():
+    parts = random_parts(500, 6)
+    packing = pack_boxes(parts, 0.2)
+    assert_valid_packing(parts, packing, 0.2, True)
+
+
+def test_packing_is_more_compact_than_the_parts():
+    parts = random_parts(60, 4)
+    packing = pack_boxes(parts, 0.25)
+    assert packing.volume < combine_boxes(parts).volume
+    assert packing.volume >= sum(part.volume for part in parts)
+    origin = combine_boxes(parts).min_point
+    packed_min = combine_boxes(packing.boxes).min_point
+    assert (packed_min.x, packed_min.y, packed_min.z) == pytest.approx((origin.x, origin.y, origin.z), abs=0.25)
+
+
+def test_packing_transform_moves_the_center():
+    parts = random_parts(8, 5)
+    packing = pack_boxes(parts, 0.1)
+    for i, part in enumerate(parts):
+        rows, source_center, packed_center = packing.transform(i)
+        assert source_center == part.center()
+        assert packed_center == packing.boxes[i].center()
+        rotated = [abs(sum(row[k] * part.sides[k] for k in range(3))) for row in rows]
+        assert rotated == pytest.approx(list(packing.boxes[i].sides))
+
+
+def test_packing_no_boxes():
+    packing = pack_boxes([], 0.1)
+    assert packing.boxes == []
+    assert packing.volume == 0.0
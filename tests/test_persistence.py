@@ -0,0 +1,62 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import pytest
+
+pytest.importorskip('adsk.fusion')
+
+from Sinterbox.commands.SinterBoxCommand import SinterBoxUtils
+from Sinterbox.commands.SinterBoxCommand.SinterBoxGeometry import AABB, WALL_KEYS
+from Sinterbox.commands.SinterBoxCommand.SinterBoxUtils import FeatureValues, cage_wall_signatures, clear_wall_cache, \
+    create_cage_body
+
+
+def test_wall_signatures_follow_the_cage():
+    feature_values = FeatureValues(0.1, 0.1, 0.3, *([0.2] * 6))
+    b_box = AABB(0, 0, 0, 4, 3, 2)
+    moved = AABB(10, -2, 1, 14, 1, 3)
+    assert cage_wall_signatures(b_box, feature_values) == cage_wall_signatures(moved, feature_values)
+    assert cage_wall_signatures(b_box, feature_values) != cage_wall_signatures(AABB(0, 0, 0, 4, 3, 2.5),
+                                                                               feature_values)
+
+
+def test_cached_walls_are_moved_into_place(design):
+    feature_values = FeatureValues(0.1, 0.1, 0.3, *([0.2] * 6))
+    clear_wall_cache()
+    create_cage_body(AABB(0, 0, 0, 4, 3, 2), feature_values)
+    moved = create_cage_body(AABB(10, -2, 1, 14, 1, 3), feature_values)
+    clear_wall_cache()
+    fresh = create_cage_body(AABB(10, -2, 1, 14, 1, 3), feature_values)
+    assert AABB.from_b_box(moved.boundingBox).as_tuple() == pytest.approx(AABB.from_b_box(fresh.boundingBox).as_tuple())
+
+
+def test_rebuild_slots_only_the_changed_walls(design, monkeypatch):
+    feature_values = FeatureValues(0.1, 0.1, 0.3, *([0.2] * 6))
+    old_box = AABB(0, 0, 0, 4, 3, 2)
+    # Growing along +x changes every wall except x_neg
+    new_box = AABB(0, 0, 0, 5, 3, 2)
+    old_signatures = cage_wall_signatures(old_box, feature_values)
+    changed = [key for key, signature in cage_wall_signatures(new_box, feature_values).items()
+               if signature != old_signatures[key]]
+    assert sorted(changed) == sorted(key for key in WALL_KEYS if key != 'x_neg')
+
+    clear_wall_cache()
+    old_body = create_cage_body(old_box, feature_values)
+    clear_wall_cache()
+    built = []
+    create_wall_body = SinterBoxUtils.create_wall_body
+    monkeypatch.setattr(SinterBoxUtils, 'create_wall_body', lambda wall, *args: built.append(wall) or
+                        create_wall_body(wall, *args))
+
+    body = SinterBoxUtils.rebuild_cage_body(old_body, old_box, new_box, feature_values, changed=changed)
+    assert len(built) == len(changed)
+    fresh = create_cage_body(new_box, feature_values)
+    assert AABB.from_b_box(body.boundingBox).as_tuple() == pytest.approx(AABB.from_b_box(fresh.boundingBox).as_tuple())
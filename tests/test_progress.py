@@ -0,0 +1,63 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import pytest
+
+pytest.importorskip('adsk.fusion')
+
+import adsk.core
+
+from Sinterbox.commands.SinterBoxCommand import SinterBoxProgress
+from Sinterbox.commands.SinterBoxCommand.SinterBoxAPI import move_bodies, pack_bodies
+from Sinterbox.commands.SinterBoxCommand.SinterBoxGeometry import AABB
+from Sinterbox.commands.SinterBoxCommand.SinterBoxPacking import pack_boxes
+from Sinterbox.commands.SinterBoxCommand.SinterBoxProgress import NO_PROGRESS, CommitCancelled, Progress
+
+
+def add_parts(design, count=3):
+    return [design.add_body((i * 2.0, 0, 0, i * 2.0 + 1.2, 1.0, 0.8), name=f'Part {i}') for i in range(count)]
+
+
+def cancelled_progress(monkeypatch) -> Progress:
+    monkeypatch.setattr(SinterBoxProgress, 'YIELD_INTERVAL', 0)
+    dialog = adsk.core.ProgressDialog()
+    dialog.show('Test', '', 0, 10)
+    dialog.wasCancelled = True
+    return Progress(dialog)
+
+
+def test_no_progress_does_not_count():
+    NO_PROGRESS.step(5)
+    NO_PROGRESS.step()
+    assert NO_PROGRESS.value == 0
+
+
+def test_set_total_keeps_a_step():
+    dialog = adsk.core.ProgressDialog()
+    progress = Progress(dialog)
+    progress.set_total(0)
+    assert dialog.maximumValue == 1
+    progress.set_total(12)
+    assert dialog.maximumValue == 12
+
+
+def test_move_bodies_can_be_cancelled(design, monkeypatch):
+    bodies = add_parts(design)
+    occurrence = design.rootComponent.occurrences.addNewComponent(adsk.core.Matrix3D.create())
+    with pytest.raises(CommitCancelled):
+        move_bodies(design, bodies, occurrence, cancelled_progress(monkeypatch))
+
+
+def test_pack_bodies_can_be_cancelled(design, monkeypatch):
+    bodies = add_parts(design)
+    packing = pack_boxes([AABB.from_b_box(body.boundingBox) for body in bodies], 0.1)
+    with pytest.raises(CommitCancelled):
+        pack_bodies(design, bodies, packing, cancelled_progress(monkeypatch))
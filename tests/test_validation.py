@@ -0,0 +1,33 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import pytest
+
+pytest.importorskip('adsk.fusion')
+
+from Sinterbox.commands.SinterBoxCommand.SinterBoxGeometry import AABB
+from Sinterbox.commands.SinterBoxCommand.SinterBoxUtils import FeatureValues
+from Sinterbox.commands.SinterBoxCommand.SinterBoxValidation import ClearanceValidator, interference_message
+
+
+def test_walls_cutting_a_body_are_reported(design):
+    part = design.add_body((0, 0, 0, 1, 1, 1), name='Part')
+    neighbour = design.add_body((1.1, 0, 0, 2, 1, 1), name='Neighbour')
+    design.add_body((5, 5, 5, 6, 6, 6), name='Far')
+    feature_values = FeatureValues(0.1, 0.1, 0.3, *([0.0] * 6))
+    cage_box = AABB(0.05, 0, 0, 1.05, 1, 1)
+
+    validator = ClearanceValidator(design)
+    assert [item.name for item in validator.validate(cage_box, feature_values)] == ['Part', 'Neighbour']
+    interferences = validator.validate(cage_box, feature_values, exclude=[part])
+    assert [item.body for item in interferences] == [neighbour]
+    assert interference_message(interferences) == 'Cage intersects: Neighbour'
+    assert validator.validate(AABB(0, 0, 0, 1, 1, 1), feature_values, exclude=[part]) == []
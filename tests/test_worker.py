@@ -0,0 +1,48 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+import threading
+
+import pytest
+
+pytest.importorskip('adsk.fusion')
+
+import adsk.core
+
+from Sinterbox.commands.SinterBoxCommand.SinterBoxWorker import GeometryWorker
+
+
+@pytest.fixture
+def worker():
+    worker = GeometryWorker('test_geometry')
+    worker.start()
+    yield worker
+    worker.stop()
+
+
+def test_only_the_newest_result_is_delivered(worker):
+    release = threading.Event()
+    results = []
+    worker.submit('job', lambda: release.wait(5) and 'old', (), results.append)
+    worker.submit('job', lambda value: value, ('new',), results.append)
+    release.set()
+
+    app = adsk.core.Application.get()
+    while worker.is_pending('job'):
+        assert app.process_custom_events(timeout=5) > 0
+    app.process_custom_events(timeout=0.2)
+    assert results == ['new']
+
+
+def test_submit_after_stop_is_ignored(worker):
+    worker.stop()
+    assert worker.submit('job', lambda: None, (), lambda result: None) == 0
+    assert not worker.is_pending('job')
@@ -0,0 +1,19 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Local stand-in for the parts of the Fusion 360 API used by the Sinterbox command, so a
+# recorded session can be replayed outside Fusion (see tools/replay_session.py).  Bodies
+# are boxes: booleans only track bounding boxes and approximate volumes, so replay timings
+# measure the add-in code and the number of API calls, not the Fusion modeling kernel.
+
+
+def doEvents():
+    pass
@@ -0,0 +1,704 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Stand-in for adsk.core: geometry, command inputs, events and the application object.
+import math
+import queue
+import sys
+from typing import Any, Dict, List
+
+
+class Base:
+    """Common base of the stand-in classes, mirrors classType and objectType"""
+    _namespace = 'adsk::core'
+
+    @classmethod
+    def classType(cls) -> str:
+        return f'{cls._namespace}::{cls.__name__}'
+
+    @property
+    def objectType(self) -> str:
+        return self.classType()
+
+    @property
+    def isValid(self) -> bool:
+        return True
+
+
+class Stub:
+    """Accepts any attribute access or call, for parts of the UI a replay does not need"""
+
+    def __init__(self, name: str = 'Stub'):
+        self._name = name
+
+    def __getattr__(self, name: str) -> 'Stub':
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return Stub(f'{self._name}.{name}')
+
+    def __call__(self, *args, **kwargs) -> 'Stub':
+        return Stub(f'{self._name}()')
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+    def __bool__(self) -> bool:
+        return False
+
+
+_generated: Dict[str, type] = {}
+
+
+def __getattr__(name: str) -> type:
+    # Classes only named in type annotations or isinstance checks
+    if name.startswith('__'):
+        raise AttributeError(name)
+    if name not in _generated:
+        _generated[name] = type(name, (Base,), {'_namespace': __name__.replace('.', '::')})
+    return _generated[name]
+
+
+class LogLevels:
+    InfoLogLevel = 0
+    WarningLogLevel = 1
+    ErrorLogLevel = 2
+
+
+class LogTypes:
+    ConsoleLogType = 0
+    FileLogType = 1
+
+
+class DropDownStyles:
+    TextListDropDownStyle = 0
+    CheckBoxDropDownStyle = 1
+    LabeledIconDropDownStyle = 2
+
+
+#
+# Geometry
+#
+
+class Point3D(Base):
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        self.x, self.y, self.z = x, y, z
+
+    @staticmethod
+    def create(x: float = 0.0, y: float = 0.0, z: float = 0.0) -> 'Point3D':
+        return Point3D(x, y, z)
+
+    def copy(self):
+        return type(self)(self.x, self.y, self.z)
+
+    def asArray(self):
+        return self.x, self.y, self.z
+
+    def transformBy(self, matrix: 'Matrix3D') -> bool:
+        self.x, self.y, self.z = matrix.apply(self.x, self.y, self.z, 1.0)
+        return True
+
+
+class Vector3D(Point3D):
+    @staticmethod
+    def create(x: float = 0.0, y: float = 0.0, z: float = 0.0) -> 'Vector3D':
+        return Vector3D(x, y, z)
+
+    @property
+    def length(self) -> float:
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def transformBy(self, matrix: 'Matrix3D') -> bool:
+        self.x, self.y, self.z = matrix.apply(self.x, self.y, self.z, 0.0)
+        return True
+
+
+def _identity() -> List[List[float]]:
+    return [[1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+
+
+class Matrix3D(Base):
+    def __init__(self):
+        self.rows = _identity()
+
+    @staticmethod
+    def create() -> 'Matrix3D':
+        return Matrix3D()
+
+    def copy(self) -> 'Matrix3D':
+        matrix = Matrix3D()
+        matrix.rows = [row[:] for row in self.rows]
+        return matrix
+
+    def asArray(self) -> List[float]:
+        return [value for row in self.rows for value in row]
+
+    def setWithArray(self, values) -> bool:
+        self.rows = [list(values[i * 4:i * 4 + 4]) for i in range(4)]
+        return True
+
+    def apply(self, x: float, y: float, z: float, w: float):
+        r = self.rows
+        return tuple(r[i][0] * x + r[i][1] * y + r[i][2] * z + r[i][3] * w for i in range(3))
+
+    def transformBy(self, matrix: 'Matrix3D') -> bool:
+        """Applies matrix after this transform, like Fusion"""
+        a, b = matrix.rows, self.rows
+        self.rows = [[sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)] for i in range(4)]
+        return True
+
+    def invert(self) -> bool:
+        # Rigid transforms only: transpose the rotation and rotate the translation back
+        r = self.rows
+        rotation = [[r[j][i] for j in range(3)] for i in range(3)]
+        translation = [-sum(rotation[i][k] * r[k][3] for k in range(3)) for i in range(3)]
+        self.rows = [rotation[i] + [translation[i]] for i in range(3)] + [[0.0, 0.0, 0.0, 1.0]]
+        return True
+
+    def setToAlignCoordinateSystems(self, from_origin, from_x, from_y, from_z, to_origin, to_x, to_y, to_z) -> bool:
+        from_axes = [(v.x, v.y, v.z) for v in (from_x, from_y, from_z)]
+        to_axes = [(v.x, v.y, v.z) for v in (to_x, to_y, to_z)]
+        rotation = [[sum(to_axes[k][i] * from_axes[k][j] for k in range(3)) for j in range(3)] for i in range(3)]
+        origin = (from_origin.x, from_origin.y, from_origin.z)
+        translation = [
+            (to_origin.x, to_origin.y, to_origin.z)[i] - sum(rotation[i][k] * origin[k] for k in range(3))
+            for i in range(3)
+        ]
+        self.rows = [rotation[i] + [translation[i]] for i in range(3)] + [[0.0, 0.0, 0.0, 1.0]]
+        return True
+
+
+class BoundingBox3D(Base):
+    def __init__(self, min_point: Point3D, max_point: Point3D):
+        self.minPoint = min_point
+        self.maxPoint = max_point
+
+    @staticmethod
+    def create(min_point: Point3D, max_point: Point3D) -> 'BoundingBox3D':
+        return BoundingBox3D(min_point.copy(), max_point.copy())
+
+    def copy(self) -> 'BoundingBox3D':
+        return BoundingBox3D.create(self.minPoint, self.maxPoint)
+
+
+class OrientedBoundingBox3D(Base):
+    def __init__(self, center: Point3D, length_direction: Vector3D, width_direction: Vector3D,
+                 length: float, width: float, height: float):
+        self.centerPoint = center
+        self.lengthDirection = length_direction
+        self.widthDirection = width_direction
+        self.length, self.width, self.height = length, width, height
+
+    @staticmethod
+    def create(center, length_direction, width_direction, length, width, height) -> 'OrientedBoundingBox3D':
+        return OrientedBoundingBox3D(center.copy(), length_direction.copy(), width_direction.copy(),
+                                     length, width, height)
+
+    @property
+    def heightDirection(self) -> Vector3D:
+        l, w = self.lengthDirection, self.widthDirection
+        return Vector3D(l.y * w.z - l.z * w.y, l.z * w.x - l.x * w.z, l.x * w.y - l.y * w.x)
+
+    def bounding_box(self) -> BoundingBox3D:
+        c = self.centerPoint
+        axes = ((self.lengthDirection, self.length), (self.widthDirection, self.width),
+                (self.heightDirection, self.height))
+        extents = [sum(abs((d.x, d.y, d.z)[i]) * size / 2 for d, size in axes) for i in range(3)]
+        return BoundingBox3D(Point3D(c.x - extents[0], c.y - extents[1], c.z - extents[2]),
+                             Point3D(c.x + extents[0], c.y + extents[1], c.z + extents[2]))
+
+
+class Color(Base):
+    def __init__(self, red: int, green: int, blue: int, opacity: int):
+        self.red, self.green, self.blue, self.opacity = red, green, blue, opacity
+
+    @staticmethod
+    def create(red: int, green: int, blue: int, opacity: int) -> 'Color':
+        return Color(red, green, blue, opacity)
+
+
+class ValueInput(Base):
+    def __init__(self, real_value: float):
+        self.realValue = real_value
+
+    @staticmethod
+    def createByReal(value: float) -> 'ValueInput':
+        return ValueInput(value)
+
+
+class ObjectCollection(Base, list):
+    @staticmethod
+    def create() -> 'ObjectCollection':
+        return ObjectCollection()
+
+    def add(self, item) -> bool:
+        self.append(item)
+        return True
+
+    @property
+    def count(self) -> int:
+        return len(self)
+
+    def item(self, index: int):
+        return self[index]
+
+
+#
+# Events
+#
+
+class Event(Base):
+    def __init__(self, sender=None, name: str = ''):
+        self.sender = sender
+        self.name = name
+        self.handlers = []
+
+    def _add(self, handler) -> bool:
+        self.handlers.append(handler)
+        return True
+
+    def remove(self, handler) -> bool:
+        if handler in self.handlers:
+            self.handlers.remove(handler)
+            return True
+        return False
+
+    def fire(self, args):
+        args.firingEvent = self
+        for handler in list(self.handlers):
+            handler.notify(args)
+
+
+class EventHandler(Base):
+    def notify(self, args):
+        pass
+
+
+# futil.add_handler reads the handler type from the annotation of add, like the real API
+class CommandCreatedEventHandler(EventHandler):
+    pass
+
+
+class CommandEventHandler(EventHandler):
+    pass
+
+
+class InputChangedEventHandler(EventHandler):
+    pass
+
+
+class MouseEventHandler(EventHandler):
+    pass
+
+
+class CustomEventHandler(EventHandler):
+    pass
+
+
+class CommandCreatedEvent(Event):
+    def add(self, handler: 'CommandCreatedEventHandler') -> bool:
+        return self._add(handler)
+
+
+class CommandEvent(Event):
+    def add(self, handler: 'CommandEventHandler') -> bool:
+        return self._add(handler)
+
+
+class InputChangedEvent(Event):
+    def add(self, handler: 'InputChangedEventHandler') -> bool:
+        return self._add(handler)
+
+
+class MouseEvent(Event):
+    def add(self, handler: 'MouseEventHandler') -> bool:
+        return self._add(handler)
+
+
+class CustomEvent(Event):
+    def add(self, handler: 'CustomEventHandler') -> bool:
+        return self._add(handler)
+
+
+class EventArgs(Base):
+    def __init__(self, firing_event: Event = None):
+        self.firingEvent = firing_event
+
+
+class CommandCreatedEventArgs(EventArgs):
+    def __init__(self, command: 'Command'):
+        super().__init__()
+        self.command = command
+
+
+class CommandEventArgs(EventArgs):
+    def __init__(self, command: 'Command', firing_event: Event = None):
+        super().__init__(firing_event)
+        self.command = command
+        self.executeFailed = False
+        self.executeFailedMessage = ''
+        self.isValidResult = False
+
+
+class InputChangedEventArgs(EventArgs):
+    def __init__(self, command_input: 'CommandInput', inputs: 'CommandInputs', firing_event: Event = None):
+        super().__init__(firing_event)
+        self.input = command_input
+        self.inputs = inputs
+
+
+class MouseEventArgs(EventArgs):
+    pass
+
+
+class CustomEventArgs(EventArgs):
+    def __init__(self, additional_info: str, firing_event: Event = None):
+        super().__init__(firing_event)
+        self.additionalInfo = additional_info
+
+
+#
+# Command inputs
+#
+
+class CommandInput(Base):
+    def __init__(self, input_id: str, name: str = '', parent: 'CommandInputs' = None):
+        self.id = input_id
+        self.name = name
+        self.parent = parent
+        self.isVisible = True
+        self.isEnabled = True
+        self.tooltip = ''
+
+    @property
+    def parentCommand(self) -> 'Command':
+        return self.parent.command if self.parent is not None else None
+
+    def deleteMe(self) -> bool:
+        if self.parent is not None:
+            self.parent.remove(self)
+        return True
+
+
+class ValueCommandInput(CommandInput):
+    def __init__(self, input_id, name, unit_type: str, initial: ValueInput, parent=None):
+        super().__init__(input_id, name, parent)
+        self.unitType = unit_type
+        self.value = initial.realValue
+        self.minimumValue = -math.inf
+        self.maximumValue = math.inf
+        self.isMinimumValueInclusive = True
+        self.isMaximumValueInclusive = True
+
+    @property
+    def expression(self) -> str:
+        return f'{self.value} cm'
+
+
+class DistanceValueCommandInput(ValueCommandInput):
+    def __init__(self, input_id, name, initial: ValueInput, parent=None):
+        super().__init__(input_id, name, 'cm', initial, parent)
+        self.manipulatorOrigin = None
+        self.manipulatorDirection = None
+
+    def setManipulator(self, origin: Point3D, direction: Vector3D) -> bool:
+        self.manipulatorOrigin = origin
+        self.manipulatorDirection = direction
+        return True
+
+
+class BoolValueCommandInput(CommandInput):
+    def __init__(self, input_id, name, is_check_box: bool, resource_folder: str = '', initial: bool = False,
+                 parent=None):
+        super().__init__(input_id, name, parent)
+        self.isCheckBox = is_check_box
+        self.value = initial
+
+
+class IntegerSpinnerCommandInput(CommandInput):
+    def __init__(self, input_id, name, minimum: int, maximum: int, step: int, initial: int, parent=None):
+        super().__init__(input_id, name, parent)
+        self.minimumValue, self.maximumValue, self.spinStep = minimum, maximum, step
+        self.value = initial
+
+
+class TextBoxCommandInput(CommandInput):
+    def __init__(self, input_id, name, text: str, rows: int, read_only: bool, parent=None):
+        super().__init__(input_id, name, parent)
+        self.formattedText = text
+        self.numRows = rows
+        self.isReadOnly = read_only
+
+    @property
+    def text(self) -> str:
+        return self.formattedText
+
+
+class ListItem(Base):
+    def __init__(self, name: str, is_selected: bool, icon: str = ''):
+        self.name = name
+        self.isSelected = is_selected
+        self.icon = icon
+
+
+class ListItems(Base, list):
+    def add(self, name: str, is_selected: bool, icon: str = '', before_index: int = -1) -> ListItem:
+        item = ListItem(name, is_selected, icon)
+        if is_selected:
+            for other in self:
+                other.isSelected = False
+        self.append(item)
+        return item
+
+    @property
+    def count(self) -> int:
+        return len(self)
+
+    def item(self, index: int) -> ListItem:
+        return self[index]
+
+
+class DropDownCommandInput(CommandInput):
+    def __init__(self, input_id, name, style: int, parent=None):
+        super().__init__(input_id, name, parent)
+        self.dropDownStyle = style
+        self.listItems = ListItems()
+
+    @property
+    def selectedItem(self) -> ListItem:
+        return next((item for item in self.listItems if item.isSelected), None)
+
+    def select(self, name: str) -> bool:
+        for item in self.listItems:
+            item.isSelected = item.name == name
+        return self.selectedItem is not None
+
+
+class Selection(Base):
+    def __init__(self, entity):
+        self.entity = entity
+
+
+class SelectionCommandInput(CommandInput):
+    def __init__(self, input_id, name, prompt: str, parent=None):
+        super().__init__(input_id, name, parent)
+        self.prompt = prompt
+        self.filters = []
+        self.limits = (1, 0)
+        self.selections: List[Selection] = []
+
+    def addSelectionFilter(self, name: str) -> bool:
+        self.filters.append(name)
+        return True
+
+    def setSelectionLimits(self, minimum: int, maximum: int = 0) -> bool:
+        self.limits = (minimum, maximum)
+        return True
+
+    @property
+    def selectionCount(self) -> int:
+        return len(self.selections)
+
+    def selection(self, index: int) -> Selection:
+        return self.selections[index]
+
+    def addSelection(self, entity) -> bool:
+        self.selections.append(Selection(entity))
+        return True
+
+    def clearSelection(self) -> bool:
+        self.selections.clear()
+        return True
+
+
+class GroupCommandInput(CommandInput):
+    def __init__(self, input_id, name, parent=None):
+        super().__init__(input_id, name, parent)
+        self.children = CommandInputs(parent.command if parent is not None else None, parent)
+        self.isExpanded = True
+
+
+class CommandInputs(Base):
+    def __init__(self, command: 'Command' = None, parent: 'CommandInputs' = None):
+        self.command = command
+        self.items: List[CommandInput] = []
+        # itemById finds inputs inside groups too, the index is shared with the parent
+        self.index: Dict[str, CommandInput] = parent.index if parent is not None else {}
+
+    def __iter__(self):
+        return iter(list(self.items))
+
+    @property
+    def count(self) -> int:
+        return len(self.items)
+
+    def item(self, index: int) -> CommandInput:
+        return self.items[index]
+
+    def itemById(self, input_id: str):
+        return self.index.get(input_id)
+
+    def remove(self, command_input: CommandInput):
+        self.items.remove(command_input)
+        self.index.pop(command_input.id, None)
+
+    def _add(self, command_input: CommandInput) -> Any:
+        self.items.append(command_input)
+        self.index[command_input.id] = command_input
+        return command_input
+
+    def addSelectionInput(self, input_id, name, prompt) -> SelectionCommandInput:
+        return self._add(SelectionCommandInput(input_id, name, prompt, self))
+
+    def addBoolValueInput(self, input_id, name, is_check_box, resource_folder='', initial=False):
+        return self._add(BoolValueCommandInput(input_id, name, is_check_box, resource_folder, initial, self))
+
+    def addValueInput(self, input_id, name, unit_type, initial: ValueInput) -> ValueCommandInput:
+        return self._add(ValueCommandInput(input_id, name, unit_type, initial, self))
+
+    def addDistanceValueCommandInput(self, input_id, name, initial: ValueInput) -> DistanceValueCommandInput:
+        return self._add(DistanceValueCommandInput(input_id, name, initial, self))
+
+    def addIntegerSpinnerCommandInput(self, input_id, name, minimum, maximum, step, initial):
+        return self._add(IntegerSpinnerCommandInput(input_id, name, minimum, maximum, step, initial, self))
+
+    def addTextBoxCommandInput(self, input_id, name, text, rows, read_only) -> TextBoxCommandInput:
+        return self._add(TextBoxCommandInput(input_id, name, text, rows, read_only, self))
+
+    def addDropDownCommandInput(self, input_id, name, style) -> DropDownCommandInput:
+        return self._add(DropDownCommandInput(input_id, name, style, self))
+
+    def addGroupCommandInput(self, input_id, name) -> GroupCommandInput:
+        return self._add(GroupCommandInput(input_id, name, self))
+
+
+class Command(Base):
+    def __init__(self):
+        self.commandInputs = CommandInputs(self)
+        self.execute = CommandEvent(self, 'execute')
+        self.executePreview = CommandEvent(self, 'executePreview')
+        self.destroy = CommandEvent(self, 'destroy')
+        self.inputChanged = InputChangedEvent(self, 'inputChanged')
+        self.mouseDragBegin = MouseEvent(self, 'mouseDragBegin')
+        self.mouseDragEnd = MouseEvent(self, 'mouseDragEnd')
+        self.isOKButtonVisible = True
+        # Previews requested by the add-in.  In Fusion they fire executePreview, which the
+        # recording already holds as events of its own, so they are only counted here.
+        self.preview_requests = 0
+
+    def doExecutePreview(self) -> bool:
+        self.preview_requests += 1
+        return True
+
+
+#
+# Application
+#
+
+class ProgressDialog(Base):
+    def __init__(self):
+        self.isCancelButtonShown = False
+        self.cancelButtonText = 'Cancel'
+        self.message = ''
+        self.progressValue = 0
+        self.minimumValue = 0
+        self.maximumValue = 100
+        self.wasCancelled = False
+        self.isShowing = False
+
+    def show(self, title: str, message: str, minimum: int, maximum: int, delay: int = 0) -> bool:
+        self.message = message
+        self.minimumValue, self.maximumValue = minimum, maximum
+        self.isShowing = True
+        return True
+
+    def hide(self) -> bool:
+        self.isShowing = False
+        return True
+
+
+class Products(Base):
+    def __init__(self, product):
+        self.product = product
+
+    def itemByProductType(self, product_type: str):
+        return self.product
+
+
+class Document(Base):
+    def __init__(self, product):
+        self.products = Products(product)
+
+
+class UserInterface(Stub):
+    def __init__(self):
+        super().__init__('ui')
+
+    def createProgressDialog(self) -> ProgressDialog:
+        return ProgressDialog()
+
+    def messageBox(self, text: str, *args) -> int:
+        print(text, file=sys.stderr)
+        return 0
+
+
+class Application(Base):
+    _instance = None
+
+    def __init__(self):
+        self.userInterface = UserInterface()
+        self.activeProduct = None
+        self.activeViewport = Stub('viewport')
+        self.custom_events: Dict[str, CustomEvent] = {}
+        # Fired from worker threads, delivered on the main thread by process_custom_events
+        self.fired = queue.Queue()
+
+    @staticmethod
+    def get() -> 'Application':
+        if Application._instance is None:
+            Application._instance = Application()
+        return Application._instance
+
+    @property
+    def activeDocument(self) -> 'Document':
+        return Document(self.activeProduct)
+
+    def log(self, message: str, level: int = LogLevels.InfoLogLevel, log_type: int = LogTypes.ConsoleLogType):
+        if level == LogLevels.ErrorLogLevel or log_type == LogTypes.ConsoleLogType:
+            print(message, file=sys.stderr)
+
+    def registerCustomEvent(self, event_id: str) -> CustomEvent:
+        event = CustomEvent(self, event_id)
+        self.custom_events[event_id] = event
+        return event
+
+    def unregisterCustomEvent(self, event_id: str) -> bool:
+        return self.custom_events.pop(event_id, None) is not None
+
+    def fireCustomEvent(self, event_id: str, additional_info: str = '') -> bool:
+        self.fired.put((event_id, additional_info))
+        return True
+
+    def process_custom_events(self, timeout: float = 0.0) -> int:
+        """Delivers fired custom events, waiting up to timeout for the first one"""
+        count = 0
+        while True:
+            try:
+                event_id, info = self.fired.get(timeout=timeout) if count == 0 and timeout > 0 \
+                    else self.fired.get_nowait()
+            except queue.Empty:
+                return count
+            event = self.custom_events.get(event_id)
+            if event is not None:
+                event.fire(CustomEventArgs(info))
+            count += 1
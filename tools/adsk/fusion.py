@@ -0,0 +1,493 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+# Stand-in for adsk.fusion: a design with box shaped bodies, a timeline and custom graphics.
+import itertools
+import re
+from typing import Dict, List, Optional, Sequence
+
+from .core import Base, BoundingBox3D, Matrix3D, ObjectCollection, OrientedBoundingBox3D, Point3D, Vector3D
+
+
+class _FusionBase(Base):
+    _namespace = 'adsk::fusion'
+
+
+_generated: Dict[str, type] = {}
+
+
+def __getattr__(name: str) -> type:
+    # Classes only named in type annotations or isinstance checks
+    if name.startswith('__'):
+        raise AttributeError(name)
+    if name not in _generated:
+        _generated[name] = type(name, (_FusionBase,), {})
+    return _generated[name]
+
+
+class DesignTypes:
+    DirectDesignType = 0
+    ParametricDesignType = 1
+
+
+class BooleanTypes:
+    DifferenceBooleanType = 0
+    IntersectionBooleanType = 1
+    UnionBooleanType = 2
+
+
+class DistanceUnits:
+    MillimeterDistanceUnits = 0
+    CentimeterDistanceUnits = 1
+    MeterDistanceUnits = 2
+    InchDistanceUnits = 3
+    FootDistanceUnits = 4
+
+
+class CalculationAccuracy:
+    LowCalculationAccuracy = 0
+    MediumCalculationAccuracy = 1
+    HighCalculationAccuracy = 2
+    VeryHighCalculationAccuracy = 3
+
+
+_tokens = itertools.count(1)
+
+
+def _box_tuple(b_box: BoundingBox3D):
+    return b_box.minPoint.x, b_box.minPoint.y, b_box.minPoint.z, b_box.maxPoint.x, b_box.maxPoint.y, b_box.maxPoint.z
+
+
+def _box_volume(box: Sequence[float]) -> float:
+    return max(box[3] - box[0], 0.0) * max(box[4] - box[1], 0.0) * max(box[5] - box[2], 0.0)
+
+
+def _overlap(first: Sequence[float], second: Sequence[float]):
+    return tuple(max(first[i], second[i]) for i in range(3)) + tuple(min(first[i], second[i]) for i in range(3, 6))
+
+
+class Attribute(_FusionBase):
+    def __init__(self, group: str, name: str, value: str):
+        self.groupName, self.name, self.value = group, name, value
+
+
+class Attributes(_FusionBase):
+    def __init__(self):
+        self.items: Dict[tuple, Attribute] = {}
+
+    def add(self, group: str, name: str, value: str) -> Attribute:
+        attribute = Attribute(group, name, value)
+        self.items[(group, name)] = attribute
+        return attribute
+
+    def itemByName(self, group: str, name: str) -> Optional[Attribute]:
+        return self.items.get((group, name))
+
+
+class PhysicalProperties(_FusionBase):
+    """Principal axes are the world axes, the stand-in bodies are axis aligned boxes"""
+
+    def __init__(self, body: 'BRepBody'):
+        self.body = body
+
+    def getPrincipalAxes(self):
+        return True, Vector3D(1, 0, 0), Vector3D(0, 1, 0), Vector3D(0, 0, 1)
+
+    @property
+    def centerOfMass(self) -> Point3D:
+        box = self.body.box
+        return Point3D((box[0] + box[3]) / 2, (box[1] + box[4]) / 2, (box[2] + box[5]) / 2)
+
+    @property
+    def volume(self) -> float:
+        return self.body.volume
+
+
+class BRepBody(_FusionBase):
+    """A body described by its bounding box and volume"""
+
+    def __init__(self, box: Sequence[float], volume: float = None, name: str = 'Body', token: str = None,
+                 component: 'Component' = None):
+        self.box = tuple(box)
+        self.volume = _box_volume(self.box) if volume is None else volume
+        self.name = name
+        self.entityToken = token or f'body_{next(_tokens)}'
+        self.parentComponent = component
+        self.assemblyContext = None
+        self.attributes = Attributes()
+        self.isSolid = True
+        self.isVisible = True
+        self.deleted = False
+
+    @property
+    def isValid(self) -> bool:
+        return not self.deleted
+
+    @property
+    def nativeObject(self) -> 'BRepBody':
+        return self
+
+    @property
+    def boundingBox(self) -> BoundingBox3D:
+        box = self.box
+        return BoundingBox3D(Point3D(*box[:3]), Point3D(*box[3:]))
+
+    def copy(self, component: 'Component' = None) -> 'BRepBody':
+        return BRepBody(self.box, self.volume, self.name, component=component)
+
+    def getPhysicalProperties(self, accuracy: int = CalculationAccuracy.LowCalculationAccuracy):
+        return PhysicalProperties(self)
+
+    def copyToComponent(self, target) -> 'BRepBody':
+        component = target.component if isinstance(target, Occurrence) else target
+        return component.bRepBodies.add(self)
+
+    def deleteMe(self) -> bool:
+        self.deleted = True
+        if self.parentComponent is not None and self in self.parentComponent.bRepBodies.items:
+            self.parentComponent.bRepBodies.items.remove(self)
+        return True
+
+
+class TemporaryBRepManager(_FusionBase):
+    _instance = None
+
+    @staticmethod
+    def get() -> 'TemporaryBRepManager':
+        if TemporaryBRepManager._instance is None:
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    def createBox(self, o_box: OrientedBoundingBox3D) -> BRepBody:
+        return BRepBody(_box_tuple(o_box.bounding_box()), o_box.length * o_box.width * o_box.height)
+
+    def copy(self, body: BRepBody) -> BRepBody:
+        return body.copy()
+
+    def booleanOperation(self, target: BRepBody, tool: BRepBody, boolean_type: int) -> bool:
+        overlap = _overlap(target.box, tool.box)
+        if boolean_type == BooleanTypes.UnionBooleanType:
+            target.box = tuple(min(target.box[i], tool.box[i]) for i in range(3)) + \
+                tuple(max(target.box[i], tool.box[i]) for i in range(3, 6))
+            target.volume += tool.volume - _box_volume(overlap)
+        elif boolean_type == BooleanTypes.DifferenceBooleanType:
+            target.volume = max(target.volume - min(_box_volume(overlap), tool.volume), 0.0)
+        else:
+            target.volume = min(_box_volume(overlap), target.volume, tool.volume)
+            target.box = overlap
+        return True
+
+    def transform(self, body: BRepBody, matrix: Matrix3D) -> bool:
+        corners = [matrix.apply(x, y, z, 1.0) for x in (body.box[0], body.box[3])
+                   for y in (body.box[1], body.box[4]) for z in (body.box[2], body.box[5])]
+        body.box = tuple(min(c[i] for c in corners) for i in range(3)) + \
+            tuple(max(c[i] for c in corners) for i in range(3))
+        return True
+
+
+#
+# Design
+#
+
+class TimelineObject(_FusionBase):
+    def __init__(self, index: int, entity):
+        self.index = index
+        self.entity = entity
+
+
+class TimelineGroup(_FusionBase):
+    def __init__(self, start: int, end: int):
+        self.start, self.end = start, end
+        self.name = ''
+
+
+class Timeline(_FusionBase):
+    def __init__(self):
+        self.items: List[TimelineObject] = []
+        self.groups: List[TimelineGroup] = []
+
+    @property
+    def timelineGroups(self) -> 'Timeline':
+        return self
+
+    def add(self, start: int, end: int) -> TimelineGroup:
+        group = TimelineGroup(start, end)
+        self.groups.append(group)
+        return group
+
+    @property
+    def markerPosition(self) -> int:
+        return len(self.items)
+
+    @property
+    def count(self) -> int:
+        return len(self.items)
+
+    def append(self, entity) -> TimelineObject:
+        timeline_object = TimelineObject(len(self.items), entity)
+        self.items.append(timeline_object)
+        return timeline_object
+
+
+class Feature(_FusionBase):
+    def __init__(self, design: 'Design', entity=None):
+        self.entityToken = f'feature_{next(_tokens)}'
+        self.entity = entity
+        self.timelineObject = design.add_to_timeline(self) if design.designType else None
+        self.bodies = ObjectCollection()
+
+    def startEdit(self) -> bool:
+        return True
+
+    def finishEdit(self) -> bool:
+        return True
+
+    def updateBody(self, body: BRepBody, new_body: BRepBody) -> bool:
+        body.box, body.volume = new_body.box, new_body.volume
+        return True
+
+
+class MoveFeatureInput(_FusionBase):
+    def __init__(self, entities: ObjectCollection):
+        self.entities = entities
+        self.matrix = Matrix3D()
+
+    def defineAsFreeMove(self, matrix: Matrix3D) -> bool:
+        self.matrix = matrix
+        return True
+
+
+class Features(_FusionBase):
+    """One collection for base, remove and move features, they only differ in their add"""
+
+    def __init__(self, component: 'Component'):
+        self.component = component
+
+    @property
+    def baseFeatures(self) -> 'Features':
+        return self
+
+    @property
+    def removeFeatures(self) -> 'Features':
+        return self
+
+    @property
+    def moveFeatures(self) -> 'Features':
+        return self
+
+    def createInput2(self, entities: ObjectCollection) -> MoveFeatureInput:
+        return MoveFeatureInput(entities)
+
+    def add(self, entity=None) -> Feature:
+        design = self.component.design
+        if isinstance(entity, MoveFeatureInput):
+            for body in entity.entities:
+                TemporaryBRepManager.get().transform(body, entity.matrix)
+        elif isinstance(entity, BRepBody):
+            entity.deleteMe()
+        return Feature(design, entity)
+
+
+class BRepBodies(_FusionBase):
+    def __init__(self, component: 'Component'):
+        self.component = component
+        self.items: List[BRepBody] = []
+
+    def __iter__(self):
+        return iter(list(self.items))
+
+    @property
+    def count(self) -> int:
+        return len(self.items)
+
+    def item(self, index: int) -> BRepBody:
+        return self.items[index]
+
+    def add(self, body: BRepBody, base_feature: Feature = None) -> BRepBody:
+        new_body = body.copy(self.component)
+        self.items.append(new_body)
+        self.component.design.bodies[new_body.entityToken] = new_body
+        if base_feature is not None:
+            base_feature.bodies.add(new_body)
+        return new_body
+
+
+class CustomGraphicsEntity(_FusionBase):
+    def __init__(self, group: 'CustomGraphicsGroup'):
+        self.group = group
+        self.color = None
+        self.depthPriority = 0
+        self.deleted = False
+
+    @property
+    def isValid(self) -> bool:
+        return not self.deleted
+
+    def deleteMe(self) -> bool:
+        self.deleted = True
+        if self in self.group.entities:
+            self.group.entities.remove(self)
+        return True
+
+
+class CustomGraphicsGroup(_FusionBase):
+    def __init__(self):
+        self.entities: List[CustomGraphicsEntity] = []
+
+    def __iter__(self):
+        return iter(list(self.entities))
+
+    def _add(self) -> CustomGraphicsEntity:
+        entity = CustomGraphicsEntity(self)
+        self.entities.append(entity)
+        return entity
+
+    def addBRepBody(self, body: BRepBody) -> CustomGraphicsEntity:
+        return self._add()
+
+    def addMesh(self, coordinates, indices, normals, normal_indices) -> CustomGraphicsEntity:
+        return self._add()
+
+    def deleteMe(self) -> bool:
+        self.entities.clear()
+        return True
+
+
+class CustomGraphicsGroups(_FusionBase, list):
+    def add(self) -> CustomGraphicsGroup:
+        group = CustomGraphicsGroup()
+        self.append(group)
+        return group
+
+
+class CustomGraphicsCoordinates(_FusionBase):
+    def __init__(self, coordinates: Sequence[float]):
+        self.coordinates = coordinates
+
+    @staticmethod
+    def create(coordinates: Sequence[float]) -> 'CustomGraphicsCoordinates':
+        return CustomGraphicsCoordinates(coordinates)
+
+
+class CustomGraphicsSolidColorEffect(_FusionBase):
+    def __init__(self, color):
+        self.color = color
+
+    @staticmethod
+    def create(color) -> 'CustomGraphicsSolidColorEffect':
+        return CustomGraphicsSolidColorEffect(color)
+
+
+class Occurrence(_FusionBase):
+    def __init__(self, component: 'Component', transform: Matrix3D):
+        self.component = component
+        self.transform2 = transform
+        self.assemblyContext = None
+
+    @property
+    def name(self) -> str:
+        return f'{self.component.name}:1'
+
+    @property
+    def bRepBodies(self) -> BRepBodies:
+        return self.component.bRepBodies
+
+
+class Occurrences(_FusionBase):
+    def __init__(self, component: 'Component'):
+        self.component = component
+        self.items: List[Occurrence] = []
+
+    def __iter__(self):
+        return iter(list(self.items))
+
+    def addNewComponent(self, transform: Matrix3D) -> Occurrence:
+        design = self.component.design
+        occurrence = Occurrence(Component(design, 'Component'), transform)
+        self.items.append(occurrence)
+        design.root_occurrences.append(occurrence)
+        if design.designType:
+            design.add_to_timeline(occurrence)
+        return occurrence
+
+
+class Component(_FusionBase):
+    def __init__(self, design: 'Design', name: str):
+        self.design = design
+        self.name = name
+        self.bRepBodies = BRepBodies(self)
+        self.occurrences = Occurrences(self)
+        self.features = Features(self)
+        self.attributes = Attributes()
+        self.customGraphicsGroups = CustomGraphicsGroups()
+
+    @property
+    def allOccurrences(self) -> List[Occurrence]:
+        return list(self.design.root_occurrences)
+
+
+_UNITS = {'mm': 0.1, 'cm': 1.0, 'm': 100.0, 'in': 2.54, 'ft': 30.48}
+_DISTANCE_UNITS = {
+    'mm': DistanceUnits.MillimeterDistanceUnits, 'cm': DistanceUnits.CentimeterDistanceUnits,
+    'm': DistanceUnits.MeterDistanceUnits, 'in': DistanceUnits.InchDistanceUnits,
+    'ft': DistanceUnits.FootDistanceUnits,
+}
+_EXPRESSION = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([a-z]*)\s*$')
+
+
+class UnitsManager(_FusionBase):
+    """Length expressions of the form '<number> <unit>', enough for the config values"""
+
+    def __init__(self, units: str = 'mm'):
+        self.defaultLengthUnits = units
+
+    @property
+    def distanceDisplayUnits(self) -> int:
+        return _DISTANCE_UNITS.get(self.defaultLengthUnits, DistanceUnits.CentimeterDistanceUnits)
+
+    def evaluateExpression(self, expression: str, units: str = '') -> float:
+        match = _EXPRESSION.match(expression)
+        if match is None:
+            raise ValueError(f'Unsupported expression {expression!r}')
+        number, unit = match.groups()
+        return float(number) * _UNITS[unit or self.defaultLengthUnits]
+
+    def formatInternalValue(self, value: float, units: str = '', show_units: bool = True) -> str:
+        unit, _, power = (units or self.defaultLengthUnits).partition('^')
+        converted = value / _UNITS.get(unit, 1.0) ** int(power or 1)
+        return f'{converted:.3f} {units}' if show_units else f'{converted:.3f}'
+
+
+class Design(_FusionBase):
+    def __init__(self, units: str = 'mm', parametric: bool = True):
+        self.designType = DesignTypes.ParametricDesignType if parametric else DesignTypes.DirectDesignType
+        self.unitsManager = UnitsManager(units)
+        self.timeline = Timeline()
+        self.bodies: Dict[str, BRepBody] = {}
+        self.root_occurrences: List[Occurrence] = []
+        self.rootComponent = Component(self, 'root')
+
+    @property
+    def fusionUnitsManager(self) -> UnitsManager:
+        return self.unitsManager
+
+    def add_to_timeline(self, entity) -> TimelineObject:
+        return self.timeline.append(entity)
+
+    def add_body(self, box: Sequence[float], volume: float = None, name: str = 'Body', token: str = None) -> BRepBody:
+        body = BRepBody(box, volume, name, token, self.rootComponent)
+        self.rootComponent.bRepBodies.items.append(body)
+        self.bodies[body.entityToken] = body
+        return body
+
+    def findEntityByToken(self, token: str) -> list:
+        body = self.bodies.get(token)
+        return [body] if body is not None and body.isValid else []
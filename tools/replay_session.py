@@ -0,0 +1,229 @@
+#  Copyright 2022 by Autodesk, Inc.
+#  Permission to use, copy, modify, and distribute this software in object code form
+#  for any purpose and without fee is hereby granted, provided that the above copyright
+#  notice appears in all copies and that both that copyright notice and the limited
+#  warranty and restricted rights notice below appear in all supporting documentation.
+#
+#  AUTODESK PROVIDES THIS PROGRAM "AS IS" AND WITH ALL FAULTS. AUTODESK SPECIFICALLY
+#  DISCLAIMS ANY IMPLIED WARRANTY OF MERCHANTABILITY OR FITNESS FOR A PARTICULAR USE.
+#  AUTODESK, INC. DOES NOT WARRANT THAT THE OPERATION OF THE PROGRAM WILL BE
+#  UNINTERRUPTED OR ERROR FREE.
+
+"""Replays a recorded Sinterbox command session outside Fusion and times every step
+
+Record sessions by setting RECORD_SESSIONS = True in config.py, then run for example:
+
+    python tools/replay_session.py SinterBox_sessions.jsonl --json timings.json
+    python tools/replay_session.py SinterBox_sessions.jsonl --baseline timings.json
+
+The add-in runs against the stand-in adsk package next to this file.  Before each
+recorded event the inputs are set to their recorded values, then the matching handler of
+commands/SinterBoxCommand/entry.py is called and timed.  Background geometry jobs are
+awaited after each step and reported as settle time.  With --baseline the totals per event
+are compared to an earlier --json output and the exit code is 1 if any grew by more than
+the tolerance.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import types
+from collections import defaultdict
+from typing import Dict, List
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDIN_DIR = os.path.dirname(TOOLS_DIR)
+ADDIN_PACKAGE = 'Sinterbox'
+
+sys.path.insert(0, TOOLS_DIR)
+
+import adsk.core  # noqa: E402  the stand-in from tools/adsk
+import adsk.fusion  # noqa: E402
+
+# Seconds to wait for background jobs after each step
+SETTLE_TIMEOUT = 30.0
+
+EVENTS = ('input_changed', 'preview', 'drag_begin', 'drag_end', 'execute')
+
+
+def load_entry():
+    """Imports the add-in as a package, like Fusion does, and returns the command module"""
+    package = types.ModuleType(ADDIN_PACKAGE)
+    package.__path__ = [ADDIN_DIR]
+    sys.modules[ADDIN_PACKAGE] = package
+    config = importlib.import_module(f'{ADDIN_PACKAGE}.config')
+    config.RECORD_SESSIONS = False
+    return importlib.import_module(f'{ADDIN_PACKAGE}.commands.SinterBoxCommand.entry')
+
+
+def read_sessions(path: str) -> Dict[str, List[dict]]:
+    sessions = defaultdict(list)
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                sessions[record['session']].append(record)
+    return sessions
+
+
+def apply_values(command: adsk.core.Command, design: adsk.fusion.Design, values: dict):
+    """Sets every input to its recorded value without firing any event"""
+    inputs = command.commandInputs
+    for input_id, value in values.items():
+        command_input = inputs.itemById(input_id)
+        if command_input is None:
+            continue
+        if isinstance(command_input, adsk.core.SelectionCommandInput):
+            command_input.clearSelection()
+            for token in value:
+                for entity in design.findEntityByToken(token):
+                    command_input.addSelection(entity)
+        elif isinstance(command_input, adsk.core.DropDownCommandInput):
+            command_input.select(value)
+        else:
+            command_input.value = value
+
+
+def settle(entry, app: adsk.core.Application) -> float:
+    """Waits for the background jobs of the step and delivers their results"""
+    start = time.perf_counter()
+    kinds = (entry.AUTO_GAP_JOB, entry.LAYOUT_JOB, entry.PACK_JOB, 'slots')
+    while time.perf_counter() - start < SETTLE_TIMEOUT:
+        worker = entry.worker
+        if worker is None or not any(worker.is_pending(kind) for kind in kinds):
+            break
+        app.process_custom_events(timeout=0.01)
+    app.process_custom_events()
+    return time.perf_counter() - start
+
+
+def replay(entry, records: List[dict], run_execute: bool = True) -> List[dict]:
+    app = adsk.core.Application.get()
+    created = records[0]
+    design = adsk.fusion.Design(created.get('units', 'mm'), created.get('parametric', True))
+    app.activeProduct = design
+    for record in records:
+        for token, body in record.get('bodies', {}).items():
+            design.add_body(body['box'], body.get('volume'), body.get('name', 'Body'), token)
+
+    command = adsk.core.Command()
+    entry.command_created(adsk.core.CommandCreatedEventArgs(command))
+
+    steps = []
+    for record in records[1:]:
+        event = record['event']
+        if event not in EVENTS or (event == 'execute' and not run_execute):
+            continue
+        apply_values(command, design, record['values'])
+
+        if event == 'input_changed':
+            command_input = command.commandInputs.itemById(record['input'])
+            args = adsk.core.InputChangedEventArgs(command_input, command.commandInputs, command.inputChanged)
+            handler = entry.command_input_changed
+        elif event == 'preview':
+            args = adsk.core.CommandEventArgs(command, command.executePreview)
+            handler = entry.command_preview
+        elif event == 'execute':
+            args = adsk.core.CommandEventArgs(command, command.execute)
+            handler = entry.command_execute
+        else:
+            firing_event = command.mouseDragBegin if event == 'drag_begin' else command.mouseDragEnd
+            args = adsk.core.MouseEventArgs(firing_event)
+            handler = entry.mouse_drag_begin if event == 'drag_begin' else entry.mouse_drag_end
+
+        start = time.perf_counter()
+        handler(args)
+        seconds = time.perf_counter() - start
+        steps.append({
+            'event': event,
+            'input': record.get('input', ''),
+            'recorded_time': record['time'],
+            'seconds': seconds,
+            'settle': settle(entry, app),
+        })
+
+    entry.command_destroy(adsk.core.CommandEventArgs(command, command.destroy))
+    return steps
+
+
+def summarize(steps: List[dict]) -> Dict[str, dict]:
+    summary = {}
+    for event in EVENTS:
+        times = [step['seconds'] for step in steps if step['event'] == event]
+        if times:
+            summary[event] = {
+                'count': len(times),
+                'total': sum(times),
+                'mean': sum(times) / len(times),
+                'max': max(times),
+                'settle': sum(step['settle'] for step in steps if step['event'] == event),
+            }
+    return summary
+
+
+def format_report(steps: List[dict], summary: Dict[str, dict]) -> str:
+    lines = [f'{"#":>4}  {"event":<14} {"input":<22} {"ms":>9} {"settle ms":>10}']
+    for i, step in enumerate(steps):
+        lines.append(f'{i:>4}  {step["event"]:<14} {step["input"]:<22} '
+                     f'{step["seconds"] * 1000:>9.2f} {step["settle"] * 1000:>10.2f}')
+    lines.append('')
+    lines.append(f'{"event":<14} {"count":>6} {"total ms":>10} {"mean ms":>9} {"max ms":>9} {"settle ms":>10}')
+    for event, values in summary.items():
+        lines.append(f'{event:<14} {values["count"]:>6} {values["total"] * 1000:>10.2f} '
+                     f'{values["mean"] * 1000:>9.2f} {values["max"] * 1000:>9.2f} {values["settle"] * 1000:>10.2f}')
+    return '\n'.join(lines)
+
+
+def regressions(summary: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    found = []
+    for event, values in summary.items():
+        previous = baseline.get(event)
+        if previous is not None and values['total'] > previous['total'] * tolerance:
+            found.append(f'{event}: {values["total"] * 1000:.2f} ms, baseline {previous["total"] * 1000:.2f} ms')
+    return found
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recording', help='JSON lines file written with RECORD_SESSIONS')
+    parser.add_argument('--session', help='Session id to replay, the last recorded session by default')
+    parser.add_argument('--no-execute', action='store_true', help='Skip the execute (OK) step')
+    parser.add_argument('--json', help='Write the steps and summary to this file')
+    parser.add_argument('--baseline', help='Summary written earlier with --json to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='Allowed ratio of event totals over the baseline (default 1.25)')
+    args = parser.parse_args(argv)
+
+    sessions = read_sessions(args.recording)
+    if len(sessions) == 0:
+        print(f'No sessions in {args.recording}', file=sys.stderr)
+        return 2
+    session = args.session or list(sessions)[-1]
+    if session not in sessions:
+        print(f'Session {session} not found, recorded: {", ".join(sessions)}', file=sys.stderr)
+        return 2
+
+    entry = load_entry()
+    steps = replay(entry, sessions[session], run_execute=not args.no_execute)
+    summary = summarize(steps)
+    print(f'Session {session}')
+    print(format_report(steps, summary))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'session': session, 'steps': steps, 'summary': summary}, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            found = regressions(summary, json.load(file)['summary'], args.tolerance)
+        for line in found:
+            print(f'Regression {line}', file=sys.stderr)
+        if found:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())